@@ -0,0 +1,190 @@
+"""
+Snapshot knowledge chatbot: item per kategori + teks KONTEKS DATA.
+
+Dibangun sekali per versi konten lalu disimpan di cache (dipakai bersama
+semua worker jika CACHES memakai Redis; LocMemCache hanya per proses) dan
+di memori proses. Versi diambil dari generasi model konten
+(apps.core.content_version) yang dinaikkan signal save/delete, jadi snapshot
+lama otomatis tidak terpakai tanpa invalidasi manual. Saat membangun ulang,
+kategori yang generasinya tidak berubah diambil dari snapshot sebelumnya.
+"""
+import threading
+import time
+from dataclasses import dataclass, field
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from apps.core.content_version import get_generations
+from apps.core.stats_cache import get_refresh_metrics, record_refresh
+
+DEFAULT_KNOWLEDGE_SETTINGS = {
+    'TIMEOUT': 24 * 60 * 60,  # Batas atas, invalidasi normal lewat versi konten
+}
+
+KNOWLEDGE_KEY = 'ai_knowledge'
+
+# Kategori chatbot -> model konten, dalam urutan KONTEKS DATA
+KNOWLEDGE_MODELS = (
+    ('destination', 'destinations.Destinations'),
+    ('fauna', 'fauna.Fauna'),
+    ('flora', 'flora.Flora'),
+    ('health', 'health.Health'),
+    ('culinary', 'kuliner.Kuliner'),
+)
+
+# Per proses: snapshot terakhir, dipakai selama versinya masih sama
+_local = {'snapshot': None}
+_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class KnowledgeSnapshot:
+    version: str
+    generations: dict  # kategori -> generasi model saat dibangun
+    items: dict  # kategori -> [item dict]
+    context_text: str
+    built_at: object = field(default_factory=timezone.now)
+    build_ms: float = 0.0
+
+    def item_count(self):
+        return sum(len(items) for items in self.items.values())
+
+
+def get_knowledge_settings():
+    return {**DEFAULT_KNOWLEDGE_SETTINGS, **getattr(settings, 'AI_KNOWLEDGE', {})}
+
+
+def current_generations():
+    generations = get_generations([label for _, label in KNOWLEDGE_MODELS])
+    return {type_name: generation for (type_name, _), generation in zip(KNOWLEDGE_MODELS, generations)}
+
+
+def knowledge_version(generations=None):
+    generations = generations or current_generations()
+    return '-'.join(str(generations[type_name]) for type_name, _ in KNOWLEDGE_MODELS)
+
+
+def snapshot_key(version):
+    return f'{KNOWLEDGE_KEY}:{version}'
+
+
+def format_item(item, type_name):
+    data = {
+        'type': type_name,
+        'id': item.id,
+        'title': item.title,
+        'description': item.description
+    }
+
+    # Pengaturan konten berdasarkan tipe data
+    if type_name == 'destination':
+        data['location'] = item.location
+        data['content'] = (
+            f"Destinasi: {item.title}\n"
+            f"Lokasi: {item.location}\n"
+            f"Deskripsi: {item.description}\n"
+        )
+    elif type_name == 'culinary':
+        data['content'] = (
+            f"Kuliner: {item.title}\n"
+            f"Deskripsi: {item.description}\n"
+            f"Lokasi: {item.location}\n"
+            f"Karakteristik: Makanan khas Bogor\n"
+        )
+    elif type_name == 'health':
+        data['content'] = (
+            f"Informasi Kesehatan: {item.title}\n"
+            f"Detail: {item.description}\n"
+            f"Lokasi Fasilitas: {item.location}\n"
+            f"Kategori: Layanan Kesehatan Bogor\n"
+        )
+    elif type_name == 'flora':
+        data['content'] = (
+            f"Flora: {item.title}\n"
+            f"Deskripsi: {item.description}\n"
+            f"Habitat: Daerah Bogor\n"
+            f"Karakteristik: Tumbuhan khas Bogor\n"
+        )
+    elif type_name == 'fauna':
+        data['content'] = (
+            f"Fauna: {item.title}\n"
+            f"Deskripsi: {item.description}\n"
+            f"Habitat: Daerah Bogor\n"
+            f"Karakteristik: Hewan khas Bogor\n"
+        )
+    return data
+
+
+def build_snapshot(generations=None, previous=None):
+    """
+    Query model konten (hanya kolom yang dipakai) dan susun teks konteks.
+    Kategori dengan generasi yang sama seperti `previous` tidak di-query ulang.
+    """
+    generations = generations or current_generations()
+    start = time.perf_counter()
+
+    items = {}
+    for type_name, label in KNOWLEDGE_MODELS:
+        if previous is not None and previous.generations.get(type_name) == generations[type_name]:
+            items[type_name] = previous.items[type_name]
+            continue
+        model = apps.get_model(label)
+        concrete = {f.name for f in model._meta.concrete_fields}
+        columns = [name for name in ('id', 'title', 'description', 'location') if name in concrete]
+        items[type_name] = [format_item(item, type_name) for item in model.objects.only(*columns)]
+
+    context_parts = []
+    for category, category_items in items.items():
+        if category_items:
+            context_parts.append(f"\n=== {category.upper()} ===")
+            for item in category_items:
+                context_parts.append(item['content'])
+
+    build_ms = (time.perf_counter() - start) * 1000
+    record_refresh(KNOWLEDGE_KEY, build_ms)
+    return KnowledgeSnapshot(
+        version=knowledge_version(generations),
+        generations=generations,
+        items=items,
+        context_text="\n".join(context_parts),
+        build_ms=build_ms,
+    )
+
+
+def get_snapshot():
+    """
+    Snapshot untuk versi konten saat ini: memori proses -> cache -> build.
+    Jalur normal hanya membaca counter generasi dari cache.
+    """
+    generations = current_generations()
+    version = knowledge_version(generations)
+    snapshot = _local['snapshot']
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+
+    with _lock:
+        previous = _local['snapshot']
+        if previous is not None and previous.version == version:
+            return previous
+        snapshot = cache.get(snapshot_key(version))
+        if snapshot is None:
+            snapshot = build_snapshot(generations, previous)
+            cache.set(snapshot_key(version), snapshot, get_knowledge_settings()['TIMEOUT'])
+        _local['snapshot'] = snapshot
+    return snapshot
+
+
+def rebuild_snapshot():
+    """Bangun ulang snapshot versi saat ini dan simpan ke cache (command prebuild_knowledge)"""
+    snapshot = build_snapshot()
+    cache.set(snapshot_key(snapshot.version), snapshot, get_knowledge_settings()['TIMEOUT'])
+    _local['snapshot'] = snapshot
+    return snapshot
+
+
+def get_build_metrics():
+    """Durasi build snapshot: refreshes, last_ms, avg_ms, last_refreshed"""
+    return get_refresh_metrics([KNOWLEDGE_KEY]).get(KNOWLEDGE_KEY)
@@ -0,0 +1,78 @@
+import time
+import uuid
+from types import SimpleNamespace
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+
+from apps.ai.knowledge import get_snapshot
+from apps.ai.retrieval import estimate_tokens, get_index
+from apps.ai.services import GeminiService
+
+# Pertanyaan yang tidak menyebut judul item, agar sampai ke jalur LLM
+QUERIES = [
+    "Ada fauna apa saja di sekitar Bogor?",
+    "Tempat wisata alam yang sejuk untuk keluarga",
+    "Dimana bisa berobat kalau sakit saat liburan?",
+    "Makanan khas yang wajib dicoba di Bogor",
+    "Tanaman langka apa yang bisa dilihat?",
+    "Air terjun yang bagus untuk berenang",
+]
+
+
+class StubModel:
+    """Pengganti GenerativeModel: latensi = BASE + per 1k token prompt, tanpa panggilan API"""
+
+    def __init__(self, base_ms, ms_per_1k_tokens):
+        self.base_ms = base_ms
+        self.ms_per_1k_tokens = ms_per_1k_tokens
+        self.prompt_tokens = []
+
+    def generate_content(self, prompt):
+        tokens = estimate_tokens(prompt)
+        self.prompt_tokens.append(tokens)
+        time.sleep((self.base_ms + self.ms_per_1k_tokens * tokens / 1000) / 1000)
+        return SimpleNamespace(text="RESPONSE: Di Bogor ada banyak pilihan menarik nih!\nTYPE: destination\nITEMS:")
+
+
+class Command(BaseCommand):
+    help = 'Compare prompt size and chatbot latency with and without retrieval, using a stubbed model'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rounds', type=int, default=3)
+        parser.add_argument('--base-ms', type=float, default=300, help='Stub model latency per call')
+        parser.add_argument('--ms-per-1k-tokens', type=float, default=200, help='Stub model latency per 1k prompt tokens')
+
+    def handle(self, *args, **options):
+        snapshot = get_snapshot()
+        start = time.perf_counter()
+        get_index(snapshot)
+        self.stdout.write(
+            f"Knowledge: {snapshot.item_count()} item(s), full context ~{estimate_tokens(snapshot.context_text)} tokens, "
+            f"index ready in {(time.perf_counter() - start) * 1000:.1f} ms"
+        )
+
+        for name, use_retrieval in (('full context', False), ('retrieval', True)):
+            model = StubModel(options['base_ms'], options['ms_per_1k_tokens'])
+            service = GeminiService()
+            service.model = model
+            service.use_retrieval = use_retrieval
+            # Setiap pertanyaan harus sampai ke model
+            service.use_response_cache = False
+
+            latencies = []
+            for _ in range(options['rounds']):
+                for query in QUERIES:
+                    # Session baru per pertanyaan: tanpa riwayat percakapan
+                    session_id = f'benchmark-{uuid.uuid4()}'
+                    start = time.perf_counter()
+                    service.get_response(query, session_id)
+                    latencies.append((time.perf_counter() - start) * 1000)
+                    cache.delete(f'chat_history_{session_id}')
+
+            calls = len(model.prompt_tokens)
+            self.stdout.write(
+                f"{name:>12}: {calls}/{len(latencies)} LLM call(s), "
+                f"avg prompt {sum(model.prompt_tokens) / max(calls, 1):.0f} tokens, "
+                f"avg latency {sum(latencies) / len(latencies):.1f} ms"
+            )
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from apps.ai.knowledge import get_build_metrics, rebuild_snapshot
+
+
+class Command(BaseCommand):
+    help = 'Build the chatbot knowledge snapshot for the current content version (run after deploy)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--status', action='store_true', help='Print build duration metrics and exit')
+
+    def handle(self, *args, **options):
+        if options['status']:
+            metrics = get_build_metrics()
+            if metrics is None:
+                self.stdout.write("Knowledge snapshot has not been built yet")
+                return
+            self.stdout.write(
+                f"{metrics['refreshes']} build(s), last {metrics['last_ms']:.1f} ms "
+                f"at {metrics['last_refreshed']:%Y-%m-%d %H:%M:%S}, avg {metrics['avg_ms']:.1f} ms"
+            )
+            return
+
+        snapshot = rebuild_snapshot()
+        self.stdout.write(
+            f"Knowledge {snapshot.version}: {snapshot.item_count()} item(s), "
+            f"{len(snapshot.context_text)} chars in {snapshot.build_ms:.1f} ms"
+        )
@@ -0,0 +1,150 @@
+"""
+Pencocok judul item knowledge di teks pertanyaan (automaton Aho-Corasick).
+
+Judul dinormalisasi (huruf kecil, tanpa diakritik, spasi berulang jadi satu)
+lalu dikompilasi sekali per versi snapshot knowledge. Satu kali scan teks
+menghasilkan semua kecocokan beserta posisinya di teks asli; kecocokan harus
+berada di batas kata.
+"""
+import threading
+import time
+import unicodedata
+from collections import deque
+from dataclasses import dataclass
+
+from apps.core.stats_cache import record_refresh
+
+MATCHER_KEY = 'ai_title_matcher'
+
+_lock = threading.Lock()
+# (versi snapshot, matcher) sebagai satu tuple, diganti dengan satu assignment
+# agar pembaca tanpa lock tidak pernah melihat versi baru dengan matcher lama
+_local = {'current': (None, None)}
+
+
+@dataclass(frozen=True)
+class TitleMatch:
+    start: int  # posisi di teks asli
+    end: int
+    category: str
+    item: dict
+
+    def __len__(self):
+        return self.end - self.start
+
+
+def normalize_with_offsets(text):
+    """(teks ternormalisasi, posisi karakter asli untuk setiap karakter hasil)"""
+    chars, offsets = [], []
+    for index, char in enumerate(text or ''):
+        for part in unicodedata.normalize('NFKD', char).lower():
+            if unicodedata.combining(part):
+                continue
+            if part.isspace():
+                if not chars or chars[-1] == ' ':
+                    continue
+                part = ' '
+            chars.append(part)
+            offsets.append(index)
+    return ''.join(chars), offsets
+
+
+def normalize_title(title):
+    return normalize_with_offsets(title)[0].strip()
+
+
+class TitleMatcher:
+    def __init__(self, items):
+        """`items`: {kategori: [item dict dengan 'title']}, seperti KnowledgeSnapshot.items"""
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]  # node -> [(panjang pattern, kategori, item)]
+        self.titles = {}  # judul ternormalisasi -> [(kategori, item)]
+
+        for category, category_items in items.items():
+            for item in category_items:
+                key = normalize_title(item['title'])
+                if not key:
+                    continue
+                self.titles.setdefault(key, []).append((category, item))
+                node = 0
+                for char in key:
+                    if char not in self.goto[node]:
+                        self.goto.append({})
+                        self.fail.append(0)
+                        self.output.append([])
+                        self.goto[node][char] = len(self.goto) - 1
+                    node = self.goto[node][char]
+                self.output[node].append((len(key), category, item))
+
+        # Failure link (BFS); output node mewarisi output failure-nya
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                fallback = self.fail[node]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+                queue.append(child)
+
+    def find_all(self, text, categories=None):
+        """Semua kecocokan (boleh tumpang tindih), urut posisi"""
+        normalized, offsets = normalize_with_offsets(text)
+        matches = []
+        node = 0
+        for end, char in enumerate(normalized, 1):
+            while node and char not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(char, 0)
+            for length, category, item in self.output[node]:
+                start = end - length
+                if categories is not None and category not in categories:
+                    continue
+                if (start and normalized[start - 1].isalnum()) or (end < len(normalized) and normalized[end].isalnum()):
+                    continue
+                matches.append(TitleMatch(offsets[start], offsets[end - 1] + 1, category, item))
+        return sorted(matches, key=lambda match: (match.start, -len(match)))
+
+    def find(self, text, categories=None):
+        """Kecocokan tanpa tumpang tindih, yang terpanjang didahulukan; urut posisi"""
+        selected = []
+        for match in sorted(self.find_all(text, categories), key=lambda match: (-len(match), match.start)):
+            if all(match.end <= other.start or match.start >= other.end for other in selected):
+                selected.append(match)
+        return sorted(selected, key=lambda match: match.start)
+
+    def lookup(self, name, category=None):
+        """
+        Item untuk nama dari LLM (misal daftar ITEMS): judul yang sama persis
+        setelah normalisasi, atau judul terpanjang yang disebut di dalamnya.
+        """
+        categories = None if category is None else {category}
+        exact = [
+            item for item_category, item in self.titles.get(normalize_title(name), ())
+            if categories is None or item_category in categories
+        ]
+        if exact:
+            return exact
+        matches = self.find(name, categories)
+        if not matches:
+            return []
+        longest = max(len(match) for match in matches)
+        return [match.item for match in matches if len(match) == longest]
+
+
+def get_matcher(snapshot):
+    """TitleMatcher untuk snapshot knowledge, dibangun ulang saat versinya berubah"""
+    version, matcher = _local['current']
+    if version == snapshot.version:
+        return matcher
+
+    with _lock:
+        version, matcher = _local['current']
+        if version != snapshot.version:
+            start = time.perf_counter()
+            matcher = TitleMatcher(snapshot.items)
+            record_refresh(MATCHER_KEY, (time.perf_counter() - start) * 1000)
+            _local['current'] = (snapshot.version, matcher)
+    return matcher
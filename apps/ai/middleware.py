@@ -37,17 +37,41 @@ class AIAnalyticsMiddleware:
             session_id = f"anon_{str(uuid.uuid4())[:8]}"
         
         response = self.get_response(request)
-        
+
+        if response.streaming:
+            # Jawaban SSE: waktu dicatat setelah chunk terakhir terkirim
+            response.streaming_content = self._track_stream(
+                response.streaming_content, request, response, session_id, request_data, start_time
+            )
+            return response
+
         # Calculate response time
         response_time = time.time() - start_time
+        self._record(request, response, session_id, request_data, response_time)
+        return response
+
+    def _track_stream(self, stream, request, response, session_id, request_data, start_time):
+        """Teruskan chunk stream sambil mengukur time-to-first-token dan waktu total"""
+        time_to_first_token = None
+        try:
+            for chunk in stream:
+                if time_to_first_token is None:
+                    time_to_first_token = time.time() - start_time
+                yield chunk
+        finally:
+            self._record(
+                request, response, session_id, request_data,
+                time.time() - start_time, time_to_first_token=time_to_first_token
+            )
 
+    def _record(self, request, response, session_id, request_data, response_time, time_to_first_token=None):
         try:
             # Get endpoint type
             endpoint = request.path.split('/')[-2] if request.path.endswith('/') else request.path.split('/')[-1]
 
             # Get response data
             try:
-                response_data = json.loads(response.content.decode('utf-8'))
+                response_data = {} if response.streaming else json.loads(response.content.decode('utf-8'))
                 error_message = str(response_data.get('error')) if response.status_code >= 400 else None
             except (json.JSONDecodeError, AttributeError):
                 error_message = None
@@ -62,6 +86,14 @@ class AIAnalyticsMiddleware:
                 # Remove sensitive data if any
                 if 'message' in request_data:
                     safe_request_data['message'] = request_data['message']
+            # Status cache jawaban chatbot (hit/similar/miss + hit rate proses), diisi ChatbotViewSet
+            cache_lookup = getattr(request, 'ai_response_cache', None)
+            if cache_lookup:
+                safe_request_data['response_cache'] = cache_lookup
+            if response.streaming:
+                # response_time = total sampai stream selesai
+                safe_request_data['streamed'] = True
+                safe_request_data['time_to_first_token'] = time_to_first_token
 
             # Create analytics entry
             AIAnalytics.objects.create(
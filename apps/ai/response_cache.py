@@ -0,0 +1,164 @@
+"""
+Cache jawaban LLM chatbot per proses (TTL + LRU).
+
+Key: pertanyaan yang dinormalisasi, versi snapshot knowledge, kelas
+percakapan (baru, atau lanjutan + item yang direferensikan giliran
+sebelumnya) dan kata tanya. Jika tidak ada yang sama persis, pertanyaan dengan kemiripan
+cosine TF-IDF (idf dari index retrieval; kata di luar katalog memakai idf
+maksimum) di atas SIMILARITY_THRESHOLD dengan
+kelas percakapan dan kata tanya yang sama juga dipakai. Kata tanya adalah
+stopword retrieval sehingga tidak ada di vektor, padahal "Dimana Taman
+Safari?" dan "Apa itu Taman Safari?" butuh jawaban berbeda.
+"""
+import math
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from django.conf import settings
+
+from .retrieval import TOKEN_RE, get_index, normalize, tokenize
+
+DEFAULT_RESPONSE_CACHE_SETTINGS = {
+    'ENABLED': True,
+    'TTL': 60 * 60,
+    'MAX_ENTRIES': 1000,
+    'SIMILARITY_THRESHOLD': 0.85,  # None = hanya pertanyaan yang sama persis
+}
+
+
+def get_response_cache_settings():
+    return {**DEFAULT_RESPONSE_CACHE_SETTINGS, **getattr(settings, 'AI_RESPONSE_CACHE', {})}
+
+
+# Kata tanya -> bentuk dasar; varian dengan partikel -kah dianggap sama
+QUESTION_WORDS = {
+    'apa': 'apa', 'apakah': 'apakah',
+    'dimana': 'dimana', 'dimanakah': 'dimana', 'kemana': 'kemana', 'darimana': 'darimana',
+    'mana': 'mana', 'manakah': 'mana',
+    'kapan': 'kapan', 'kapankah': 'kapan',
+    'berapa': 'berapa', 'berapakah': 'berapa',
+    'kenapa': 'kenapa', 'mengapa': 'kenapa',
+    'siapa': 'siapa', 'siapakah': 'siapa',
+    'bagaimana': 'bagaimana', 'bagaimanakah': 'bagaimana', 'gimana': 'bagaimana',
+    'what': 'apa', 'where': 'dimana', 'when': 'kapan', 'why': 'kenapa', 'who': 'siapa', 'how': 'bagaimana',
+}
+
+
+def normalize_question(text):
+    return ' '.join(TOKEN_RE.findall(normalize(text)))
+
+
+def question_words(question):
+    """Kata tanya (bentuk dasar) di pertanyaan yang sudah dinormalisasi, misal 'apa,dimana'"""
+    return ','.join(sorted({QUESTION_WORDS[word] for word in question.split() if word in QUESTION_WORDS}))
+
+
+def conversation_state(history):
+    """'new', atau 'continuing:<id item>' agar pertanyaan lanjutan tidak tertukar konteks"""
+    if not history:
+        return 'new'
+    references = history[-1].get('references') or []
+    return 'continuing:' + ','.join(sorted(f"{ref['type']}-{ref['id']}" for ref in references))
+
+
+def tfidf_vector(text, index):
+    # Term di luar katalog tetap dihitung (idf maksimum): "hotel murah dekat Bogor"
+    # dan "cuaca di Bogor" tidak boleh sama-sama menjadi {'bogor': 1.0}
+    weights = {
+        term: count * (index.postings[term][2] if term in index.postings else index.oov_idf)
+        for term, count in Counter(tokenize(text)).items()
+    }
+    norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+    return {term: weight / norm for term, weight in weights.items()} if norm else {}
+
+
+def cosine(a, b):
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(weight * b.get(term, 0.0) for term, weight in a.items())
+
+
+class SemanticResponseCache:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # (question, version, state, kata tanya) -> (expires_at, vector, result)
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+
+    def stats(self):
+        lookups = self.hits + self.similar_hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'similar_hits': self.similar_hits,
+            'misses': self.misses,
+            'hit_rate': round((self.hits + self.similar_hits) / lookups, 4) if lookups else 0,
+        }
+
+    def lookup(self, question, snapshot, history):
+        """
+        (result atau None, info) untuk dicatat di AIAnalytics.request_data.
+        Key dikembalikan di info['key'] untuk store().
+        """
+        config = get_response_cache_settings()
+        normalized = normalize_question(question)
+        key = (normalized, snapshot.version, conversation_state(history), question_words(normalized))
+        info = {'key': key, 'status': 'miss'}
+        now = time.monotonic()
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] <= now:
+                # Kedaluwarsa dihapus saat diakses; sisanya tergusur LRU
+                del self.entries[key]
+                entry = None
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                info['status'] = 'hit'
+                return entry[2], info
+
+        threshold = config['SIMILARITY_THRESHOLD']
+        if threshold is not None:
+            vector = tfidf_vector(question, get_index(snapshot))
+            info['vector'] = vector
+            best, best_key = 0.0, None
+            with self.lock:
+                for entry_key, (expires_at, entry_vector, _) in self.entries.items():
+                    if entry_key[1:] != key[1:] or expires_at <= now:
+                        continue
+                    similarity = cosine(vector, entry_vector)
+                    if similarity > best:
+                        best, best_key = similarity, entry_key
+                if best_key is not None and best >= threshold:
+                    self.entries.move_to_end(best_key)
+                    self.similar_hits += 1
+                    info.update(status='similar', similarity=round(best, 4))
+                    return self.entries[best_key][2], info
+                self.misses += 1
+        else:
+            with self.lock:
+                self.misses += 1
+        return None, info
+
+    def store(self, info, result, snapshot):
+        config = get_response_cache_settings()
+        vector = info.get('vector')
+        if vector is None and config['SIMILARITY_THRESHOLD'] is not None:
+            vector = tfidf_vector(info['key'][0], get_index(snapshot))
+        with self.lock:
+            self.entries[info['key']] = (time.monotonic() + config['TTL'], vector or {}, result)
+            self.entries.move_to_end(info['key'])
+            while len(self.entries) > config['MAX_ENTRIES']:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.similar_hits = self.misses = 0
+
+
+# Satu cache per proses, dipakai semua instance GeminiService
+response_cache = SemanticResponseCache()
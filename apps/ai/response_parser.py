@@ -0,0 +1,70 @@
+"""
+Parser format jawaban LLM chatbot (RESPONSE: / TYPE: / ITEMS:) yang bisa
+diberi teks sedikit demi sedikit (streaming).
+
+feed() mengembalikan potongan teks RESPONSE yang baru, sehingga penanda
+TYPE:/ITEMS: tidak pernah ikut terkirim ke pengguna, walaupun penanda itu
+terpotong di antara dua chunk. Hasil akhir di `parts` sama dengan parsing
+baris per baris atas teks lengkap.
+"""
+
+MARKERS = ('RESPONSE:', 'TYPE:', 'ITEMS:')
+
+
+class StructuredResponseParser:
+    def __init__(self):
+        self.parts = {
+            'text': '',
+            'type': 'unknown',
+            'items': []
+        }
+        self.section = None
+        self.buffer = ''  # baris yang belum lengkap
+        self.sent = ''  # teks RESPONSE yang sudah dikembalikan feed()
+
+    @staticmethod
+    def apply_line(line, parts, section):
+        """Terapkan satu baris ke `parts`, kembalikan section berikutnya"""
+        line = line.strip()
+        if line.startswith('RESPONSE:'):
+            parts['text'] = line.replace('RESPONSE:', '').strip()
+            return 'response'
+        if line.startswith('TYPE:'):
+            parts['type'] = line.replace('TYPE:', '').strip().lower()
+            return 'type'
+        if line.startswith('ITEMS:'):
+            items = line.replace('ITEMS:', '').strip()
+            parts['items'] = [item.strip() for item in items.split(',') if item.strip()]
+            return 'items'
+        if section == 'response' and line:
+            parts['text'] += ' ' + line
+        return section
+
+    def feed(self, chunk):
+        self.buffer += chunk
+        *lines, self.buffer = self.buffer.split('\n')
+        for line in lines:
+            self.section = self.apply_line(line, self.parts, self.section)
+
+        text = self.parts['text']
+        partial = self.buffer.strip()
+        # Baris yang belum lengkap ikut dikirim, kecuali masih bisa menjadi penanda
+        if partial and not any(marker.startswith(partial) for marker in MARKERS):
+            preview = dict(self.parts)
+            self.apply_line(self.buffer, preview, self.section)
+            text = preview['text']
+        return self._delta(text)
+
+    def close(self):
+        """Proses sisa buffer; kembalikan potongan teks terakhir"""
+        if self.buffer:
+            self.section = self.apply_line(self.buffer, self.parts, self.section)
+            self.buffer = ''
+        return self._delta(self.parts['text'])
+
+    def _delta(self, text):
+        # RESPONSE: kedua mengganti teks: berhenti mengirim, teks final ada di `parts`
+        if not text.startswith(self.sent):
+            return ''
+        delta, self.sent = text[len(self.sent):], text
+        return delta
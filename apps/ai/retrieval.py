@@ -0,0 +1,241 @@
+"""
+Retrieval BM25 lokal untuk memangkas KONTEKS DATA di prompt chatbot.
+
+Setiap item knowledge (apps.ai.knowledge) di-tokenize dengan tokenizer yang
+paham bahasa Indonesia (stopword, partikel -lah/-kah/-pun, posesif -nya/-ku/-mu,
+sufiks -kan/-an). Index disusun per kategori: saat konten berubah hanya
+kategori yang generasinya berubah yang di-tokenize ulang. Skor BM25 dihitung
+dengan NumPy dari posting list per term, lalu item teratas dimasukkan ke prompt
+sampai batas token.
+"""
+import math
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass
+
+import numpy as np
+from django.conf import settings
+from django.utils.html import strip_tags
+
+from apps.core.stats_cache import record_refresh
+
+DEFAULT_RETRIEVAL_SETTINGS = {
+    'ENABLED': True,
+    'TOP_K': 8,             # Item maksimal di KONTEKS DATA
+    'TOKEN_BUDGET': 1500,   # Perkiraan token maksimal KONTEKS DATA
+    'K1': 1.5,
+    'B': 0.75,
+    'TITLE_WEIGHT': 3,      # Token judul dihitung beberapa kali
+}
+
+INDEX_KEY = 'ai_retrieval_index'
+
+# Perkiraan kasar token LLM untuk teks Indonesia/Inggris
+CHARS_PER_TOKEN = 4
+
+STOPWORDS = frozenset("""
+    ada adalah agar akan aku anda apa apakah atau bagaimana banyak bisa boleh buat
+    dan dari dalam dengan di dia dimana ini itu jadi jika juga kalau kamu kami kan
+    karena ke kita lagi lain mana mau saja sama sangat saya sebagai sedang sekali
+    seperti siapa sini situ soal sudah supaya tahu tapi tentang tersebut untuk yang ya
+    yuk nih dong deh sih lho gimana dimanakah berapa kapan mengapa kenapa tolong
+    ceritakan cerita info informasi the a an of to in and or is are what where
+""".split())
+
+PARTICLES = ('lah', 'kah', 'pun')
+POSSESSIVES = ('nya', 'ku', 'mu')
+DERIVATIONAL = ('kan', 'an')
+MIN_STEM = 4
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+_lock = threading.Lock()
+# (versi snapshot, index) sebagai satu tuple, diganti dengan satu assignment
+_local = {'current': (None, None)}
+# kategori -> Segment terakhir (per proses)
+_segments = {}
+
+
+def get_retrieval_settings():
+    return {**DEFAULT_RETRIEVAL_SETTINGS, **getattr(settings, 'AI_RETRIEVAL', {})}
+
+
+def normalize(text):
+    """Huruf kecil, tanpa diakritik dan tag HTML"""
+    text = unicodedata.normalize('NFKD', strip_tags(text or ''))
+    return ''.join(char for char in text if not unicodedata.combining(char)).lower()
+
+
+def _strip_suffix(token, suffixes):
+    for suffix in suffixes:
+        if token.endswith(suffix) and len(token) - len(suffix) >= MIN_STEM:
+            return token[:-len(suffix)]
+    return token
+
+
+def stem(token):
+    """Stemming ringan: partikel, lalu posesif, lalu satu sufiks derivasional"""
+    for suffixes in (PARTICLES, POSSESSIVES, DERIVATIONAL):
+        token = _strip_suffix(token, suffixes)
+    return token
+
+
+def tokenize(text):
+    return [stem(token) for token in TOKEN_RE.findall(normalize(text)) if len(token) > 1 and token not in STOPWORDS]
+
+
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+@dataclass(frozen=True)
+class Segment:
+    """Item satu kategori yang sudah di-tokenize, untuk generasi tertentu"""
+    generation: object
+    items: tuple
+    terms: tuple  # Counter term per item
+
+
+def build_segment(items, generation, title_weight):
+    terms = tuple(
+        Counter(tokenize(item['content'])) + Counter({
+            term: count * (title_weight - 1) for term, count in Counter(tokenize(item['title'])).items()
+        })
+        for item in items
+    )
+    return Segment(generation=generation, items=tuple(items), terms=terms)
+
+
+class BM25Index:
+    """Posting list per term (array doc id + tf) dan panjang dokumen"""
+
+    def __init__(self, segments, k1=1.5, b=0.75):
+        self.k1, self.b = k1, b
+        self.items = []
+        postings = {}
+        lengths = []
+        for segment in segments:
+            for item, terms in zip(segment.items, segment.terms):
+                doc = len(self.items)
+                self.items.append(item)
+                lengths.append(sum(terms.values()))
+                for term, tf in terms.items():
+                    postings.setdefault(term, ([], []))
+                    postings[term][0].append(doc)
+                    postings[term][1].append(tf)
+
+        count = len(self.items)
+        self.doc_len = np.asarray(lengths, dtype=np.float32)
+        self.avgdl = float(self.doc_len.mean()) if count else 0.0
+        self.postings = {}
+        for term, (docs, tfs) in postings.items():
+            df = len(docs)
+            idf = math.log(1 + (count - df + 0.5) / (df + 0.5))
+            self.postings[term] = (np.asarray(docs, dtype=np.int32), np.asarray(tfs, dtype=np.float32), idf)
+        # idf term yang tidak ada di katalog (df = 0), nilai tertinggi yang mungkin
+        self.oov_idf = math.log(1 + (count + 0.5) / 0.5)
+
+    def __len__(self):
+        return len(self.items)
+
+    def scores(self, query):
+        scores = np.zeros(len(self.items), dtype=np.float32)
+        if not self.items:
+            return scores
+        norm = self.k1 * (1 - self.b + self.b * self.doc_len / self.avgdl)
+        for term in set(tokenize(query)):
+            if term not in self.postings:
+                continue
+            docs, tfs, idf = self.postings[term]
+            scores[docs] += idf * tfs * (self.k1 + 1) / (tfs + norm[docs])
+        return scores
+
+    def search(self, query, k):
+        """[(score, item)] k teratas dengan skor > 0, urut skor tertinggi"""
+        scores = self.scores(query)
+        k = min(k, len(scores))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(float(scores[doc]), self.items[doc]) for doc in top if scores[doc] > 0]
+
+
+def get_index(snapshot):
+    """Index BM25 untuk snapshot knowledge, hanya kategori yang berubah yang di-tokenize ulang"""
+    version, index = _local['current']
+    if version == snapshot.version:
+        return index
+
+    with _lock:
+        version, index = _local['current']
+        if version == snapshot.version:
+            return index
+        config = get_retrieval_settings()
+        start = time.perf_counter()
+        segments = []
+        for category, items in snapshot.items.items():
+            generation = snapshot.generations.get(category)
+            segment = _segments.get(category)
+            if segment is None or segment.generation != generation:
+                segment = build_segment(items, generation, config['TITLE_WEIGHT'])
+                _segments[category] = segment
+            segments.append(segment)
+        index = BM25Index(segments, k1=config['K1'], b=config['B'])
+        record_refresh(INDEX_KEY, (time.perf_counter() - start) * 1000)
+        _local['current'] = (snapshot.version, index)
+    return index
+
+
+def _format(selected):
+    """Item terpilih dikelompokkan per kategori, format sama dengan KONTEKS DATA penuh"""
+    parts = []
+    for category in dict.fromkeys(item['type'] for item in selected):
+        parts.append(f"\n=== {category.upper()} ===")
+        parts += [item['content'] for item in selected if item['type'] == category]
+    return "\n".join(parts)
+
+
+def catalogue(snapshot, budget):
+    """Daftar judul per kategori (tanpa deskripsi) jika tidak ada item yang relevan"""
+    parts, used = [], 0
+    for category, items in snapshot.items.items():
+        for index, item in enumerate(items):
+            line = f"- {item['title']}" + (f" ({item['location']})" if item.get('location') else '')
+            if index == 0:
+                line = f"\n=== {category.upper()} ===\n{line}"
+            used += estimate_tokens(line)
+            if used > budget:
+                return "\n".join(parts)
+            parts.append(line)
+    return "\n".join(parts)
+
+
+def select_context(snapshot, query, top_k=None, budget=None):
+    """
+    KONTEKS DATA untuk `query`: item paling relevan (BM25) sampai `top_k` item
+    dan `budget` token. Item yang melebihi sisa budget dilewati; item pertama
+    dipotong jika sendirian sudah melebihi budget.
+    """
+    config = get_retrieval_settings()
+    top_k = top_k or config['TOP_K']
+    budget = budget or config['TOKEN_BUDGET']
+
+    hits = get_index(snapshot).search(query, top_k)
+    if not hits:
+        return catalogue(snapshot, budget)
+
+    selected, used = [], 0
+    for _, item in hits:
+        tokens = estimate_tokens(item['content'])
+        if not selected and tokens > budget:
+            selected.append({**item, 'content': item['content'][:budget * CHARS_PER_TOKEN]})
+            break
+        if used + tokens > budget:
+            continue
+        selected.append(item)
+        used += tokens
+    return _format(selected)
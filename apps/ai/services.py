@@ -1,12 +1,11 @@
 import google.generativeai as genai
 from django.conf import settings
 from django.core.cache import cache
-from django.db.models import Q
-from apps.destinations.models import Destinations
-from apps.fauna.models import Fauna
-from apps.flora.models import Flora
-from apps.health.models import Health
-from apps.kuliner.models import Kuliner
+from .knowledge import get_snapshot
+from .matcher import get_matcher
+from .response_parser import StructuredResponseParser
+from .response_cache import get_response_cache_settings, response_cache
+from .retrieval import get_retrieval_settings, select_context
 import random
 import re
 
@@ -15,6 +14,11 @@ class GeminiService:
         genai.configure(api_key=settings.API_GEMINI_KEY)
         self.model = genai.GenerativeModel('gemini-pro')
         self.history_length = 5
+        # False: seluruh katalog masuk KONTEKS DATA (perilaku lama, dipakai benchmark)
+        self.use_retrieval = get_retrieval_settings()['ENABLED']
+        self.use_response_cache = get_response_cache_settings()['ENABLED']
+        # Hasil lookup cache jawaban terakhir (status + hit rate), dicatat di AIAnalytics
+        self.cache_lookup = None
         
         # Template untuk respons yang lebih ramah
         self.friendly_responses = {
@@ -68,78 +72,17 @@ class GeminiService:
                 formatted.append(f"Referenced Items: {', '.join(refs)}")
         return "\n".join(formatted)
 
-    def _get_model_data(self, model, type_name):
-        items = []
-        for item in model.objects.all():
-            data = {
-                'type': type_name,
-                'id': item.id,
-                'title': item.title,
-                'description': item.description
-            }
-            
-            # Pengaturan konten berdasarkan tipe data
-            if type_name == 'destination':
-                if hasattr(item, 'location'):
-                    data['location'] = item.location
-                    data['content'] = (
-                        f"Destinasi: {item.title}\n"
-                        f"Lokasi: {item.location}\n"
-                        f"Deskripsi: {item.description}\n"
-                    )
-            elif type_name == 'culinary':
-                # Khusus untuk kuliner, tambahkan informasi spesifik
-                data['content'] = (
-                    f"Kuliner: {item.title}\n"
-                    f"Deskripsi: {item.description}\n"
-                    f"Lokasi: {item.location if hasattr(item, 'location') else 'Bogor'}\n"
-                    f"Karakteristik: Makanan khas Bogor\n"
-                )
-            elif type_name == 'health':
-                # Khusus untuk informasi kesehatan
-                data['content'] = (
-                    f"Informasi Kesehatan: {item.title}\n"
-                    f"Detail: {item.description}\n"
-                    f"Lokasi Fasilitas: {item.location if hasattr(item, 'location') else 'Bogor'}\n"
-                    f"Kategori: Layanan Kesehatan Bogor\n"
-                )
-            elif type_name == 'flora':
-                # Khusus untuk flora
-                data['content'] = (
-                    f"Flora: {item.title}\n"
-                    f"Deskripsi: {item.description}\n"
-                    f"Habitat: Daerah Bogor\n"
-                    f"Karakteristik: Tumbuhan khas Bogor\n"
-                )
-            elif type_name == 'fauna':
-                # Khusus untuk fauna
-                data['content'] = (
-                    f"Fauna: {item.title}\n"
-                    f"Deskripsi: {item.description}\n"
-                    f"Habitat: Daerah Bogor\n"
-                    f"Karakteristik: Hewan khas Bogor\n"
-                )
-            
-            items.append(data)
-        return items
-
     def get_context_data(self):
-        all_data = {
-            'destination': self._get_model_data(Destinations, 'destination'),
-            'fauna': self._get_model_data(Fauna, 'fauna'),
-            'flora': self._get_model_data(Flora, 'flora'),
-            'health': self._get_model_data(Health, 'health'),
-            'culinary': self._get_model_data(Kuliner, 'culinary')
-        }
-        
-        context_parts = []
-        for category, items in all_data.items():
-            if items:
-                context_parts.append(f"\n=== {category.upper()} ===")
-                for item in items:
-                    context_parts.append(item['content'])
-        
-        return "\n".join(context_parts), all_data
+        """(teks KONTEKS DATA, item per kategori) dari snapshot knowledge yang di-cache"""
+        snapshot = get_snapshot()
+        return snapshot.context_text, snapshot.items
+
+    def get_prompt_context(self, snapshot, user_input, history):
+        """KONTEKS DATA untuk prompt: item yang relevan dengan pertanyaan (dan pertanyaan sebelumnya)"""
+        if not self.use_retrieval:
+            return snapshot.context_text
+        query = " ".join([conv['user'] for conv in history[-1:]] + [user_input])
+        return select_context(snapshot, query)
 
     def _get_friendly_response(self, response_type, *args):
         """Get random friendly response from templates"""
@@ -147,7 +90,22 @@ class GeminiService:
         return template.format(*args) if args else template
 
     def get_response(self, user_input, session_id):
-        context_text, all_data = self.get_context_data()
+        """Jawaban lengkap: {'text', 'intent', 'content_references'}"""
+        for event, data in self._respond(user_input, session_id, stream=False):
+            if event == 'done':
+                return data
+
+    def stream_response(self, user_input, session_id):
+        """
+        Generator (event, data): ('chunk', potongan teks RESPONSE dari model)
+        selama model streaming, lalu ('done', result) dengan teks final yang
+        sudah diproses (sapaan, follow-up) dan content_references.
+        """
+        return self._respond(user_input, session_id, stream=True)
+
+    def _respond(self, user_input, session_id, stream):
+        snapshot = get_snapshot()
+        all_data = snapshot.items
         conversation_history = self._get_conversation_history(session_id)
         history_text = self._format_conversation_history(conversation_history)
         
@@ -156,22 +114,16 @@ class GeminiService:
             clean = re.compile('<.*?>')
             return re.sub(clean, '', text)
         
-        # Cek dulu apakah mencari item spesifik
-        user_keywords = user_input.lower().split()
-        found_specific_items = []
-        for category, items in all_data.items():
-            for item in items:
-                # Cek apakah nama item ada dalam pertanyaan user
-                if item['title'].lower() in user_input.lower():
-                    found_specific_items.append({
-                        'category': category,
-                        'item': item
-                    })
+        # Cek dulu apakah mencari item spesifik: satu scan untuk semua judul
+        matcher = get_matcher(snapshot)
+        found_specific_items = matcher.find(user_input)
         
         # Jika menemukan item spesifik, berikan detail tentang item tersebut
         if found_specific_items:
-            item = found_specific_items[0]['item']  # Ambil item pertama yang cocok
-            category = found_specific_items[0]['category']
+            # Judul terpanjang didahulukan, lalu yang paling awal disebut
+            match = max(found_specific_items, key=lambda match: (len(match), -match.start))
+            item = match.item
+            category = match.category
             
             response_text = (
                 f"Aku punya informasi tentang {item['title']} nih! 😊\n\n"
@@ -183,7 +135,7 @@ class GeminiService:
             
             response_text += "\n\nAda yang ingin ditanyakan lagi? 😉"
             
-            return {
+            yield 'done', {
                 'text': response_text,
                 'intent': category,
                 'content_references': [{
@@ -193,6 +145,7 @@ class GeminiService:
                     'location': item.get('location', 'Bogor')
                 }]
             }
+            return
         
         # Jika tidak menemukan item spesifik, lanjut ke pengecekan rekomendasi
         is_asking_recommendation = any(word in user_input.lower() 
@@ -231,7 +184,7 @@ class GeminiService:
                         f"Mau tau lebih detail tentang salah satunya? Tanya aja ya! 😉"
                     )
                     
-                    return {
+                    yield 'done', {
                         'text': response_text,
                         'intent': category,
                         'content_references': [{
@@ -241,9 +194,23 @@ class GeminiService:
                             'location': item.get('location', 'Bogor')
                         } for item in items]
                     }
+                    return
         
         # Lanjutkan dengan logika normal jika bukan pertanyaan kategori
         try:
+            cache_info = None
+            if self.use_response_cache:
+                cached, cache_info = response_cache.lookup(user_input, snapshot, conversation_history)
+                self.cache_lookup = {
+                    **{key: cache_info[key] for key in ('status', 'similarity') if key in cache_info},
+                    **response_cache.stats(),
+                }
+                if cached is not None:
+                    self._update_conversation_history(session_id, user_input, cached)
+                    yield 'done', dict(cached)
+                    return
+
+            context_text = self.get_prompt_context(snapshot, user_input, conversation_history)
             prompt = f"""
             Kamu adalah Celya, asisten virtual yang ramah dan bersahabat untuk website ekowisata di daerah Bogor. 
             Gunakan bahasa yang santai, natural, dan mengalir seperti berbicara dengan teman.
@@ -347,39 +314,26 @@ class GeminiService:
         Mau tau lebih detail tentang destinasi tertentu? Tanya aja ya! 😉"
         """
 
-            response = self.model.generate_content(prompt)
-            response_text = response.text.strip()
-            
-            # Parse response parts
-            response_parts = {
-                'text': '',
-                'type': 'unknown',
-                'items': []
-            }
-            
-            current_section = None
-            for line in response_text.split('\n'):
-                line = line.strip()
-                if line.startswith('RESPONSE:'):
-                    current_section = 'response'
-                    response_parts['text'] = line.replace('RESPONSE:', '').strip()
-                elif line.startswith('TYPE:'):
-                    current_section = 'type'
-                    response_parts['type'] = line.replace('TYPE:', '').strip().lower()
-                elif line.startswith('ITEMS:'):
-                    current_section = 'items'
-                    items = line.replace('ITEMS:', '').strip()
-                    response_parts['items'] = [item.strip() for item in items.split(',') if item.strip()]
-                elif current_section == 'response' and line:
-                    response_parts['text'] += ' ' + line
+            parser = StructuredResponseParser()
+            if stream:
+                for chunk in self.model.generate_content(prompt, stream=True):
+                    delta = parser.feed(chunk.text)
+                    if delta:
+                        yield 'chunk', delta
+            else:
+                parser.feed(self.model.generate_content(prompt).text.strip())
+            delta = parser.close()
+            if delta and stream:
+                yield 'chunk', delta
+            response_parts = parser.parts
 
             # Validate that mentioned items exist in context
             valid_items = []
             if response_parts['type'] in all_data:
-                available_titles = [item['title'].lower() for item in all_data[response_parts['type']]]
-                for item in response_parts['items']:
-                    if item.lower() in available_titles:
-                        valid_items.append(item)
+                for name in response_parts['items']:
+                    for item in matcher.lookup(name, response_parts['type']):
+                        if not any(item['id'] == valid['id'] for valid in valid_items):
+                            valid_items.append(item)
                     
             # Handle unknown topics or locations outside Bogor
             if "Kutai" in user_input or (not valid_items and response_parts['items']):
@@ -392,17 +346,15 @@ class GeminiService:
             else:
                 # Find content references only for valid items
                 content_references = []
-                if response_parts['type'] in all_data and valid_items:
-                    for item in all_data[response_parts['type']]:
-                        if any(ref.lower() in item['title'].lower() for ref in valid_items):
-                            ref_data = {
-                                'type': response_parts['type'],
-                                'id': item['id'],
-                                'name': item['title']
-                            }
-                            if 'location' in item:
-                                ref_data['location'] = item['location']
-                            content_references.append(ref_data)
+                for item in valid_items:
+                    ref_data = {
+                        'type': response_parts['type'],
+                        'id': item['id'],
+                        'name': item['title']
+                    }
+                    if 'location' in item:
+                        ref_data['location'] = item['location']
+                    content_references.append(ref_data)
 
             # If no valid items found but we're asking about destinations in Bogor
             if not content_references and 'bogor' in user_input.lower() and 'wisata' in user_input.lower():
@@ -439,12 +391,14 @@ class GeminiService:
                 'content_references': content_references
             }
             
+            if cache_info is not None:
+                response_cache.store(cache_info, result, snapshot)
             self._update_conversation_history(session_id, user_input, result)
-            return result
+            yield 'done', result
 
         except Exception as e:
             print(f"Error in get_response: {str(e)}")
-            return {
+            yield 'done', {
                 'text': self._get_friendly_response('not_found', 'informasi tersebut', 'hal-hal menarik'),
                 'intent': 'error',
                 'content_references': []
@@ -0,0 +1,35 @@
+"""Statistik AI analytics yang di-cache dan bisa di-precompute (command precompute_stats)"""
+from datetime import timedelta
+
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from apps.core.stats_cache import register_stats
+
+from .models import AIAnalytics
+
+AI_ANALYTICS_KEY = 'ai_analytics_dashboard_data'
+
+
+def compute_ai_analytics():
+    last_24h = timezone.now() - timedelta(hours=24)
+    # Semua counter dalam satu query agregasi
+    totals = AIAnalytics.objects.aggregate(
+        total_requests=Count('id'),
+        successful_requests=Count('id', filter=Q(success=True)),
+        requests_24h=Count('id', filter=Q(timestamp__gte=last_24h)),
+    )
+
+    # Statistik per endpoint
+    endpoint_stats = (
+        AIAnalytics.objects.values('endpoint')
+        .annotate(count=Count('id'))
+        .order_by('-count')
+    )
+    return {
+        **totals,
+        'endpoint_stats': {item['endpoint']: item['count'] for item in endpoint_stats},
+    }
+
+
+register_stats(AI_ANALYTICS_KEY, compute_ai_analytics)
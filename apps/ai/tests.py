@@ -1,6 +1,20 @@
-from django.test import TestCase
+import json
+from io import StringIO
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework.test import APIRequestFactory
+from django.test import RequestFactory, TestCase, override_settings
 from django.core.cache import cache
+from django.core.management import call_command
+from django.urls import resolve
 from django.utils.text import slugify
+from types import SimpleNamespace
+from unittest.mock import patch
+from . import knowledge, retrieval
+from .matcher import TitleMatcher, get_matcher
+from .middleware import AIAnalyticsMiddleware
+from .models import AIAnalytics
+from .response_parser import StructuredResponseParser
+from .response_cache import conversation_state, normalize_question, question_words, response_cache
 from .services import GeminiService
 from apps.destinations.models import Destinations
 from apps.fauna.models import Fauna
@@ -158,3 +172,372 @@ class ChatbotTest(TestCase):
     def tearDown(self):
         # Clean up test data
         cache.clear()
+
+
+class KnowledgeSnapshotTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        knowledge._local['snapshot'] = None
+        self.destination = Destinations.objects.create(
+            title="Kebun Raya Bogor",
+            description="Kebun raya tertua di Indonesia",
+            location="Bogor, Jawa Barat",
+            slug=slugify("Kebun Raya Bogor")
+        )
+
+    def test_snapshot_is_reused_until_content_changes(self):
+        first = knowledge.get_snapshot()
+
+        # Versi sama: memori proses, tanpa query
+        with self.assertNumQueries(0):
+            self.assertIs(knowledge.get_snapshot(), first)
+
+        # Worker lain (memori kosong) memakai snapshot di cache
+        knowledge._local['snapshot'] = None
+        with self.assertNumQueries(0):
+            self.assertEqual(knowledge.get_snapshot().version, first.version)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Kuliner.objects.create(title="Sate Kuningan", description="Kuliner khas Bogor", slug="sate-kuningan")
+        changed = knowledge.get_snapshot()
+
+        self.assertNotEqual(changed.version, first.version)
+        self.assertEqual([item['title'] for item in changed.items['culinary']], ["Sate Kuningan"])
+        self.assertIn("Kuliner: Sate Kuningan", changed.context_text)
+        self.assertEqual(knowledge.get_build_metrics()['refreshes'], 2)
+
+    def test_context_format(self):
+        context_text, all_data = GeminiService().get_context_data()
+
+        self.assertEqual(all_data['destination'][0]['location'], "Bogor, Jawa Barat")
+        self.assertTrue(context_text.startswith("\n=== DESTINATION ===\nDestinasi: Kebun Raya Bogor\n"))
+
+    def test_specific_item_uses_title_matcher(self):
+        response = GeminiService().get_response("Ceritakan tentang kebun  RAYA bogor dong", "matcher_session")
+
+        self.assertEqual(response['intent'], 'destination')
+        self.assertEqual(response['content_references'][0]['id'], self.destination.id)
+
+    def test_prebuild_command(self):
+        out = StringIO()
+        call_command('prebuild_knowledge', stdout=out)
+        call_command('prebuild_knowledge', '--status', stdout=out)
+
+        self.assertIn('1 item(s)', out.getvalue())
+        self.assertIn('1 build(s)', out.getvalue())
+
+
+class RetrievalTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        knowledge._local['snapshot'] = None
+        retrieval._local['current'] = (None, None)
+        retrieval._segments.clear()
+        self.destination = Destinations.objects.create(
+            title="Curug Leuwi Hejo",
+            description="<p>Air terjun dengan kolam alami berwarna hijau untuk berenang</p>",
+            location="Babakan Madang",
+            slug="curug-leuwi-hejo"
+        )
+        Fauna.objects.create(
+            destinations=self.destination,
+            title="Owa Jawa",
+            description="Primata endemik yang hidup di hutan pegunungan",
+            slug="owa-jawa"
+        )
+        Kuliner.objects.create(title="Soto Mie", description="Makanan berkuah khas dengan risol", slug="soto-mie")
+
+    def test_tokenize(self):
+        self.assertEqual(retrieval.tokenize("Dimanakah <b>makanannya</b>, Café?"), ['makan', 'cafe'])
+        self.assertEqual(retrieval.stem('taman'), 'taman')
+
+    def test_search_ranks_relevant_items(self):
+        index = retrieval.get_index(knowledge.get_snapshot())
+
+        hits = index.search("tempat berenang di air terjun", 2)
+
+        self.assertEqual([item['title'] for _, item in hits], ["Curug Leuwi Hejo"])
+        self.assertEqual(index.search("hotel bintang lima", 5), [])
+
+    def test_select_context_respects_budget(self):
+        snapshot = knowledge.get_snapshot()
+
+        context = retrieval.select_context(snapshot, "primata di hutan")
+        tiny = retrieval.select_context(snapshot, "primata di hutan", budget=5)
+        fallback = retrieval.select_context(snapshot, "hotel bintang lima")
+
+        self.assertIn("Fauna: Owa Jawa", context)
+        self.assertNotIn("Soto Mie", context)
+        self.assertTrue(tiny.endswith("Fauna: Owa Jawa\nDesk"))
+        self.assertIn("- Soto Mie", fallback)
+        self.assertNotIn("Deskripsi", fallback)
+
+    def test_index_rebuilds_only_changed_category(self):
+        retrieval.get_index(knowledge.get_snapshot())
+        fauna_segment = retrieval._segments['fauna']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Kuliner.objects.create(title="Asinan Bogor", description="Asinan sayur dan buah", slug="asinan-bogor")
+        index = retrieval.get_index(knowledge.get_snapshot())
+
+        self.assertIs(retrieval._segments['fauna'], fauna_segment)
+        self.assertEqual(index.search("asinan buah", 1)[0][1]['title'], "Asinan Bogor")
+
+    def test_prompt_only_contains_retrieved_items(self):
+        prompts = []
+        service = GeminiService()
+        service.model = SimpleNamespace(generate_content=lambda prompt: prompts.append(prompt) or SimpleNamespace(
+            text="RESPONSE: Di Bogor ada Owa Jawa\nTYPE: fauna\nITEMS: Owa Jawa"
+        ))
+
+        response = service.get_response("Primata apa yang hidup di hutan?", "retrieval_session")
+
+        self.assertIn("Fauna: Owa Jawa", prompts[0])
+        self.assertNotIn("Soto Mie", prompts[0])
+        self.assertEqual(response['content_references'][0]['name'], "Owa Jawa")
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command('benchmark_retrieval', '--rounds', '1', '--base-ms', '0', '--ms-per-1k-tokens', '0', stdout=out)
+
+        self.assertIn('retrieval:', out.getvalue())
+
+
+class TitleMatcherTest(TestCase):
+    def setUp(self):
+        self.kebun = {'id': 1, 'title': "Kebun Raya"}
+        self.kebun_bogor = {'id': 2, 'title': "Kebun Raya Bogor"}
+        self.cafe = {'id': 3, 'title': "Café  Kopi"}
+        self.owa = {'id': 4, 'title': "Owa"}
+        self.matcher = TitleMatcher({
+            'destination': [self.kebun, self.kebun_bogor],
+            'culinary': [self.cafe],
+            'fauna': [self.owa],
+        })
+
+    def test_find_all_with_positions(self):
+        text = "Dari KEBUN  raya bogor ke cafe kopi"
+        matches = self.matcher.find_all(text)
+
+        self.assertEqual([match.item['id'] for match in matches], [2, 1, 3])
+        self.assertEqual(text[matches[0].start:matches[0].end], "KEBUN  raya bogor")
+        self.assertEqual(text[matches[2].start:matches[2].end], "cafe kopi")
+
+    def test_find_prefers_longest_and_word_boundaries(self):
+        matches = self.matcher.find("Kebun Raya Bogor dan bowa, lalu owa!")
+
+        self.assertEqual([(match.category, match.item['id']) for match in matches], [('destination', 2), ('fauna', 4)])
+
+    def test_lookup(self):
+        self.assertEqual(self.matcher.lookup(" kebun raya ", 'destination'), [self.kebun])
+        self.assertEqual(self.matcher.lookup("Kebun Raya Bogor (Pusat Kota)", 'destination'), [self.kebun_bogor])
+        self.assertEqual(self.matcher.lookup("Cafe Kopi", 'destination'), [])
+        self.assertEqual(self.matcher.lookup("cafe kopi"), [self.cafe])
+
+    def test_get_matcher_per_snapshot_version(self):
+        first = SimpleNamespace(version='v1', items={'fauna': [self.owa]})
+        second = SimpleNamespace(version='v2', items={'destination': [self.kebun]})
+
+        matcher = get_matcher(first)
+        self.assertIs(get_matcher(first), matcher)
+        rebuilt = get_matcher(second)
+        self.assertIsNot(rebuilt, matcher)
+        self.assertEqual(rebuilt.lookup("Kebun Raya"), [self.kebun])
+
+
+class ResponseCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        response_cache.clear()
+        knowledge._local['snapshot'] = None
+        destination = Destinations.objects.create(
+            title="Curug Leuwi Hejo", description="Air terjun", location="Babakan Madang", slug="curug-leuwi-hejo"
+        )
+        Fauna.objects.create(
+            destinations=destination, title="Owa Jawa", description="Primata endemik di hutan", slug="owa-jawa"
+        )
+        self.prompts = []
+        self.service = GeminiService()
+        self.service.model = SimpleNamespace(generate_content=lambda prompt: self.prompts.append(prompt) or SimpleNamespace(
+            text="RESPONSE: Di Bogor ada Owa Jawa\nTYPE: fauna\nITEMS: Owa Jawa"
+        ))
+
+    def test_normalization_and_state(self):
+        self.assertEqual(normalize_question("  Primata   APA di hután?! "), "primata apa di hutan")
+        self.assertEqual(question_words("dimanakah dan kapan buka"), "dimana,kapan")
+        self.assertEqual(conversation_state([]), 'new')
+        self.assertEqual(conversation_state([{'references': [{'type': 'fauna', 'id': 2}]}]), 'continuing:fauna-2')
+
+    def test_exact_and_similar_hits(self):
+        first = self.service.get_response("Primata apa yang hidup di hutan?", "session_a")
+        exact = self.service.get_response("primata apa yang hidup di  hutan", "session_b")
+        self.assertEqual(self.service.cache_lookup['status'], 'hit')
+        similar = self.service.get_response("Primata apa saja yang hidup di hutan", "session_c")
+
+        self.assertEqual(len(self.prompts), 1)
+        self.assertEqual(exact, first)
+        self.assertEqual(similar, first)
+        self.assertEqual(self.service.cache_lookup['status'], 'similar')
+        self.assertEqual(self.service.cache_lookup['hit_rate'], round(2 / 3, 4))
+        # Riwayat percakapan tetap diperbarui saat cache hit
+        self.assertEqual(len(cache.get('chat_history_session_c')), 1)
+
+    def test_different_questions_sharing_catalogue_words_miss(self):
+        Destinations.objects.create(
+            title="Kebun Raya Bogor", description="Taman botani di pusat kota Bogor", location="Bogor", slug="kebun-raya-bogor"
+        )
+        questions = [
+            "hotel murah dekat Bogor",
+            "cuaca di Bogor hari ini",
+            "tiket kereta ke Bogor",
+            "apa saja yang menarik di Bogor",
+        ]
+        for number, question in enumerate(questions):
+            self.service.get_response(question, f"session_{number}")
+
+        self.assertEqual(len(self.prompts), len(questions))
+        self.assertEqual(response_cache.stats()['similar_hits'], 0)
+
+    def test_different_question_words_miss(self):
+        # Tidak ada item "Taman Safari", jadi pertanyaan tidak lewat jalur judul dan sampai ke LLM
+        pairs = [
+            ("Dimana hotel murah di Bogor?", "Kapan hotel murah di Bogor?"),
+            ("Apa itu Taman Safari?", "Dimana Taman Safari?"),
+        ]
+        for number, (first, second) in enumerate(pairs):
+            self.service.get_response(first, f"session_{number}_a")
+            self.service.get_response(second, f"session_{number}_b")
+
+        self.assertEqual(len(self.prompts), 4)
+        self.assertEqual(response_cache.stats()['similar_hits'], 0)
+        # Varian partikel -kah tetap kata tanya yang sama
+        self.service.get_response("Dimanakah Taman Safari?", "session_c")
+        self.assertEqual(self.service.cache_lookup['status'], 'similar')
+
+    def test_miss_on_content_change_or_continuing_conversation(self):
+        self.service.get_response("Primata apa yang hidup di hutan?", "session_a")
+        self.service.get_response("Primata apa yang hidup di hutan?", "session_a")
+        with self.captureOnCommitCallbacks(execute=True):
+            Kuliner.objects.create(title="Soto Mie", description="Kuliner khas", slug="soto-mie")
+        self.service.get_response("Primata apa yang hidup di hutan?", "session_b")
+
+        self.assertEqual(len(self.prompts), 3)
+
+    @override_settings(AI_RESPONSE_CACHE={'MAX_ENTRIES': 1, 'SIMILARITY_THRESHOLD': None})
+    def test_lru_eviction(self):
+        self.service.get_response("Primata apa yang hidup di hutan?", "session_a")
+        self.service.get_response("Air terjun untuk berenang", "session_b")
+        self.service.get_response("Primata apa yang hidup di hutan?", "session_c")
+
+        self.assertEqual(len(self.prompts), 3)
+        self.assertEqual(response_cache.stats()['entries'], 1)
+
+    def test_stats_in_request_data(self):
+        request = RequestFactory().post(
+            '/api/chatbot/chat/', data='{"message": "Halo"}', content_type='application/json'
+        )
+
+        def view(request):
+            request.ai_response_cache = {'status': 'hit', 'hit_rate': 0.5}
+            return JsonResponse({'success': True})
+
+        AIAnalyticsMiddleware(view)(request)
+
+        self.assertEqual(AIAnalytics.objects.get().request_data['response_cache'], {'status': 'hit', 'hit_rate': 0.5})
+
+
+class StreamingChatTest(TestCase):
+    ANSWER = "RESPONSE: Di Bogor ada Owa Jawa,\nprimata endemik.\nTYPE: fauna\nITEMS: Owa Jawa"
+
+    def setUp(self):
+        cache.clear()
+        response_cache.clear()
+        knowledge._local['snapshot'] = None
+        destination = Destinations.objects.create(
+            title="Curug Leuwi Hejo", description="Air terjun", location="Babakan Madang", slug="curug-leuwi-hejo"
+        )
+        self.fauna = Fauna.objects.create(
+            destinations=destination, title="Owa Jawa", description="Primata endemik di hutan", slug="owa-jawa"
+        )
+        # Penanda TYPE:/ITEMS: sengaja terpotong di antara chunk
+        self.chunks = ["RESPONSE: Di Bogor", " ada Owa Jawa,\nprim", "ata endemik.\nTY", "PE: fauna\nIT", "EMS: Owa Jawa"]
+
+        def generate_content(prompt, stream=False):
+            if stream:
+                return [SimpleNamespace(text=chunk) for chunk in self.chunks]
+            return SimpleNamespace(text=self.ANSWER)
+
+        self.service = GeminiService()
+        self.service.model = SimpleNamespace(generate_content=generate_content)
+
+    def test_parser_matches_full_parse(self):
+        parser = StructuredResponseParser()
+        deltas = [parser.feed(chunk) for chunk in self.chunks] + [parser.close()]
+
+        expected = {'text': '', 'type': 'unknown', 'items': []}
+        section = None
+        for line in self.ANSWER.split('\n'):
+            section = StructuredResponseParser.apply_line(line, expected, section)
+        self.assertEqual(parser.parts, expected)
+        self.assertEqual(''.join(deltas), parser.parts['text'])
+        self.assertFalse(any('TYPE' in delta or 'ITEMS' in delta for delta in deltas))
+
+    def test_stream_response_matches_get_response(self):
+        events = list(self.service.stream_response("Primata apa yang hidup di hutan?", "session_a"))
+        chunks = [data for event, data in events if event == 'chunk']
+        event, result = events[-1]
+
+        self.assertEqual(event, 'done')
+        self.assertEqual(''.join(chunks), "Di Bogor ada Owa Jawa, primata endemik.")
+        # Teks final (dengan sapaan/penutup) dikirim di event terakhir
+        self.assertIn(''.join(chunks), result['text'])
+        self.assertEqual(result['intent'], 'fauna')
+        self.assertEqual(result['content_references'][0]['id'], self.fauna.id)
+
+        response_cache.clear()
+        plain = self.service.get_response("Primata apa yang hidup di hutan?", "session_b")
+        # Sapaan dipilih acak; sisanya harus sama dengan jalur non-streaming
+        self.assertEqual((plain['intent'], plain['content_references']), (result['intent'], result['content_references']))
+        self.assertIn(''.join(chunks), plain['text'])
+
+    def test_chat_stream_endpoint_and_time_to_first_token(self):
+        # View dari router, agar renderer_classes milik @action ikut terpasang
+        view = resolve('/api/chatbot/chat-stream/').func
+        # Klien SSE (EventSource/fetch) mengirim Accept: text/event-stream
+        request = APIRequestFactory().post(
+            '/api/chatbot/chat-stream/', {'message': "Primata apa yang hidup di hutan?", 'session_id': 's1'},
+            format='json', HTTP_ACCEPT='text/event-stream'
+        )
+
+        with patch('apps.ai.views.GeminiService', return_value=self.service):
+            response = AIAnalyticsMiddleware(view)(request)
+        self.assertIsInstance(response, StreamingHttpResponse)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        # Dicatat setelah stream habis dibaca, bukan saat view selesai
+        self.assertFalse(AIAnalytics.objects.exists())
+        body = b''.join(response.streaming_content).decode('utf-8')
+
+        events = [block.split('\n', 1) for block in body.strip().split('\n\n')]
+        self.assertEqual({name for name, _ in events}, {'event: chunk', 'event: content_references'})
+        self.assertEqual(events[-1][0], 'event: content_references')
+        final = json.loads(events[-1][1][len('data: '):])
+        self.assertEqual(final['content_references'][0]['name'], "Owa Jawa")
+
+        log = AIAnalytics.objects.get()
+        self.assertTrue(log.request_data['streamed'])
+        self.assertLessEqual(log.request_data['time_to_first_token'], log.response_time)
+        self.assertEqual(log.request_data['response_cache']['status'], 'miss')
+
+    def test_chat_stream_without_message(self):
+        # View dari router, agar renderer_classes milik @action ikut terpasang
+        view = resolve('/api/chatbot/chat-stream/').func
+        factory = APIRequestFactory()
+
+        response = view(factory.post('/api/chatbot/chat-stream/', {}, format='json', HTTP_ACCEPT='text/event-stream'))
+        response.render()
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.content.decode(), 'event: error\ndata: {"error": "Message is required"}\n\n')
+
+        response = view(factory.post('/api/chatbot/chat-stream/', {}, format='json'))
+        response.render()
+        self.assertEqual(json.loads(response.content), {'error': 'Message is required'})
@@ -1,12 +1,36 @@
+from django.http import StreamingHttpResponse
 from django.shortcuts import render
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.renderers import BaseRenderer
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from .models import Intents, Responses, InteractionLogs
 from .serializers import IntentSerializer, ResponseSerializer, InteractionLogSerializer, ChatFeedbackSerializer
 from .services import GeminiService
+import json
 import uuid
 
+
+def sse_event(event, data):
+    """Satu event Server-Sent Events dengan data JSON"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Agar content negotiation menerima `Accept: text/event-stream`. Stream-nya
+    sendiri StreamingHttpResponse; renderer ini hanya dipakai untuk Response
+    biasa (misal 400), yang dikirim sebagai satu event `error`.
+    """
+    media_type = 'text/event-stream'
+    format = 'sse'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return sse_event('error', data).encode(self.charset)
+
+
 class ChatbotViewSet(viewsets.ViewSet):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -30,6 +54,8 @@ class ChatbotViewSet(viewsets.ViewSet):
 
             # Get response from Gemini
             response_data = self.gemini_service.get_response(user_input, session_id)
+            # Dibaca AIAnalyticsMiddleware untuk request_data
+            request._request.ai_response_cache = self.gemini_service.cache_lookup
 
             return Response({
                 'text': response_data['text'],
@@ -45,6 +71,50 @@ class ChatbotViewSet(viewsets.ViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    @action(
+        detail=False, methods=['POST'], url_path='chat-stream',
+        renderer_classes=[*api_settings.DEFAULT_RENDERER_CLASSES, EventStreamRenderer]
+    )
+    def chat_stream(self, request):
+        """
+        Seperti chat, tetapi jawaban dikirim sebagai SSE: event `chunk` ({'text'})
+        selama model menulis, lalu event `content_references` berisi teks final
+        (termasuk sapaan/penutup, menggantikan gabungan chunk), intent,
+        content_references dan session_id.
+        """
+        user_input = request.data.get('message')
+        session_id = request.data.get('session_id') or str(uuid.uuid4())
+
+        if not user_input:
+            return Response(
+                {'error': 'Message is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        def events():
+            try:
+                for event, data in self.gemini_service.stream_response(user_input, session_id):
+                    if event == 'chunk':
+                        yield sse_event('chunk', {'text': data})
+                        continue
+                    # Dibaca AIAnalyticsMiddleware saat stream selesai
+                    request._request.ai_response_cache = self.gemini_service.cache_lookup
+                    yield sse_event('content_references', {
+                        'text': data['text'],
+                        'success': True,
+                        'intent': data['intent'],
+                        'content_references': data['content_references'],
+                        'session_id': session_id
+                    })
+            except Exception as e:
+                yield sse_event('error', {'error': str(e)})
+
+        response = StreamingHttpResponse(events(), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        # Nginx: jangan buffer agar chunk langsung sampai ke browser
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
     @action(detail=False, methods=['POST'])
     def feedback(self, request):
         try:
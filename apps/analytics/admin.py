@@ -1,10 +1,17 @@
 from django.contrib import admin
-from .models import RequestLog, CustomEvent,ComplianceLog
+from .models import RequestLog, CustomEvent,ComplianceLog, RequestDailyRollup, RequestHourlyRollup
 from unfold.admin import ModelAdmin
 from django.urls import path
 from .views import analytics_dashboard_view
+from .resources import get_worker_gauges
+from .ratelimit import get_rate_limits
+from .agents import user_agent_cache_stats
+from .rollups import rollup_distribution
+from .sketches import endpoint_percentiles
+from .dashboard import get_dashboard_metrics
+from apps.core.stats_cache import get_refresh_metrics, get_stats
 from django.utils.html import format_html
-from django.db.models import Count, Avg, Q, ExpressionWrapper, FloatField, Max
+from django.db.models import Count, Avg, Q, ExpressionWrapper, FloatField, Max, Sum
 from django.db.models.functions import Cast
 
 from django.utils import timezone
@@ -16,9 +23,89 @@ from django.db.models.functions import TruncDay, ExtractHour, TruncDate
 from import_export.admin import ImportExportModelAdmin
 from unfold.contrib.import_export.forms import ExportForm, ImportForm, SelectableFieldsExportForm
 
+class RollupValuesFilter(admin.SimpleListFilter):
+    """
+    Pilihan filter diambil dari rollup harian yang kecil, bukan SELECT DISTINCT
+    pada seluruh RequestLog setiap kali changelist dibuka.
+    """
+    rollup_field = None
+
+    def lookups(self, request, model_admin):
+        values = (
+            RequestDailyRollup.objects.exclude(**{self.rollup_field: ''})
+            .values_list(self.rollup_field, flat=True)
+            .order_by(self.rollup_field)
+            .distinct()
+        )
+        return [(value, value) for value in values]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(**{self.parameter_name: self.value()})
+        return queryset
+
+
+def rollup_values_filter(field, title, rollup_field=None):
+    return type(f'{field.title()}RollupFilter', (RollupValuesFilter,), {
+        'title': title,
+        'parameter_name': field,
+        'rollup_field': rollup_field or field,
+    })
+
+
+class RecentValuesFilter(admin.SimpleListFilter):
+    """
+    Filter untuk kolom yang tidak ada di rollup: pilihan diambil dari nilai
+    yang muncul dalam `days` hari terakhir (range di index timestamp) dan
+    di-cache lewat stats cache, bukan SELECT DISTINCT pada seluruh RequestLog.
+    """
+    days = 7
+    ttl = 60 * 60
+
+    def lookups(self, request, model_admin):
+        def compute():
+            since = timezone.now() - timedelta(days=self.days)
+            return list(
+                RequestLog.objects.filter(timestamp__gte=since)
+                .exclude(**{f'{self.parameter_name}__isnull': True})
+                .values_list(self.parameter_name, flat=True)
+                .order_by(self.parameter_name)
+                .distinct()
+            )
+
+        values = get_stats(f'analytics_filter_choices:{self.parameter_name}', compute, ttl=self.ttl)
+        return [(str(value), str(value)) for value in values if value != '']
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(**{self.parameter_name: self.value()})
+        return queryset
+
+
+def recent_values_filter(field, title):
+    return type(f'{field.title().replace("_", "")}RecentFilter', (RecentValuesFilter,), {
+        'title': title,
+        'parameter_name': field,
+    })
+
+
+class StatusClassFilter(admin.SimpleListFilter):
+    title = 'status'
+    parameter_name = 'status_class'
+
+    def lookups(self, request, model_admin):
+        return [(f'{code}xx', f'{code}xx') for code in range(2, 6)]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            first = int(self.value()[0]) * 100
+            return queryset.filter(status_code__gte=first, status_code__lt=first + 100)
+        return queryset
+
+
 @admin.register(RequestLog)
 class RequestLogAdmin(ModelAdmin, ImportExportModelAdmin):
-    RATE_LIMIT = 100
+    RATE_LIMIT = get_rate_limits()['DEFAULT']['limit']
     change_list_template = 'admin/analytics/requestlog/change_list.html'
     
     list_display = (
@@ -29,12 +116,21 @@ class RequestLogAdmin(ModelAdmin, ImportExportModelAdmin):
     )
     
     list_filter = (
-        'method', 'status_code', 'content_type', 
-        'device_type', 'browser', 'os', 'timestamp',
-        'is_error', 'error_type', 'is_throttled',
-        'auth_status', 'is_suspicious', 'auth_method',
-        'user_type', 'feature_accessed', 
-        'interaction_type', 'conversion_goal'
+        'timestamp', 'is_error', 'is_throttled', 'is_suspicious',
+        rollup_values_filter('method', 'method'),
+        StatusClassFilter,
+        recent_values_filter('status_code', 'status code'),
+        recent_values_filter('content_type', 'content type'),
+        rollup_values_filter('device_type', 'device type'),
+        rollup_values_filter('browser', 'browser'),
+        recent_values_filter('os', 'os'),
+        recent_values_filter('error_type', 'error type'),
+        recent_values_filter('auth_status', 'auth status'),
+        recent_values_filter('auth_method', 'auth method'),
+        recent_values_filter('user_type', 'user type'),
+        rollup_values_filter('feature_accessed', 'feature', rollup_field='feature'),
+        recent_values_filter('interaction_type', 'interaction type'),
+        rollup_values_filter('conversion_goal', 'conversion goal'),
     )
     
     search_fields = (
@@ -64,7 +160,10 @@ class RequestLogAdmin(ModelAdmin, ImportExportModelAdmin):
             'classes': ('collapse',)
         }),
         ('Performance Metrics', {
-            'fields': ('db_query_time', 'memory_usage')
+            'fields': (
+                'db_query_time', 'db_query_count', 'db_flags',
+                'memory_usage', 'memory_measurement'
+            )
         }),
         ('Content Information', {
             'fields': ('content_type', 'content_id')
@@ -100,8 +199,9 @@ class RequestLogAdmin(ModelAdmin, ImportExportModelAdmin):
     
     readonly_fields = (
         'endpoint', 'method', 'status_code', 'timestamp', 
-        'response_time', 'ip_address', 'db_query_time', 
-        'memory_usage', 'content_type', 'content_id',
+        'response_time', 'ip_address', 'db_query_time',
+        'db_query_count', 'db_flags',
+        'memory_usage', 'memory_measurement', 'content_type', 'content_id',
         'user_agent', 'device_type', 'browser', 'os', 
         'referrer', 'is_error', 'error_type', 'error_message', 
         'error_stack', 'rate_limit_key', 'rate_limit_count',
@@ -179,174 +279,69 @@ class RequestLogAdmin(ModelAdmin, ImportExportModelAdmin):
         return False
 
     def changelist_view(self, request, extra_context=None):
-        end_date = timezone.now()
-        start_date = end_date - timedelta(days=7)
-        
-        # Calculate error rate
-        total_requests = RequestLog.objects.filter(timestamp__gte=start_date).count()
-        error_requests = RequestLog.objects.filter(
-            timestamp__gte=start_date,
-            is_error=True
-        ).count()
-        
-        error_rate = (error_requests / total_requests * 100) if total_requests > 0 else 0
+        extra_context = extra_context or {}
+        extra_context.update(self.get_dashboard_context())
+        return super().changelist_view(request, extra_context=extra_context)
 
-        # Statistik dasar
-        daily_stats = (
-            RequestLog.objects.filter(timestamp__gte=start_date)
-            .annotate(day=TruncDay('timestamp'))
-            .values('day')
-            .annotate(
-                total_requests=Count('id'),
-                avg_response_time=Avg('response_time'),
-                error_count=Count('id', filter=Q(is_error=True)),
-                success_rate=ExpressionWrapper(
-                    (1 - Cast(Count('id', filter=Q(is_error=True)), FloatField()) / Cast(Count('id'), FloatField())) * 100,
-                    output_field=FloatField()
-                )
-            )
-            .order_by('day')
-        )
+    def get_dashboard_context(self):
+        # KPI dari DashboardMetrics (dipakai bersama analytics_dashboard_view dan template),
+        # breakdown per dimensi juga di-cache dengan stale-while-revalidate
+        metrics = get_dashboard_metrics(7)
+        breakdowns = get_stats('analytics_admin_breakdowns:7', lambda: self.get_breakdowns(metrics.start))
+
+        return {
+            'metrics': metrics,
+            'days_json': json.dumps([day.day for day in metrics.daily]),
+            'requests_json': json.dumps([day.requests for day in metrics.daily]),
+            'response_times_json': json.dumps([day.avg_response_time for day in metrics.daily]),
+            **breakdowns,
+            'performance_stats': {
+                'workers': get_worker_gauges(),
+                'user_agent_cache': user_agent_cache_stats(),
+                'stats_refresh': get_refresh_metrics(),
+            },
+        }
+
+    def get_breakdowns(self, start_date):
+        daily_rollups = RequestDailyRollup.objects.filter(bucket__gte=start_date)
 
         # Top Endpoints
-        top_endpoints = (
-            RequestLog.objects.filter(timestamp__gte=start_date)
-            .values('endpoint')
+        top_endpoints = list(
+            daily_rollups.values('endpoint')
             .annotate(
-                count=Count('id'),
-                avg_response_time=Avg('response_time'),
+                count=Sum('request_count'),
+                avg_response_time=ExpressionWrapper(
+                    Sum('response_time_sum') / Cast(Sum('request_count'), FloatField()),
+                    output_field=FloatField()
+                ),
                 error_rate=ExpressionWrapper(
-                    Cast(Count('id', filter=Q(is_error=True)), FloatField()) / Cast(Count('id'), FloatField()) * 100,
+                    Cast(Sum('error_count'), FloatField()) / Cast(Sum('request_count'), FloatField()) * 100,
                     output_field=FloatField()
                 )
             )
             .order_by('-count')[:10]
         )
 
-        # Browser & Device Stats
-        browser_stats = (
-            RequestLog.objects.filter(timestamp__gte=start_date)
-            .values('browser')
-            .annotate(count=Count('id'))
-            .order_by('-count')
-        )
-        
-        device_stats = (
-            RequestLog.objects.filter(timestamp__gte=start_date)
-            .values('device_type')
-            .annotate(count=Count('id'))
-            .order_by('-count')
-        )
-
-        # Performance Metrics
-        performance_stats = {
-            'avg_db_time': RequestLog.objects.filter(
-                timestamp__gte=start_date
-            ).aggregate(avg=Avg('db_query_time'))['avg'] or 0,
-            'avg_memory': RequestLog.objects.filter(
-                timestamp__gte=start_date
-            ).aggregate(avg=Avg('memory_usage'))['avg'] or 0,
-            'peak_response_time': RequestLog.objects.filter(
-                timestamp__gte=start_date
-            ).aggregate(max=Max('response_time'))['max'] or 0
-        }
+        # Percentile latency dari sketch per endpoint
+        latency = endpoint_percentiles(start_date, [endpoint['endpoint'] for endpoint in top_endpoints])
+        for endpoint in top_endpoints:
+            endpoint['latency'] = latency[endpoint['endpoint']]
 
-        # Security Metrics
-        security_stats = {
-            'suspicious_requests': RequestLog.objects.filter(
-                timestamp__gte=start_date,
-                is_suspicious=True
-            ).count(),
-            'auth_failures': RequestLog.objects.filter(
-                timestamp__gte=start_date,
-                auth_status='failed'
-            ).count(),
-            'throttled_requests': RequestLog.objects.filter(
-                timestamp__gte=start_date,
-                is_throttled=True
-            ).count()
-        }
-
-        # User Engagement
-        user_engagement = {
-            'avg_session_duration': RequestLog.objects.filter(
-                timestamp__gte=start_date
-            ).aggregate(avg=Avg('engagement_time'))['avg'] or 0,
-            'conversion_rate': (
-                RequestLog.objects.filter(
-                    timestamp__gte=start_date,
-                    conversion_goal__isnull=False
-                ).count() /
-                max(RequestLog.objects.filter(
-                    timestamp__gte=start_date
-                ).count(), 1) * 100
-            )
-        }
-
-        # Prepare data untuk charts
-        days = [stat['day'].strftime('%Y-%m-%d') for stat in daily_stats]
-        total_requests_series = [int(stat['total_requests']) for stat in daily_stats]
-        avg_response_times = [
-            round(float(stat['avg_response_time']), 2) if stat['avg_response_time'] 
-            else 0 for stat in daily_stats
-        ]
-
-        # HTTP Methods distribution
-        method_stats = (
-            RequestLog.objects.filter(timestamp__gte=start_date)
-            .values('method')
-            .annotate(count=Count('id'))
-            .order_by('-count')
-        )
-        method_stats_dict = {
-            stat['method']: stat['count'] 
-            for stat in method_stats
-        }
-
-        # Status codes distribution
-        status_code_stats = (
-            RequestLog.objects.filter(timestamp__gte=start_date)
-            .values('status_code')
-            .annotate(count=Count('id'))
-            .order_by('-count')
-        )
-        status_code_stats_dict = {
-            str(stat['status_code']): stat['count'] 
-            for stat in status_code_stats
-        }
-
-        # Convert ke JSON
-        extra_context = extra_context or {}
-        extra_context.update({
-            'days_json': json.dumps(days),
-            'requests_json': json.dumps(total_requests_series),
-            'response_times_json': json.dumps(avg_response_times),
-            'method_stats_json': json.dumps(method_stats_dict),
-            'status_code_stats_json': json.dumps(status_code_stats_dict),
-            'browser_stats_json': json.dumps({
-                stat['browser']: stat['count'] for stat in browser_stats
-            }),
-            'device_stats_json': json.dumps({
-                stat['device_type']: stat['count'] for stat in device_stats
-            }),
+        return {
+            'method_stats_json': json.dumps(rollup_distribution(daily_rollups, 'method')),
+            'status_code_stats_json': json.dumps(rollup_distribution(daily_rollups, 'status_class')),
+            'browser_stats_json': json.dumps(rollup_distribution(daily_rollups, 'browser')),
+            'device_stats_json': json.dumps(rollup_distribution(daily_rollups, 'device_type')),
             'top_endpoints': top_endpoints,
-            'performance_stats': performance_stats,
-            'security_stats': security_stats,
-            'user_engagement': user_engagement,
-            'total_requests_7days': sum(total_requests_series),
-            'error_rate': error_rate,
-            'success_rate': round(100 - error_rate, 1),
             'peak_traffic_hour': self.get_peak_traffic_hour(start_date),
-        })
-
-        return super().changelist_view(request, extra_context=extra_context)
+        }
 
     def get_peak_traffic_hour(self, start_date):
         hourly_stats = (
-            RequestLog.objects.filter(timestamp__gte=start_date)
-            .annotate(hour=ExtractHour('timestamp'))
+            RequestHourlyRollup.objects.filter(bucket__gte=start_date)
+            .annotate(hour=ExtractHour('bucket'))
             .values('hour')
-            .annotate(count=Count('id'))
+            .annotate(count=Sum('request_count'))
             .order_by('-count')
             .first()
         )
@@ -0,0 +1,59 @@
+from collections import namedtuple
+from functools import lru_cache
+
+from django.conf import settings
+from user_agents import parse
+
+UserAgentInfo = namedtuple('UserAgentInfo', ['device', 'browser', 'os'])
+
+# UA yang sangat panjang dipotong supaya ukuran cache tetap terbatas
+MAX_USER_AGENT_LENGTH = 512
+
+
+class UserAgentCache:
+    """
+    Memo LRU (thread-safe) untuk hasil user_agents.parse(). Traffic nyata hanya
+    punya sedikit variasi string User-Agent, jadi regex ua-parser cukup
+    dijalankan sekali per string.
+    """
+
+    def __init__(self, maxsize=2048):
+        self._parse = lru_cache(maxsize=maxsize)(self._parse_uncached)
+
+    @staticmethod
+    def _parse_uncached(user_agent_string):
+        user_agent = parse(user_agent_string)
+        return UserAgentInfo(
+            device=user_agent.device.family,
+            browser=user_agent.browser.family,
+            os=user_agent.os.family,
+        )
+
+    def parse(self, user_agent_string):
+        return self._parse((user_agent_string or '')[:MAX_USER_AGENT_LENGTH])
+
+    def stats(self):
+        info = self._parse.cache_info()
+        lookups = info.hits + info.misses
+        return {
+            'hits': info.hits,
+            'misses': info.misses,
+            'size': info.currsize,
+            'maxsize': info.maxsize,
+            'hit_ratio': info.hits / lookups if lookups else 0,
+        }
+
+    def clear(self):
+        self._parse.cache_clear()
+
+
+user_agent_cache = UserAgentCache(getattr(settings, 'ANALYTICS_USER_AGENT_CACHE_SIZE', 2048))
+
+
+def parse_user_agent(user_agent_string):
+    """Device, browser dan OS family dari string User-Agent (lewat cache)"""
+    return user_agent_cache.parse(user_agent_string)
+
+
+def user_agent_cache_stats():
+    return user_agent_cache.stats()
@@ -0,0 +1,128 @@
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Optional
+
+from django.db.models import Sum
+from django.utils import timezone
+
+from apps.core.stats_cache import get_stats
+
+from .hll import count_unique
+from .models import RequestDailyRollup
+from .rollups import summarize_rollups, window_start
+from .sketches import ALL_ENDPOINTS, endpoint_percentiles
+
+# Rentang yang dipakai admin (7), context processor (30, semua) dan di-precompute
+DASHBOARD_WINDOWS = (7, 30, None)
+
+
+@dataclass(frozen=True)
+class DailyMetrics:
+    day: str
+    requests: int
+    avg_response_time: float
+    errors: int
+
+
+@dataclass(frozen=True)
+class DashboardMetrics:
+    """KPI dashboard analytics untuk satu rentang hari (None = semua data)"""
+    days: Optional[int]
+    start: Optional[datetime]
+    total_requests: int = 0
+    error_count: int = 0
+    suspicious_requests: int = 0
+    auth_failures: int = 0
+    throttled_requests: int = 0
+    query_heavy_requests: int = 0
+    conversions: int = 0
+    avg_response_time: float = 0
+    peak_response_time: float = 0
+    avg_db_time: float = 0
+    avg_db_queries: float = 0
+    avg_memory: float = 0
+    avg_engagement_time: float = 0
+    unique_visitors: int = 0
+    unique_users: int = 0
+    latency: dict = field(default_factory=dict)
+    daily: tuple = ()
+
+    @property
+    def error_rate(self):
+        return self.error_count / self.total_requests * 100 if self.total_requests else 0
+
+    @property
+    def success_rate(self):
+        return round(100 - self.error_rate, 1)
+
+    @property
+    def conversion_rate(self):
+        return self.conversions / self.total_requests * 100 if self.total_requests else 0
+
+    def as_dict(self):
+        data = asdict(self)
+        data.update({
+            'error_rate': self.error_rate,
+            'success_rate': self.success_rate,
+            'conversion_rate': self.conversion_rate,
+        })
+        return data
+
+
+def compute_dashboard_metrics(days=7):
+    """
+    Hitung DashboardMetrics dari rollup harian. Semua counter dan rata-rata
+    berasal dari satu query agregasi; seri harian, percentile (sketch) dan
+    jumlah unik (HyperLogLog) masing-masing satu query lagi.
+    """
+    start = window_start(days) if days else None
+    rollups = RequestDailyRollup.objects.all()
+    if start is not None:
+        rollups = rollups.filter(bucket__gte=start)
+    totals = summarize_rollups(rollups)
+
+    daily = tuple(
+        DailyMetrics(
+            day=timezone.localtime(row['bucket']).strftime('%Y-%m-%d'),
+            requests=row['requests'],
+            avg_response_time=round(row['response_time_sum'] / row['requests'], 2) if row['requests'] else 0,
+            errors=row['errors'],
+        )
+        for row in rollups.values('bucket').annotate(
+            requests=Sum('request_count'),
+            response_time_sum=Sum('response_time_sum'),
+            errors=Sum('error_count'),
+        ).order_by('bucket')
+    )
+
+    start_day = start.date() if start is not None else None
+    return DashboardMetrics(
+        days=days,
+        start=start,
+        total_requests=totals['request_count'],
+        error_count=totals['error_count'],
+        suspicious_requests=totals['suspicious_count'],
+        auth_failures=totals['auth_failed_count'],
+        throttled_requests=totals['throttled_count'],
+        query_heavy_requests=totals['query_heavy_count'],
+        conversions=totals['conversion_count'],
+        avg_response_time=totals['avg_response_time'],
+        peak_response_time=totals['peak_response_time'],
+        avg_db_time=totals['avg_db_time'],
+        avg_db_queries=totals['avg_db_queries'],
+        avg_memory=totals['avg_memory'],
+        avg_engagement_time=totals['avg_engagement_time'],
+        unique_visitors=count_unique('ip', start=start_day),
+        unique_users=count_unique('user', start=start_day),
+        latency=endpoint_percentiles(start)[ALL_ENDPOINTS],
+        daily=daily,
+    )
+
+
+def dashboard_metrics_key(days):
+    return f'analytics_dashboard_metrics:{days or "all"}'
+
+
+def get_dashboard_metrics(days=7):
+    """DashboardMetrics yang di-cache (stale-while-revalidate), dipakai bersama admin, view dan template"""
+    return get_stats(dashboard_metrics_key(days), lambda: compute_dashboard_metrics(days))
@@ -0,0 +1,129 @@
+import hashlib
+import math
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models.functions import TruncDate
+
+from .models import RequestLog, UniqueVisitorSketch
+
+DEFAULT_HLL_SETTINGS = {
+    'PRECISION': 12,  # 2^12 register (4KB per sketch), standard error ~1.6%
+}
+
+# Feature khusus yang menampung semua request dalam satu hari
+ALL_FEATURES = '*'
+
+# Jenis identitas yang dihitung -> kolom RequestLog
+VISITOR_KINDS = {
+    'ip': 'ip_address',
+    'session': 'session_id',
+    'user': 'user_id',
+}
+
+
+def get_precision():
+    options = {**DEFAULT_HLL_SETTINGS, **getattr(settings, 'ANALYTICS_HLL', {})}
+    return int(options['PRECISION'])
+
+
+class HyperLogLog:
+    """
+    HyperLogLog untuk menghitung jumlah nilai unik (perkiraan) dengan memori tetap
+    2^precision byte. Register bisa digabung dengan max per posisi, jadi jumlah
+    unik untuk rentang tanggal berapa pun didapat dari gabungan sketch harian.
+    """
+
+    def __init__(self, precision=None, registers=None):
+        self.precision = precision or get_precision()
+        self.size = 1 << self.precision
+        self.registers = bytearray(registers) if registers is not None else bytearray(self.size)
+        if len(self.registers) != self.size:
+            raise ValueError("Register size does not match HyperLogLog precision")
+
+    @classmethod
+    def from_bytes(cls, data):
+        data = bytes(data)
+        return cls(precision=len(data).bit_length() - 1, registers=data)
+
+    def to_bytes(self):
+        return bytes(self.registers)
+
+    def add(self, value):
+        if value is None or value == '':
+            return
+        digest = hashlib.blake2b(str(value).encode(), digest_size=8).digest()
+        hashed = int.from_bytes(digest, 'big')
+        index = hashed >> (64 - self.precision)
+        remaining_bits = 64 - self.precision
+        remaining = hashed & ((1 << remaining_bits) - 1)
+        rank = remaining_bits - remaining.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        if other.size != self.size:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def count(self):
+        alpha = 0.7213 / (1 + 1.079 / self.size)
+        estimate = alpha * self.size ** 2 / sum(2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * self.size and zeros:
+            # Koreksi untuk kardinalitas kecil (linear counting)
+            estimate = self.size * math.log(self.size / zeros)
+        return int(round(estimate))
+
+
+def update_unique_sketches(first_id, last_id):
+    """
+    Tambahkan IP, session dan user RequestLog (first_id < id <= last_id) ke
+    sketch harian per feature. Dipanggil dari materialize_rollups di dalam
+    transaksi watermark.
+    """
+    sketches = defaultdict(HyperLogLog)
+    rows = (
+        RequestLog.objects.filter(id__gt=first_id, id__lte=last_id)
+        .annotate(day=TruncDate('timestamp'))
+        .values_list('day', 'feature_accessed', *VISITOR_KINDS.values())
+        .order_by()
+    )
+    for day, feature, *identities in rows.iterator():
+        for kind, identity in zip(VISITOR_KINDS, identities):
+            if identity is None or identity == '':
+                continue
+            sketches[day, ALL_FEATURES, kind].add(identity)
+            if feature:
+                sketches[day, feature, kind].add(identity)
+
+    for (day, feature, kind), sketch in sketches.items():
+        stored = (
+            UniqueVisitorSketch.objects.select_for_update()
+            .filter(day=day, feature=feature, kind=kind)
+            .first()
+        )
+        if stored is None:
+            UniqueVisitorSketch.objects.create(
+                day=day, feature=feature, kind=kind, registers=sketch.to_bytes(),
+            )
+            continue
+        stored.registers = HyperLogLog.from_bytes(stored.registers).merge(sketch).to_bytes()
+        stored.save(update_fields=['registers'])
+    return len(sketches)
+
+
+def count_unique(kind, start=None, end=None, feature=ALL_FEATURES):
+    """Perkiraan jumlah `kind` unik (ip/session/user) untuk rentang tanggal [start, end]"""
+    rows = UniqueVisitorSketch.objects.filter(kind=kind, feature=feature)
+    if start is not None:
+        rows = rows.filter(day__gte=start)
+    if end is not None:
+        rows = rows.filter(day__lte=end)
+
+    merged = None
+    for registers in rows.values_list('registers', flat=True):
+        sketch = HyperLogLog.from_bytes(registers)
+        merged = sketch if merged is None else merged.merge(sketch)
+    return merged.count() if merged is not None else 0
@@ -0,0 +1,153 @@
+import re
+from collections import namedtuple
+
+from django.apps import apps
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+PlanStep = namedtuple('PlanStep', ['table', 'index', 'full_scan', 'filesort'])
+
+IndexInfo = namedtuple('IndexInfo', ['table', 'name', 'columns', 'unique'])
+
+SQLITE_INDEX = re.compile(r'USING (?:COVERING )?INDEX (\w+)')
+SQLITE_TABLE = re.compile(r'^(?:SCAN|SEARCH) (\w+)')
+
+
+def analytics_tables():
+    return [model._meta.db_table for model in apps.get_app_config('analytics').get_models()]
+
+
+def capture_workload(workload):
+    """Jalankan setiap code path dan kumpulkan SELECT yang dieksekusi: [(label, sql)]"""
+    captured = []
+    for label, run in workload.items():
+        with CaptureQueriesContext(connection) as queries:
+            run()
+        captured += [
+            (label, query['sql']) for query in queries.captured_queries
+            if query['sql'].lstrip().upper().startswith('SELECT')
+        ]
+    return captured
+
+
+def explain(sql):
+    """Rencana eksekusi query sebagai list PlanStep (MySQL dan SQLite)"""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'mysql':
+            cursor.execute(f'EXPLAIN {sql}')
+            columns = [column[0].lower() for column in cursor.description]
+            steps = []
+            for row in cursor.fetchall():
+                row = dict(zip(columns, row))
+                extra = row.get('extra') or ''
+                steps.append(PlanStep(
+                    table=row['table'],
+                    index=row['key'],
+                    full_scan=row['type'] == 'ALL',
+                    filesort='Using filesort' in extra,
+                ))
+            return steps
+
+        if connection.vendor == 'sqlite':
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            steps = []
+            for *_, detail in cursor.fetchall():
+                table = SQLITE_TABLE.match(detail)
+                index = SQLITE_INDEX.search(detail)
+                if 'TEMP B-TREE' in detail:
+                    steps.append(PlanStep(None, None, False, True))
+                elif table:
+                    steps.append(PlanStep(
+                        table=table.group(1),
+                        index=index.group(1) if index else ('PRIMARY' if 'PRIMARY KEY' in detail else None),
+                        full_scan=detail.startswith('SCAN') and not index and 'PRIMARY KEY' not in detail,
+                        filesort=False,
+                    ))
+            return steps
+
+    raise NotImplementedError(f"EXPLAIN is not supported for {connection.vendor}")
+
+
+def get_indexes(tables):
+    """Index non-primary di tabel-tabel analytics"""
+    indexes = []
+    with connection.cursor() as cursor:
+        for table in tables:
+            constraints = connection.introspection.get_constraints(cursor, table)
+            for name, info in constraints.items():
+                if info['primary_key'] or not (info['index'] or info['unique']) or not info['columns']:
+                    continue
+                indexes.append(IndexInfo(table, name, tuple(info['columns']), bool(info['unique'])))
+    return indexes
+
+
+def redundant_indexes(indexes):
+    """
+    Index yang kolomnya merupakan prefix kiri dari index lain di tabel yang sama
+    (index yang lebih panjang sudah bisa melayani query yang sama).
+    """
+    redundant = []
+    for index in indexes:
+        if index.unique:
+            continue
+        for other in indexes:
+            if (
+                other is not index
+                and other.table == index.table
+                and len(other.columns) > len(index.columns)
+                and other.columns[:len(index.columns)] == index.columns
+            ):
+                redundant.append((index, other))
+                break
+    return redundant
+
+
+def query_columns(sql, table):
+    """Kolom `table` yang muncul di WHERE lalu GROUP BY, urut kemunculan"""
+    pattern = re.compile(rf'[`"]{re.escape(table)}[`"]\.[`"](\w+)[`"]')
+    upper = sql.upper()
+    where = upper.find(' WHERE ')
+    if where == -1:
+        return []
+    columns = []
+    for column in pattern.findall(sql[where:]):
+        if column != 'id' and column not in columns:
+            columns.append(column)
+    return columns
+
+
+def audit(workload):
+    """
+    EXPLAIN setiap query workload. Hasil: dict berisi `queries` (label, sql,
+    steps), `unused`, `redundant` dan `proposals` (kolom index komposit untuk
+    query yang full scan di tabel analytics).
+    """
+    tables = analytics_tables()
+    indexes = get_indexes(tables)
+    used = set()
+    queries = []
+    proposals = {}
+
+    for label, sql in capture_workload(workload):
+        steps = explain(sql)
+        queries.append((label, sql, steps))
+        for step in steps:
+            if step.index:
+                used.add((step.table, step.index))
+            if step.full_scan and step.table in tables:
+                columns = tuple(query_columns(sql, step.table))
+                covered = any(index.columns[:len(columns)] == columns for index in indexes if index.table == step.table)
+                if columns and not covered:
+                    proposals.setdefault((step.table, columns), []).append(label)
+
+    unused = [
+        index for index in indexes
+        if (index.table, index.name) not in used and not index.unique
+    ]
+    return {
+        'queries': queries,
+        'indexes': indexes,
+        'unused': unused,
+        'redundant': redundant_indexes(indexes),
+        'proposals': proposals,
+    }
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.analytics.retention import (
+    apply_retention,
+    get_retention_policies,
+    setup_partitions,
+    supports_partitions,
+)
+
+
+class Command(BaseCommand):
+    help = 'Archive and remove analytics rows older than their retention period (run daily from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('models', nargs='*', help='Model labels, e.g. analytics.RequestLog (default: all configured)')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many rows would be removed')
+        parser.add_argument('--archive-dir', help='Override ANALYTICS_RETENTION["ARCHIVE_DIR"]')
+        parser.add_argument(
+            '--setup-partitions', action='store_true',
+            help='Convert PARTITIONED tables to monthly RANGE partitions (MySQL only, rebuilds the table)',
+        )
+
+    def handle(self, *args, **options):
+        policies = get_retention_policies(options['models'])
+        if not policies:
+            raise CommandError('No retention policy configured for the given models')
+
+        if options['setup_partitions']:
+            if not supports_partitions():
+                raise CommandError('Partitioning is only supported on MySQL')
+            for policy in policies:
+                if not policy.partitioned:
+                    continue
+                statements = setup_partitions(policy)
+                if statements:
+                    self.stdout.write(self.style.SUCCESS(f'{policy.label}: partitioned by month'))
+                else:
+                    self.stdout.write(f'{policy.label}: already partitioned')
+
+        for policy in policies:
+            stats = apply_retention(policy, archive_dir=options['archive_dir'], dry_run=options['dry_run'])
+            action = 'would remove' if options['dry_run'] else 'removed'
+            message = f"{policy.label} ({stats['mode']}): {action} {stats['rows']} row(s) older than {policy.days} days"
+            if stats['files']:
+                message += f", {len(stats['files'])} archive file(s)"
+            if stats.get('dropped'):
+                message += f", dropped partitions {', '.join(stats['dropped'])}"
+            self.stdout.write(self.style.SUCCESS(message))
@@ -0,0 +1,102 @@
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from apps.analytics.index_audit import audit
+from apps.analytics.models import RequestLog
+from apps.analytics.workload import WORKLOAD
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN the analytics query workload and report unused, redundant and missing indexes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose-plans', action='store_true', help='Print the plan of every query')
+        parser.add_argument(
+            '--benchmark', action='store_true',
+            help='Time RequestLog inserts and the dashboard workload (inside a rolled back transaction)',
+        )
+        parser.add_argument('--rows', type=int, default=20000, help='Rows inserted for --benchmark')
+        parser.add_argument('--iterations', type=int, default=5, help='Workload repetitions for --benchmark')
+
+    def handle(self, *args, **options):
+        if options['benchmark']:
+            self.benchmark(options['rows'], options['iterations'])
+            return
+
+        report = audit(WORKLOAD)
+
+        self.stdout.write(self.style.MIGRATE_HEADING('Queries'))
+        for label, sql, steps in report['queries']:
+            flags = []
+            if any(step.full_scan for step in steps):
+                flags.append('FULL SCAN')
+            if any(step.filesort for step in steps):
+                flags.append('FILESORT')
+            used = ', '.join(sorted({step.index for step in steps if step.index})) or '-'
+            line = f"[{label}] index: {used}"
+            if flags:
+                self.stdout.write(self.style.WARNING(f"{line} ({', '.join(flags)})"))
+            else:
+                self.stdout.write(line)
+            if options['verbose_plans'] or flags:
+                self.stdout.write(f"    {sql[:300]}")
+
+        self.stdout.write(self.style.MIGRATE_HEADING('Unused indexes'))
+        for index in report['unused']:
+            self.stdout.write(f"{index.table}.{index.name} ({', '.join(index.columns)})")
+
+        self.stdout.write(self.style.MIGRATE_HEADING('Redundant indexes'))
+        for index, covering in report['redundant']:
+            self.stdout.write(
+                f"{index.table}.{index.name} ({', '.join(index.columns)}) "
+                f"is a prefix of {covering.name} ({', '.join(covering.columns)})"
+            )
+
+        self.stdout.write(self.style.MIGRATE_HEADING('Proposed composite indexes'))
+        for (table, columns), labels in report['proposals'].items():
+            self.stdout.write(
+                f"{table}: models.Index(fields={list(columns)})  # {', '.join(sorted(set(labels)))}"
+            )
+
+    def benchmark(self, rows, iterations):
+        now = timezone.now()
+        endpoints = ['/api/destinations/', '/api/flora/', '/api/fauna/', '/api/kuliner/', '/api/chatbot/']
+        logs = [
+            RequestLog(
+                endpoint=random.choice(endpoints),
+                method='GET',
+                status_code=random.choice([200, 200, 200, 404, 500]),
+                response_time=random.uniform(5, 800),
+                ip_address=f'10.0.{random.randint(0, 255)}.{random.randint(1, 254)}',
+                timestamp=now - timedelta(minutes=random.randint(0, 60 * 24 * 7)),
+                device_type=random.choice(['Other', 'iPhone', 'Samsung SM-S918B']),
+                is_error=random.random() < 0.05,
+            )
+            for _ in range(rows)
+        ]
+
+        try:
+            with transaction.atomic():
+                start = time.perf_counter()
+                RequestLog.objects.bulk_create(logs, batch_size=200)
+                insert_time = time.perf_counter() - start
+                self.stdout.write(f"insert    {rows / insert_time:10.0f} rows/s ({insert_time * 1000:.0f} ms)")
+
+                for label, run in WORKLOAD.items():
+                    start = time.perf_counter()
+                    for _ in range(iterations):
+                        run()
+                    elapsed = (time.perf_counter() - start) / iterations
+                    self.stdout.write(f"{label:24s} {elapsed * 1000:8.2f} ms")
+                raise Rollback
+        except Rollback:
+            self.stdout.write(self.style.SUCCESS('Benchmark rows rolled back'))
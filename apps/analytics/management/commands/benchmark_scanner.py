@@ -0,0 +1,85 @@
+import re
+import timeit
+
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+
+from apps.analytics.scanner import RequestScanner
+
+# Pattern dan loop lama dari AnalyticsMiddleware, dipakai sebagai pembanding
+LEGACY_PATTERNS = [
+    r"(?i)(union|select|insert|delete|drop|update|;|\-\-)",  # SQL Injection
+    r"(?i)<script.*?>",  # XSS
+    r"(?i)(\.\.\/|\.\.\\)",  # Path Traversal
+]
+
+QUERY_STRINGS = [
+    '',
+    'page=2',
+    'search=kebun+raya&page=1',
+    'filter=kuliner&lang=id&ordering=-created_at',
+    'search=curug+leuwi+hejo+bogor&utm_source=instagram&utm_medium=social&utm_campaign=liburan',
+    'fields=title,slug,images&expand=fauna,flora&limit=20&cursor=cD0yMDI1LTAxLTAx',
+    'q=' + 'taman+safari+' * 40,
+    'search=1%27+UNION+SELECT+password+FROM+auth_user--',
+    'next=..%2F..%2Fetc%2Fpasswd',
+    'comment=%3Cscript%3Ealert(1)%3C%2Fscript%3E',
+]
+
+
+def legacy_scan(request):
+    for param, value in request.GET.items():
+        for pattern in LEGACY_PATTERNS:
+            if re.search(pattern, str(value)):
+                return True, "Suspicious query parameter"
+
+    for param, value in request.POST.items():
+        for pattern in LEGACY_PATTERNS:
+            if re.search(pattern, str(value)):
+                return True, "Suspicious POST data"
+
+    user_agent = request.META.get('HTTP_USER_AGENT', '')
+    if not user_agent or user_agent in ['', 'None', 'curl', 'wget']:
+        return True, "Suspicious user agent"
+
+    return False, None
+
+
+class Command(BaseCommand):
+    help = 'Micro-benchmark RequestScanner against the legacy per-pattern loop'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        factory = RequestFactory()
+        scanner = RequestScanner()
+        user_agent = 'Mozilla/5.0 (Linux; Android 14) AppleWebKit/537.36 Chrome/124.0 Mobile Safari/537.36'
+
+        def build_requests():
+            # QueryDict di-cache per request, jadi buat request baru untuk setiap putaran
+            return [
+                factory.get(f'/api/destinations/?{query}', HTTP_USER_AGENT=user_agent)
+                for query in QUERY_STRINGS
+            ]
+
+        mismatches = [
+            query for query, request in zip(QUERY_STRINGS, build_requests())
+            if legacy_scan(request)[0] != scanner.scan(request).is_suspicious
+        ]
+        if mismatches:
+            self.stdout.write(self.style.WARNING(f'Result mismatch for: {mismatches}'))
+
+        results = {}
+        for name, scan in (('legacy', legacy_scan), ('scanner', scanner.scan)):
+            total = 0.0
+            for _ in range(iterations):
+                requests = build_requests()
+                total += timeit.timeit(lambda: [scan(request) for request in requests], number=1)
+            results[name] = total / (iterations * len(QUERY_STRINGS)) * 1_000_000
+            self.stdout.write(f'{name:8s} {results[name]:8.2f} µs/request')
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Speedup: {results['legacy'] / results['scanner']:.2f}x"
+        ))
@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
-from analytics.models import RequestLog
+from apps.analytics.models import RequestLog
+from apps.analytics.agents import parse_user_agent
 from django.utils import timezone
 import random
 from datetime import timedelta
@@ -17,24 +18,32 @@ class Command(BaseCommand):
         ]
         
         methods = ['GET', 'POST', 'PUT', 'DELETE']
-        devices = ['Desktop', 'Mobile', 'Tablet']
-        browsers = ['Chrome', 'Firefox', 'Safari']
-        os_list = ['Windows', 'MacOS', 'iOS', 'Android']
+        user_agents = [
+            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36',
+            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.4 Safari/605.1.15',
+            'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:125.0) Gecko/20100101 Firefox/125.0',
+            'Mozilla/5.0 (iPhone; CPU iPhone OS 17_4 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.4 Mobile/15E148 Safari/604.1',
+            'Mozilla/5.0 (Linux; Android 14; SM-S918B) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Mobile Safari/537.36',
+            'Mozilla/5.0 (iPad; CPU OS 17_4 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.4 Mobile/15E148 Safari/604.1',
+        ]
         
         # Generate data for last 7 days
         for i in range(7):
             date = timezone.now() - timedelta(days=i)
             # Generate 50-100 requests per day
             for _ in range(random.randint(50, 100)):
+                user_agent_string = random.choice(user_agents)
+                user_agent = parse_user_agent(user_agent_string)
                 RequestLog.objects.create(
                     endpoint=random.choice(endpoints),
                     method=random.choice(methods),
                     status_code=random.choice([200, 201, 400, 401, 403, 404, 500]),
                     response_time=random.uniform(100, 1000),
                     ip_address=f"192.168.1.{random.randint(1, 255)}",
-                    device_type=random.choice(devices),
-                    browser=random.choice(browsers),
-                    os=random.choice(os_list),
+                    user_agent=user_agent_string,
+                    device_type=user_agent.device,
+                    browser=user_agent.browser,
+                    os=user_agent.os,
                     timestamp=date + timedelta(
                         hours=random.randint(0, 23),
                         minutes=random.randint(0, 59)
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from apps.analytics.rollups import materialize_rollups, reset_rollups
+
+
+class Command(BaseCommand):
+    help = 'Incrementally aggregate new RequestLog rows into hourly/daily rollups (run from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help='RequestLog ids per transaction')
+        parser.add_argument('--settle-seconds', type=int, help='Skip logs newer than this many seconds')
+        parser.add_argument('--rebuild', action='store_true', help='Drop all rollups and rebuild from the raw log')
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            reset_rollups()
+            self.stdout.write(self.style.WARNING('Rollups cleared, rebuilding from the first RequestLog'))
+
+        stats = materialize_rollups(
+            batch_size=options['batch_size'],
+            settle_seconds=options['settle_seconds'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed ids {stats['first_id']}..{stats['last_id']} "
+            f"in {stats['batches']} batch(es), {stats['groups']} rollup group(s) and {stats['sketches']} sketch(es) updated"
+        ))
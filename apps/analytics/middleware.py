@@ -1,14 +1,16 @@
 import time
-import psutil
 import traceback
-import re
-import uuid
-from user_agents import parse
 from .models import RequestLog, ComplianceLog
-from django.http import Http404, HttpResponseBadRequest
-from django.utils import timezone
-from datetime import timedelta
-from django.core.cache import cache
+from .sinks import get_log_sink
+from .resources import get_request_meter
+from .queries import QueryInspector
+from .scanner import RequestScanner
+from .agents import parse_user_agent
+from .ratelimit import SlidingWindowRateLimiter, apply_rate_limit_headers, get_client_ip
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.crypto import salted_hmac
+from datetime import datetime, timezone as dt_timezone
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,35 +18,21 @@ logger = logging.getLogger(__name__)
 class AnalyticsMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
-        self.RATE_LIMIT = 100
-        self.RATE_WINDOW = 3600
-        # Patterns untuk mendeteksi aktivitas mencurigakan
-        self.SUSPICIOUS_PATTERNS = [
-            r"(?i)(union|select|insert|delete|drop|update|;|\-\-)",  # SQL Injection
-            r"(?i)<script.*?>",  # XSS
-            r"(?i)(\.\.\/|\.\.\\)",  # Path Traversal
-        ]
+        self.log_sink = get_log_sink()
+        self.resource_meter = get_request_meter()
+        self.rate_limiter = SlidingWindowRateLimiter()
+        self.scanner = RequestScanner()
 
     def is_suspicious_request(self, request):
         """Check for suspicious patterns in request"""
-        # Check query parameters
-        for param, value in request.GET.items():
-            for pattern in self.SUSPICIOUS_PATTERNS:
-                if re.search(pattern, str(value)):
-                    return True, "Suspicious query parameter"
-
-        # Check POST data
-        for param, value in request.POST.items():
-            for pattern in self.SUSPICIOUS_PATTERNS:
-                if re.search(pattern, str(value)):
-                    return True, "Suspicious POST data"
-
-        # Check headers for common attack vectors
-        user_agent = request.META.get('HTTP_USER_AGENT', '')
-        if not user_agent or user_agent in ['', 'None', 'curl', 'wget']:
-            return True, "Suspicious user agent"
+        return self.scanner.scan(request)
 
-        return False, None
+    def has_session(self, request):
+        """
+        Hanya request dengan cookie session yang boleh menyentuh request.user,
+        karena membaca user memuat session dan menambah `Vary: Cookie`.
+        """
+        return settings.SESSION_COOKIE_NAME in request.COOKIES
 
     def get_auth_info(self, request):
         """Get authentication information from request"""
@@ -59,7 +47,7 @@ class AnalyticsMiddleware:
             auth_method = 'api_key'
 
         # Check user authentication
-        if hasattr(request, 'user') and request.user.is_authenticated:
+        if self.has_session(request) and hasattr(request, 'user') and request.user.is_authenticated:
             auth_status = 'success'
             user_id = request.user.id
             auth_method = auth_method or 'session'
@@ -68,38 +56,21 @@ class AnalyticsMiddleware:
 
         return auth_status, user_id, api_key, auth_method
 
-    def get_rate_limit_key(self, request):
-        """Generate rate limit key based on IP"""
-        ip = request.META.get('HTTP_X_FORWARDED_FOR', '') or request.META.get('REMOTE_ADDR')
-        return f"rate_limit:{ip}"
-
-    def check_rate_limit(self, key):
-        """Check if request should be rate limited"""
-        now = timezone.now()
-        window_start = now - timedelta(seconds=self.RATE_WINDOW)
-        
-        # Get current count from cache
-        cache_key = f"cache_{key}"
-        count = cache.get(cache_key, 0)
-        
-        if count >= self.RATE_LIMIT:
-            return True, count
-        
-        # Increment counter
-        cache.set(cache_key, count + 1, self.RATE_WINDOW)
-        return False, count + 1
-
     def get_session_id(self, request):
-        """Get or create session ID"""
-        session_id = request.session.get('analytics_session_id')
-        if not session_id:
-            session_id = str(uuid.uuid4())
-            request.session['analytics_session_id'] = session_id
-        return session_id
+        """
+        Session ID analytics tanpa state: HMAC (SECRET_KEY) dari IP, User-Agent
+        dan tanggal (UTC). Tidak menulis ke django_session dan tidak memasang cookie.
+        """
+        value = '|'.join([
+            get_client_ip(request) or '',
+            request.META.get('HTTP_USER_AGENT', ''),
+            datetime.now(dt_timezone.utc).date().isoformat(),
+        ])
+        return salted_hmac('analytics.session_id', value, algorithm='sha256').hexdigest()[:32]
 
     def get_user_type(self, request):
         """Determine user type"""
-        if not hasattr(request, 'user') or not request.user.is_authenticated:
+        if not self.has_session(request) or not hasattr(request, 'user') or not request.user.is_authenticated:
             return 'guest'
         # Anda bisa menambahkan logika custom di sini
         # Contoh: if request.user.is_premium: return 'premium'
@@ -146,12 +117,13 @@ class AnalyticsMiddleware:
         # Catat waktu mulai
         start_time = time.time()
         
-        # Catat penggunaan memori awal
-        process = psutil.Process()
-        memory_start = process.memory_info().rss / 1024 / 1024  # Convert to MB
+        # Pengukuran memori per request hanya untuk sebagian kecil request
+        memory_token = self.resource_meter.start()
+        db_inspector = QueryInspector()
         
         # Security checks
-        is_suspicious, suspicious_reason = self.is_suspicious_request(request)
+        scan_result = self.is_suspicious_request(request)
+        is_suspicious, suspicious_reason = scan_result.is_suspicious, scan_result.reason
         auth_status, user_id, api_key, auth_method = self.get_auth_info(request)
         
         # Business metrics preparation
@@ -165,23 +137,31 @@ class AnalyticsMiddleware:
         error_type = None
         error_message = None
         error_stack = None
+        rate_limit = None
         rate_limit_key = None
         rate_limit_count = 0
         is_throttled = False
+        response = None
+        conversion_goal = None
+        engagement_time = None
         
         try:
             if request.path.startswith('/api/'):
-                rate_limit_key = self.get_rate_limit_key(request)
-                is_throttled, rate_limit_count = self.check_rate_limit(rate_limit_key)
+                rate_limit = self.rate_limiter.hit(request)
+                rate_limit_key = rate_limit.key
+                rate_limit_count = rate_limit.count
+                is_throttled = not rate_limit.allowed
                 
-                if is_throttled:
-                    is_error = True
-                    error_type = "RateLimit"
-                    error_message = "Too many requests"
-                    return HttpResponseBadRequest("Rate limit exceeded")
+            if is_throttled:
+                is_error = True
+                error_type = "RateLimit"
+                error_message = "Too many requests"
+                response = HttpResponse("Rate limit exceeded", status=429)
+                return apply_rate_limit_headers(response, rate_limit)
             
-            # Proses request
-            response = self.get_response(request)
+            # Proses request (hitung query database selama view berjalan)
+            with db_inspector.capture():
+                response = self.get_response(request)
             is_error = 400 <= response.status_code < 600
             
             # Detect conversion after response
@@ -215,14 +195,14 @@ class AnalyticsMiddleware:
             if request.path.startswith('/api/'):
                 # Hitung metrics
                 response_time = (time.time() - start_time) * 1000
-                memory_used = (process.memory_info().rss / 1024 / 1024) - memory_start
+                memory_used, memory_measurement = self.resource_meter.finish(memory_token)
                 
                 # Parse User-Agent
                 user_agent_string = request.META.get('HTTP_USER_AGENT', '')
-                user_agent = parse(user_agent_string)
+                user_agent = parse_user_agent(user_agent_string)
                 
                 # Get IP address
-                ip_address = request.META.get('HTTP_X_FORWARDED_FOR', '') or request.META.get('REMOTE_ADDR')
+                ip_address = get_client_ip(request)
                 
                 # Tentukan content type dan ID
                 content_type = None
@@ -236,24 +216,27 @@ class AnalyticsMiddleware:
                     if len(path_parts) > 2:
                         content_id = path_parts[2]
                 
-                # Simpan log
-                RequestLog.objects.create(
+                # Simpan log lewat sink (default: antrian + bulk_create di background)
+                self.log_sink.emit(RequestLog(
                     # Request Metrics
                     endpoint=request.path,
                     method=request.method,
                     status_code=getattr(response, 'status_code', 500),
                     response_time=response_time,
                     ip_address=ip_address,
-                    db_query_time=getattr(request, '_db_time', None),
+                    db_query_time=db_inspector.total_time,
+                    db_query_count=db_inspector.count,
+                    db_flags=db_inspector.get_flags(request.path),
                     memory_usage=memory_used,
+                    memory_measurement=memory_measurement,
                     content_type=content_type,
                     content_id=content_id,
                     
                     # User/Client Metrics
                     user_agent=user_agent_string,
-                    device_type=user_agent.device.family,
-                    browser=user_agent.browser.family,
-                    os=user_agent.os.family,
+                    device_type=user_agent.device,
+                    browser=user_agent.browser,
+                    os=user_agent.os,
                     referrer=request.META.get('HTTP_REFERER', None),
                     
                     # Error Tracking
@@ -265,7 +248,10 @@ class AnalyticsMiddleware:
                     # Rate Limiting
                     rate_limit_key=rate_limit_key,
                     rate_limit_count=rate_limit_count,
-                    rate_limit_window=timezone.now(),
+                    rate_limit_window=(
+                        datetime.fromtimestamp(rate_limit.window_start, tz=dt_timezone.utc)
+                        if rate_limit else None
+                    ),
                     is_throttled=is_throttled,
                     
                     # Security Metrics (new)
@@ -275,6 +261,8 @@ class AnalyticsMiddleware:
                     is_suspicious=is_suspicious,
                     security_flags={
                         'suspicious_reason': suspicious_reason,
+                        'suspicious_rule': scan_result.rule,
+                        'suspicious_field': scan_result.field,
                         'auth_failures': auth_status == 'failed',
                         'unusual_timing': response_time > 5000,  # Flag if response time > 5s
                     },
@@ -287,8 +275,10 @@ class AnalyticsMiddleware:
                     interaction_type=interaction_type,
                     conversion_goal=conversion_goal,
                     engagement_time=engagement_time,
-                )
+                ))
         
+        if rate_limit is not None:
+            apply_rate_limit_headers(response, rate_limit)
         return response
 
 class ComplianceLoggingMiddleware:
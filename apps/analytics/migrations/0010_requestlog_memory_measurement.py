@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0009_alter_requestlog_timestamp'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='requestlog',
+            name='memory_measurement',
+            field=models.CharField(blank=True, choices=[('worker_rss', 'Worker RSS gauge'), ('rusage_maxrss', 'Peak RSS growth (getrusage)'), ('tracemalloc_peak', 'Peak traced allocation (tracemalloc)')], help_text='How memory_usage was measured', max_length=20, null=True),
+        ),
+    ]
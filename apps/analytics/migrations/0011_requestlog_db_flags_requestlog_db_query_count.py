@@ -0,0 +1,23 @@
+# Generated by Django 5.1.4 on 2026-10-18 16:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0010_requestlog_memory_measurement'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='requestlog',
+            name='db_flags',
+            field=models.JSONField(blank=True, help_text='Repeated SQL shapes (N+1) and query threshold flags', null=True),
+        ),
+        migrations.AddField(
+            model_name='requestlog',
+            name='db_query_count',
+            field=models.IntegerField(blank=True, help_text='Number of database queries', null=True),
+        ),
+    ]
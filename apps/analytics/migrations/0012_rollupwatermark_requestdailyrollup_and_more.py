@@ -0,0 +1,106 @@
+# Generated by Django 5.1.4 on 2026-10-18 16:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0011_requestlog_db_flags_requestlog_db_query_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('last_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RequestDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField(help_text='Start of the hour/day bucket')),
+                ('endpoint', models.CharField(max_length=255)),
+                ('method', models.CharField(max_length=10)),
+                ('status_class', models.CharField(help_text='2xx/3xx/4xx/5xx', max_length=3)),
+                ('device_type', models.CharField(blank=True, default='', max_length=50)),
+                ('browser', models.CharField(blank=True, default='', max_length=50)),
+                ('feature', models.CharField(blank=True, default='', max_length=100)),
+                ('conversion_goal', models.CharField(blank=True, default='', max_length=50)),
+                ('request_count', models.IntegerField(default=0)),
+                ('error_count', models.IntegerField(default=0)),
+                ('suspicious_count', models.IntegerField(default=0)),
+                ('throttled_count', models.IntegerField(default=0)),
+                ('auth_failed_count', models.IntegerField(default=0)),
+                ('query_heavy_count', models.IntegerField(default=0)),
+                ('response_time_sum', models.FloatField(default=0)),
+                ('response_time_max', models.FloatField(default=0)),
+                ('db_query_time_sum', models.FloatField(default=0)),
+                ('db_query_time_samples', models.IntegerField(default=0)),
+                ('db_query_count_sum', models.IntegerField(default=0)),
+                ('db_query_count_samples', models.IntegerField(default=0)),
+                ('memory_usage_sum', models.FloatField(default=0)),
+                ('memory_usage_samples', models.IntegerField(default=0)),
+                ('engagement_time_sum', models.BigIntegerField(default=0)),
+                ('engagement_time_samples', models.IntegerField(default=0)),
+                ('latency_le_50', models.IntegerField(default=0)),
+                ('latency_le_100', models.IntegerField(default=0)),
+                ('latency_le_250', models.IntegerField(default=0)),
+                ('latency_le_500', models.IntegerField(default=0)),
+                ('latency_le_1000', models.IntegerField(default=0)),
+                ('latency_le_2500', models.IntegerField(default=0)),
+                ('latency_le_5000', models.IntegerField(default=0)),
+                ('latency_le_inf', models.IntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['bucket'], name='analytics_r_bucket_d83788_idx')],
+                'constraints': [models.UniqueConstraint(fields=('bucket', 'endpoint', 'method', 'status_class', 'device_type', 'browser', 'feature', 'conversion_goal'), name='requestdailyrollup_dimensions')],
+            },
+        ),
+        migrations.CreateModel(
+            name='RequestHourlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField(help_text='Start of the hour/day bucket')),
+                ('endpoint', models.CharField(max_length=255)),
+                ('method', models.CharField(max_length=10)),
+                ('status_class', models.CharField(help_text='2xx/3xx/4xx/5xx', max_length=3)),
+                ('device_type', models.CharField(blank=True, default='', max_length=50)),
+                ('browser', models.CharField(blank=True, default='', max_length=50)),
+                ('feature', models.CharField(blank=True, default='', max_length=100)),
+                ('conversion_goal', models.CharField(blank=True, default='', max_length=50)),
+                ('request_count', models.IntegerField(default=0)),
+                ('error_count', models.IntegerField(default=0)),
+                ('suspicious_count', models.IntegerField(default=0)),
+                ('throttled_count', models.IntegerField(default=0)),
+                ('auth_failed_count', models.IntegerField(default=0)),
+                ('query_heavy_count', models.IntegerField(default=0)),
+                ('response_time_sum', models.FloatField(default=0)),
+                ('response_time_max', models.FloatField(default=0)),
+                ('db_query_time_sum', models.FloatField(default=0)),
+                ('db_query_time_samples', models.IntegerField(default=0)),
+                ('db_query_count_sum', models.IntegerField(default=0)),
+                ('db_query_count_samples', models.IntegerField(default=0)),
+                ('memory_usage_sum', models.FloatField(default=0)),
+                ('memory_usage_samples', models.IntegerField(default=0)),
+                ('engagement_time_sum', models.BigIntegerField(default=0)),
+                ('engagement_time_samples', models.IntegerField(default=0)),
+                ('latency_le_50', models.IntegerField(default=0)),
+                ('latency_le_100', models.IntegerField(default=0)),
+                ('latency_le_250', models.IntegerField(default=0)),
+                ('latency_le_500', models.IntegerField(default=0)),
+                ('latency_le_1000', models.IntegerField(default=0)),
+                ('latency_le_2500', models.IntegerField(default=0)),
+                ('latency_le_5000', models.IntegerField(default=0)),
+                ('latency_le_inf', models.IntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['bucket'], name='analytics_r_bucket_4dfa7a_idx')],
+                'constraints': [models.UniqueConstraint(fields=('bucket', 'endpoint', 'method', 'status_class', 'device_type', 'browser', 'feature', 'conversion_goal'), name='requesthourlyrollup_dimensions')],
+            },
+        ),
+    ]
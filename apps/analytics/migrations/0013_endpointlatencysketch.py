@@ -0,0 +1,27 @@
+# Generated by Django 5.1.4 on 2026-10-18 16:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0012_rollupwatermark_requestdailyrollup_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EndpointLatencySketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField(help_text='Start of the hour bucket')),
+                ('endpoint', models.CharField(help_text="Request path, or '*' for all endpoints", max_length=255)),
+                ('count', models.IntegerField(default=0)),
+                ('sketch', models.JSONField(help_text='Serialized log-bucket histogram')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['endpoint', 'bucket'], name='analytics_e_endpoin_1d2dab_idx')],
+                'constraints': [models.UniqueConstraint(fields=('bucket', 'endpoint'), name='endpointlatencysketch_bucket_endpoint')],
+            },
+        ),
+    ]
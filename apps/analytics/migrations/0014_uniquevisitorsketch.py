@@ -0,0 +1,27 @@
+# Generated by Django 5.1.4 on 2026-10-18 16:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0013_endpointlatencysketch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UniqueVisitorSketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('feature', models.CharField(help_text="Feature accessed, or '*' for all requests", max_length=100)),
+                ('kind', models.CharField(choices=[('ip', 'IP address'), ('session', 'Session'), ('user', 'User')], max_length=10)),
+                ('registers', models.BinaryField(help_text='HyperLogLog registers')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'feature', 'day'], name='analytics_u_kind_7d5559_idx')],
+                'constraints': [models.UniqueConstraint(fields=('day', 'feature', 'kind'), name='uniquevisitorsketch_day_feature_kind')],
+            },
+        ),
+    ]
@@ -0,0 +1,97 @@
+# Generated by Django 5.1.4 on 2026-10-18 16:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0014_uniquevisitorsketch'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='requestdailyrollup',
+            name='analytics_r_bucket_d83788_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='requesthourlyrollup',
+            name='analytics_r_bucket_4dfa7a_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='requestlog',
+            name='analytics_r_timesta_d80d79_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='requestlog',
+            name='analytics_r_endpoin_f480f5_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='requestlog',
+            name='analytics_r_content_de4e4a_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='requestlog',
+            name='analytics_r_country_51ddb7_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='requestlog',
+            name='analytics_r_device__659f4b_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='requestlog',
+            name='analytics_r_is_erro_71268f_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='requestlog',
+            name='analytics_r_error_t_94fae1_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='requestlog',
+            name='analytics_r_rate_li_27bdc1_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='requestlog',
+            name='analytics_r_rate_li_060457_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='requestlog',
+            name='analytics_r_is_thro_2dda85_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='requestlog',
+            name='analytics_r_auth_st_1be12f_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='requestlog',
+            name='analytics_r_user_id_c0c46f_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='requestlog',
+            name='analytics_r_is_susp_354294_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='requestlog',
+            name='analytics_r_auth_me_2aafa4_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='requestlog',
+            name='analytics_r_session_96e711_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='requestlog',
+            name='analytics_r_user_ty_0bf5cf_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='requestlog',
+            name='analytics_r_feature_561b5a_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='requestlog',
+            name='analytics_r_convers_2f023b_idx',
+        ),
+        migrations.AddIndex(
+            model_name='requestlog',
+            index=models.Index(fields=['timestamp', 'is_error'], name='analytics_r_timesta_5f8383_idx'),
+        ),
+    ]
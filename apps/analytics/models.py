@@ -1,18 +1,28 @@
 from django.db import models
 from django.utils import timezone
+from .resources import MEMORY_MEASUREMENT_CHOICES
 
 class RequestLog(models.Model):
     # Request Metrics
     endpoint = models.CharField(max_length=255)
     method = models.CharField(max_length=10)
     status_code = models.IntegerField()
-    timestamp = models.DateTimeField(auto_now_add=True)
+    timestamp = models.DateTimeField(default=timezone.now)
     response_time = models.FloatField(help_text="Response time in milliseconds")
     ip_address = models.GenericIPAddressField()
     
     # Performance Metrics
     db_query_time = models.FloatField(help_text="Database query time in milliseconds", null=True)
+    db_query_count = models.IntegerField(null=True, blank=True, help_text="Number of database queries")
+    db_flags = models.JSONField(null=True, blank=True, help_text="Repeated SQL shapes (N+1) and query threshold flags")
     memory_usage = models.FloatField(help_text="Memory usage in MB", null=True)
+    memory_measurement = models.CharField(
+        max_length=20,
+        choices=MEMORY_MEASUREMENT_CHOICES,
+        null=True,
+        blank=True,
+        help_text="How memory_usage was measured"
+    )
     
     # Content Analytics
     content_type = models.CharField(max_length=50, null=True, blank=True)
@@ -56,25 +66,10 @@ class RequestLog(models.Model):
     engagement_time = models.IntegerField(null=True, blank=True, help_text="Time spent on feature in seconds")
 
     class Meta:
+        # Dashboard membaca rollup, raw log hanya difilter per rentang waktu
+        # (date_hierarchy admin, filter error, retensi); lihat command audit_indexes
         indexes = [
-            models.Index(fields=['timestamp']),
-            models.Index(fields=['endpoint']),
-            models.Index(fields=['content_type']),
-            models.Index(fields=['country']),
-            models.Index(fields=['device_type']),
-            models.Index(fields=['is_error']),
-            models.Index(fields=['error_type']),
-            models.Index(fields=['rate_limit_key']),
-            models.Index(fields=['rate_limit_window']),
-            models.Index(fields=['is_throttled']),
-            models.Index(fields=['auth_status']),
-            models.Index(fields=['user_id']),
-            models.Index(fields=['is_suspicious']),
-            models.Index(fields=['auth_method']),
-            models.Index(fields=['session_id']),
-            models.Index(fields=['user_type']),
-            models.Index(fields=['feature_accessed']),
-            models.Index(fields=['conversion_goal']),
+            models.Index(fields=['timestamp', 'is_error']),
         ]
 
     def __str__(self):
@@ -194,3 +189,134 @@ class ComplianceLog(models.Model):
         if self.affected_users:
             return len(self.affected_users)
         return 0
+
+
+# Batas atas (ms) bucket histogram response time pada rollup, bucket terakhir tanpa batas
+LATENCY_BUCKETS = (50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class RequestRollup(models.Model):
+    """
+    Ringkasan RequestLog per bucket waktu, diisi secara incremental oleh
+    command `materialize_rollups`. Dashboard membaca tabel ini, bukan raw log.
+    """
+    bucket = models.DateTimeField(help_text="Start of the hour/day bucket")
+    endpoint = models.CharField(max_length=255)
+    method = models.CharField(max_length=10)
+    status_class = models.CharField(max_length=3, help_text="2xx/3xx/4xx/5xx")
+    device_type = models.CharField(max_length=50, blank=True, default='')
+    browser = models.CharField(max_length=50, blank=True, default='')
+    feature = models.CharField(max_length=100, blank=True, default='')
+    conversion_goal = models.CharField(max_length=50, blank=True, default='')
+
+    # Counters
+    request_count = models.IntegerField(default=0)
+    error_count = models.IntegerField(default=0)
+    suspicious_count = models.IntegerField(default=0)
+    throttled_count = models.IntegerField(default=0)
+    auth_failed_count = models.IntegerField(default=0)
+    query_heavy_count = models.IntegerField(default=0)
+
+    # Sum dan jumlah nilai non-null, supaya rata-rata bisa digabung antar bucket
+    response_time_sum = models.FloatField(default=0)
+    response_time_max = models.FloatField(default=0)
+    db_query_time_sum = models.FloatField(default=0)
+    db_query_time_samples = models.IntegerField(default=0)
+    db_query_count_sum = models.IntegerField(default=0)
+    db_query_count_samples = models.IntegerField(default=0)
+    memory_usage_sum = models.FloatField(default=0)
+    memory_usage_samples = models.IntegerField(default=0)
+    engagement_time_sum = models.BigIntegerField(default=0)
+    engagement_time_samples = models.IntegerField(default=0)
+
+    # Histogram response time (jumlah request dengan response_time <= batas bucket)
+    latency_le_50 = models.IntegerField(default=0)
+    latency_le_100 = models.IntegerField(default=0)
+    latency_le_250 = models.IntegerField(default=0)
+    latency_le_500 = models.IntegerField(default=0)
+    latency_le_1000 = models.IntegerField(default=0)
+    latency_le_2500 = models.IntegerField(default=0)
+    latency_le_5000 = models.IntegerField(default=0)
+    latency_le_inf = models.IntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+    def __str__(self):
+        return f"{self.bucket:%Y-%m-%d %H:%M} {self.method} {self.endpoint} ({self.request_count})"
+
+
+ROLLUP_DIMENSIONS = (
+    'bucket', 'endpoint', 'method', 'status_class',
+    'device_type', 'browser', 'feature', 'conversion_goal',
+)
+
+
+class RequestHourlyRollup(RequestRollup):
+    class Meta:
+        constraints = [
+            # Juga melayani filter bucket (kolom pertama), tidak perlu index terpisah
+            models.UniqueConstraint(fields=ROLLUP_DIMENSIONS, name='requesthourlyrollup_dimensions'),
+        ]
+
+
+class RequestDailyRollup(RequestRollup):
+    class Meta:
+        constraints = [
+            # Juga melayani filter bucket (kolom pertama), tidak perlu index terpisah
+            models.UniqueConstraint(fields=ROLLUP_DIMENSIONS, name='requestdailyrollup_dimensions'),
+        ]
+
+
+class RollupWatermark(models.Model):
+    """Posisi terakhir (id RequestLog) yang sudah masuk ke rollup"""
+    name = models.CharField(max_length=50, unique=True)
+    last_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name}: {self.last_id}"
+
+
+class EndpointLatencySketch(models.Model):
+    """Sketch response time per endpoint per jam (lihat apps.analytics.sketches)"""
+    bucket = models.DateTimeField(help_text="Start of the hour bucket")
+    endpoint = models.CharField(max_length=255, help_text="Request path, or '*' for all endpoints")
+    count = models.IntegerField(default=0)
+    sketch = models.JSONField(help_text="Serialized log-bucket histogram")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['bucket', 'endpoint'], name='endpointlatencysketch_bucket_endpoint'),
+        ]
+        indexes = [
+            models.Index(fields=['endpoint', 'bucket']),
+        ]
+
+    def __str__(self):
+        return f"{self.bucket:%Y-%m-%d %H:%M} {self.endpoint} ({self.count})"
+
+
+class UniqueVisitorSketch(models.Model):
+    """Register HyperLogLog per hari, per feature dan jenis identitas (lihat apps.analytics.hll)"""
+    KIND_CHOICES = [
+        ('ip', 'IP address'),
+        ('session', 'Session'),
+        ('user', 'User'),
+    ]
+
+    day = models.DateField()
+    feature = models.CharField(max_length=100, help_text="Feature accessed, or '*' for all requests")
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    registers = models.BinaryField(help_text="HyperLogLog registers")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'feature', 'kind'], name='uniquevisitorsketch_day_feature_kind'),
+        ]
+        indexes = [
+            models.Index(fields=['kind', 'feature', 'day']),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.feature} ({self.kind})"
@@ -0,0 +1,91 @@
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+DEFAULT_QUERY_THRESHOLDS = {
+    'DEFAULT': 30,          # Jumlah query maksimal per request sebelum ditandai
+    'ENDPOINTS': {},        # Override per prefix endpoint, misal {'/api/latest-content/': 15}
+    'REPEAT_THRESHOLD': 5,  # Bentuk SQL yang sama >= N kali dianggap N+1
+}
+
+_STRING_RE = re.compile(r"'(?:[^'\\]|\\.)*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_sql(sql):
+    """Ubah SQL menjadi 'bentuk' tanpa literal supaya query berulang bisa dikenali"""
+    shape = _STRING_RE.sub('?', sql)
+    shape = _NUMBER_RE.sub('?', shape)
+    shape = shape.replace('%s', '?')
+    shape = _IN_LIST_RE.sub('IN (...)', shape)
+    return _WHITESPACE_RE.sub(' ', shape).strip()
+
+
+def get_query_thresholds():
+    return {**DEFAULT_QUERY_THRESHOLDS, **getattr(settings, 'ANALYTICS_QUERY_THRESHOLDS', {})}
+
+
+def get_query_threshold(path, thresholds=None):
+    """Threshold jumlah query untuk endpoint (prefix terpanjang yang cocok)"""
+    thresholds = thresholds or get_query_thresholds()
+    matches = [prefix for prefix in thresholds['ENDPOINTS'] if path.startswith(prefix)]
+    if matches:
+        return thresholds['ENDPOINTS'][max(matches, key=len)]
+    return thresholds['DEFAULT']
+
+
+class QueryInspector:
+    """
+    Execute wrapper yang menghitung jumlah query, total waktu (ms) dan
+    bentuk SQL yang berulang selama satu request.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.total_time += (time.perf_counter() - start) * 1000
+            self.count += 1
+            self.shapes[normalize_sql(sql)] += 1
+
+    @contextmanager
+    def capture(self):
+        """Pasang inspector di semua koneksi database selama blok berjalan"""
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(self))
+            yield self
+
+    def repeated_queries(self, min_repeats):
+        return [
+            {'sql': shape[:300], 'count': count}
+            for shape, count in self.shapes.most_common()
+            if count >= min_repeats
+        ]
+
+    def get_flags(self, path):
+        """Flag untuk RequestLog.db_flags, None jika tidak ada yang perlu dicatat"""
+        thresholds = get_query_thresholds()
+        threshold = get_query_threshold(path, thresholds)
+        repeated = self.repeated_queries(thresholds['REPEAT_THRESHOLD'])
+        exceeded = self.count > threshold
+
+        if not repeated and not exceeded:
+            return None
+        return {
+            'query_threshold': threshold,
+            'threshold_exceeded': exceeded,
+            'repeated_queries': repeated,
+        }
@@ -0,0 +1,160 @@
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+DEFAULT_RATE_LIMITS = {
+    'DEFAULT': {'limit': 100, 'window': 3600},
+    'ENDPOINTS': {},  # {'/api/chatbot/': {'limit': 30, 'window': 60}}
+    'API_KEYS': {},   # {'<api key>': {'limit': 1000, 'window': 3600}}
+    'NUM_PROXIES': 0,  # Jumlah reverse proxy tepercaya di depan aplikasi
+}
+
+RateLimitResult = namedtuple(
+    'RateLimitResult',
+    ['allowed', 'key', 'limit', 'remaining', 'count', 'reset', 'retry_after', 'window_start'],
+)
+
+
+def get_rate_limits():
+    return {**DEFAULT_RATE_LIMITS, **getattr(settings, 'ANALYTICS_RATE_LIMITS', {})}
+
+
+def get_client_ip(request):
+    """
+    IP client untuk kuota dan log. Entry paling kiri X-Forwarded-For diisi
+    client sendiri, jadi tidak dipakai: tanpa proxy (NUM_PROXIES = 0) yang
+    dipakai REMOTE_ADDR, dengan N proxy tepercaya dipakai entry ke-N dari
+    kanan (seperti NUM_PROXIES di DRF).
+    """
+    num_proxies = get_rate_limits()['NUM_PROXIES']
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '')
+    if num_proxies and forwarded:
+        addresses = [address.strip() for address in forwarded.split(',') if address.strip()]
+        if addresses:
+            return addresses[-min(num_proxies, len(addresses))]
+    return request.META.get('REMOTE_ADDR')
+
+
+class SlidingWindowRateLimiter:
+    """
+    Rate limiter sliding-window counter di atas cache.incr yang atomic.
+
+    Setiap window punya counter sendiri (key berisi nomor window), jadi TTL
+    tidak pernah di-reset oleh request baru. Jumlah request dihitung dengan
+    bobot: count_window_sebelumnya * sisa_porsi + count_window_sekarang.
+    Counter window sebelumnya sudah final, sehingga cukup dibaca sekali per
+    window lalu disimpan di memori; request biasa hanya butuh satu incr.
+    """
+
+    PREVIOUS_COUNTS_SIZE = 10000
+
+    def __init__(self, limits=None):
+        self.limits = limits or get_rate_limits()
+        self._previous_counts = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_quota(self, request):
+        """Tentukan (identity, scope, limit, window) untuk request"""
+        api_key = request.META.get('HTTP_X_API_KEY')
+        if api_key and api_key in self.limits['API_KEYS']:
+            quota = self.limits['API_KEYS'][api_key]
+            digest = hashlib.sha256(api_key.encode()).hexdigest()[:16]
+            return f"key:{digest}", 'api_key', quota['limit'], quota['window']
+
+        identity = f"ip:{get_client_ip(request)}"
+        matches = [prefix for prefix in self.limits['ENDPOINTS'] if request.path.startswith(prefix)]
+        if matches:
+            prefix = max(matches, key=len)
+            quota = self.limits['ENDPOINTS'][prefix]
+            return identity, prefix, quota['limit'], quota['window']
+
+        quota = self.limits['DEFAULT']
+        return identity, 'default', quota['limit'], quota['window']
+
+    def _incr(self, key, window):
+        try:
+            return cache.incr(key)
+        except ValueError:
+            # Request pertama di window ini
+            if cache.add(key, 1, window * 2):
+                return 1
+            return cache.incr(key)
+
+    def _previous_count(self, key):
+        with self._lock:
+            if key in self._previous_counts:
+                self._previous_counts.move_to_end(key)
+                return self._previous_counts[key]
+
+        count = cache.get(key, 0)
+        with self._lock:
+            self._previous_counts[key] = count
+            while len(self._previous_counts) > self.PREVIOUS_COUNTS_SIZE:
+                self._previous_counts.popitem(last=False)
+        return count
+
+    def hit(self, request, now=None):
+        """Catat satu request dan kembalikan RateLimitResult"""
+        now = time.time() if now is None else now
+        identity, scope, limit, window = self.get_quota(request)
+
+        index = int(now // window)
+        base_key = f"ratelimit:{scope}:{identity}:{window}"
+        count = self._incr(f"{base_key}:{index}", window)
+        previous = self._previous_count(f"{base_key}:{index - 1}")
+
+        window_start = index * window
+        elapsed = (now - window_start) / window
+        weighted = previous * (1 - elapsed) + count
+        allowed = weighted <= limit
+        reset = math.ceil(window_start + window - now)
+
+        retry_after = 0
+        if not allowed:
+            # Waktu sampai bobot window sebelumnya cukup turun, atau sampai window baru
+            if previous and count <= limit:
+                needed = (weighted - limit) / previous * window
+                retry_after = max(1, min(math.ceil(needed), reset))
+            else:
+                retry_after = max(1, reset)
+
+        return RateLimitResult(
+            allowed=allowed,
+            key=base_key,
+            limit=limit,
+            remaining=max(0, int(limit - weighted)),
+            count=int(math.ceil(weighted)),
+            reset=reset,
+            retry_after=retry_after,
+            window_start=window_start,
+        )
+
+
+def is_shared_cacheable(response):
+    """Apakah response boleh disimpan cache bersama (CDN/proxy): public atau s-maxage, tanpa private/no-store"""
+    directives = {
+        directive.split('=', 1)[0].strip().lower()
+        for directive in response.get('Cache-Control', '').split(',')
+    }
+    return bool(directives & {'public', 's-maxage'}) and not directives & {'private', 'no-store'}
+
+
+def apply_rate_limit_headers(response, result):
+    """
+    Tambahkan header X-RateLimit-* (dan Retry-After jika ditolak). Header ini
+    milik satu client, jadi tidak dipasang pada response yang di-cache CDN
+    (misal 200 ConditionalGetMixin), agar tidak disajikan ke client lain.
+    """
+    if is_shared_cacheable(response):
+        return response
+    response['X-RateLimit-Limit'] = str(result.limit)
+    response['X-RateLimit-Remaining'] = str(result.remaining)
+    response['X-RateLimit-Reset'] = str(result.reset)
+    if not result.allowed:
+        response['Retry-After'] = str(result.retry_after)
+    return response
@@ -0,0 +1,208 @@
+import logging
+import os
+import random
+import resource
+import socket
+import threading
+import time
+import tracemalloc
+
+import psutil
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESOURCE_SETTINGS = {
+    'SAMPLE_INTERVAL': 15.0,     # Detik antar sampling gauge worker
+    'REQUEST_SAMPLE_RATE': 0.01,  # Porsi request yang diukur per-request
+    'REQUEST_MODE': 'rusage',     # rusage / tracemalloc
+}
+
+# Cara angka RequestLog.memory_usage diukur. worker_rss hanya ada di log
+# lama; RSS worker sekarang hanya dipublikasikan sebagai gauge sampler.
+MEASURED_WORKER_RSS = 'worker_rss'
+MEASURED_RUSAGE = 'rusage_maxrss'
+MEASURED_TRACEMALLOC = 'tracemalloc_peak'
+
+MEMORY_MEASUREMENT_CHOICES = [
+    (MEASURED_WORKER_RSS, 'Worker RSS gauge'),
+    (MEASURED_RUSAGE, 'Peak RSS growth (getrusage)'),
+    (MEASURED_TRACEMALLOC, 'Peak traced allocation (tracemalloc)'),
+]
+
+# Hanya pengukuran per request yang boleh dirata-rata di rollup/dashboard
+PER_REQUEST_MEASUREMENTS = (MEASURED_RUSAGE, MEASURED_TRACEMALLOC)
+
+GAUGE_WORKERS_KEY = 'analytics_resource_workers'
+
+
+def gauge_key(worker_id):
+    return f'analytics_resource_gauges:{worker_id}'
+
+
+def get_resource_settings():
+    return {**DEFAULT_RESOURCE_SETTINGS, **getattr(settings, 'ANALYTICS_RESOURCES', {})}
+
+
+def _maxrss_mb():
+    # ru_maxrss dalam KB di Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class ResourceSampler:
+    """
+    Thread per worker yang mencatat RSS, CPU dan jumlah koneksi terbuka
+    secara berkala, sehingga request tidak perlu membaca /proc sendiri.
+    """
+
+    def __init__(self, interval=15.0):
+        self.interval = interval
+        self.worker_id = None
+        self._gauges = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._stop = threading.Event()
+
+    def start(self):
+        """Start thread sampler (ulang setelah fork worker gunicorn)"""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self.worker_id = f"{socket.gethostname()}:{self._pid}"
+            self._stop.clear()
+            self._process = psutil.Process(self._pid)
+            # Panggilan pertama cpu_percent selalu 0, jadikan baseline
+            self._process.cpu_percent(interval=None)
+            self._thread = threading.Thread(
+                target=self._run,
+                name='analytics-resource-sampler',
+                daemon=True,
+            )
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _register_worker(self):
+        """
+        Daftarkan worker ini dan buang worker yang gauge-nya sudah kedaluwarsa
+        (worker yang sudah mati/di-recycle). Dipanggil setiap sample(), jadi
+        penulisan yang tertimpa worker lain yang boot bersamaan pulih dalam
+        satu interval.
+        """
+        try:
+            workers = set(cache.get(GAUGE_WORKERS_KEY, []))
+            alive = cache.get_many([gauge_key(worker) for worker in workers])
+            registered = {worker for worker in workers if gauge_key(worker) in alive} | {self.worker_id}
+            if registered != workers:
+                cache.set(GAUGE_WORKERS_KEY, sorted(registered), None)
+        except Exception:
+            logger.exception("Failed to register resource sampler worker")
+
+    def _run(self):
+        while True:
+            self.sample()
+            if self._stop.wait(self.interval):
+                break
+
+    def sample(self):
+        """Ambil satu sampel gauge dan publikasikan ke cache"""
+        try:
+            process = self._process
+            with process.oneshot():
+                gauges = {
+                    'rss_mb': process.memory_info().rss / 1024 / 1024,
+                    'cpu_percent': process.cpu_percent(interval=None),
+                    'open_connections': len(process.net_connections(kind='inet')),
+                    'threads': process.num_threads(),
+                    'sampled_at': time.time(),
+                }
+        except Exception:
+            logger.exception("Resource sampling failed")
+            return None
+
+        with self._lock:
+            self._gauges = gauges
+        try:
+            cache.set(gauge_key(self.worker_id), gauges, int(self.interval * 4))
+        except Exception:
+            logger.exception("Failed to publish resource gauges")
+        self._register_worker()
+        return gauges
+
+    def snapshot(self):
+        """Gauge terakhir worker ini (dict kosong sebelum sampel pertama)"""
+        with self._lock:
+            return dict(self._gauges)
+
+
+def get_worker_gauges():
+    """Gauge terbaru semua worker yang masih aktif, dikelompokkan per worker"""
+    workers = cache.get(GAUGE_WORKERS_KEY, [])
+    if not workers:
+        return {}
+    keys = {gauge_key(worker): worker for worker in workers}
+    found = cache.get_many(list(keys))
+    return {keys[key]: gauges for key, gauges in found.items()}
+
+
+class RequestResourceMeter:
+    """
+    Pengukuran memori per request. Hanya sebagian kecil request yang diukur
+    (REQUEST_SAMPLE_RATE); sisanya tidak punya angka memori (None). RSS worker
+    tersedia terpisah lewat get_worker_gauges().
+    """
+
+    def __init__(self, sampler, sample_rate=0.01, mode='rusage'):
+        self.sampler = sampler
+        self.sample_rate = sample_rate
+        self.mode = mode
+
+    def start(self):
+        """Mulai pengukuran, kembalikan token untuk finish()"""
+        self.sampler.start()
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return None
+        if self.mode == 'tracemalloc' and tracemalloc.is_tracing():
+            # Catatan: peak tracemalloc bersifat global untuk seluruh proses
+            tracemalloc.reset_peak()
+            return (MEASURED_TRACEMALLOC, tracemalloc.get_traced_memory()[0])
+        return (MEASURED_RUSAGE, _maxrss_mb())
+
+    def finish(self, token):
+        """Kembalikan tuple (memory_mb, measurement); (None, None) jika tidak disampel"""
+        if token is None:
+            return None, None
+        measurement, baseline = token
+        if measurement == MEASURED_TRACEMALLOC:
+            peak = tracemalloc.get_traced_memory()[1]
+            return max(peak - baseline, 0) / 1024 / 1024, measurement
+        return max(_maxrss_mb() - baseline, 0), measurement
+
+
+_sampler = None
+_sampler_lock = threading.Lock()
+
+
+def get_resource_sampler():
+    """Sampler milik worker ini, dijalankan saat pertama kali diminta"""
+    global _sampler
+    if _sampler is None:
+        with _sampler_lock:
+            if _sampler is None:
+                _sampler = ResourceSampler(interval=float(get_resource_settings()['SAMPLE_INTERVAL']))
+    return _sampler
+
+
+def get_request_meter():
+    options = get_resource_settings()
+    return RequestResourceMeter(
+        get_resource_sampler(),
+        sample_rate=float(options['REQUEST_SAMPLE_RATE']),
+        mode=options['REQUEST_MODE'],
+    )
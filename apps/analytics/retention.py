@@ -0,0 +1,311 @@
+import gzip
+import json
+import logging
+import os
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import RollupWatermark
+from .rollups import WATERMARK_NAME
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RETENTION_SETTINGS = {
+    'ARCHIVE_DIR': Path(settings.BASE_DIR) / 'archive',  # Hanya untuk development, lihat settings.py
+    'CHUNK_SIZE': 5000,          # Jumlah row per file arsip / per DELETE
+    'PARTITION_MONTHS_AHEAD': 2,  # Partisi bulanan yang disiapkan di depan bulan ini
+    'MODELS': {},
+}
+
+# Default per model, bisa di-override lewat settings.ANALYTICS_RETENTION['MODELS']
+DEFAULT_MODEL_RETENTION = {
+    'DAYS': 90,
+    'DATE_FIELD': 'timestamp',
+    'ARCHIVE': True,
+    'PARTITIONED': False,  # Hanya berlaku di MySQL, lihat setup_partitions()
+}
+
+MAX_PARTITION = 'pmax'
+
+
+@dataclass
+class RetentionPolicy:
+    model: type
+    days: int
+    date_field: str
+    archive: bool
+    partitioned: bool
+
+    @property
+    def label(self):
+        return self.model._meta.label
+
+    def cutoff(self, now=None):
+        return (now or timezone.now()) - timedelta(days=self.days)
+
+
+def get_retention_settings():
+    return {**DEFAULT_RETENTION_SETTINGS, **getattr(settings, 'ANALYTICS_RETENTION', {})}
+
+
+def get_retention_policies(labels=None):
+    """RetentionPolicy untuk setiap model di settings (atau hanya `labels`)"""
+    policies = []
+    for label, options in get_retention_settings()['MODELS'].items():
+        if labels and label not in labels:
+            continue
+        options = {**DEFAULT_MODEL_RETENTION, **options}
+        policies.append(RetentionPolicy(
+            model=apps.get_model(label),
+            days=int(options['DAYS']),
+            date_field=options['DATE_FIELD'],
+            archive=options['ARCHIVE'],
+            partitioned=options['PARTITIONED'],
+        ))
+    return policies
+
+
+def retention_limit_id(policy):
+    """
+    Id terbesar yang boleh dihapus. RequestLog yang belum masuk rollup
+    (di atas watermark) tidak pernah dihapus.
+    """
+    if policy.model._meta.label != 'analytics.RequestLog':
+        return None
+    watermark = RollupWatermark.objects.filter(name=WATERMARK_NAME).first()
+    return watermark.last_id if watermark else 0
+
+
+# --- Arsip ---------------------------------------------------------------
+
+def archive_rows(policy, rows, archive_dir=None):
+    """Tulis row (list of dict) ke file gzip JSONL, kembalikan path file"""
+    archive_dir = Path(archive_dir or get_retention_settings()['ARCHIVE_DIR'])
+    directory = archive_dir / policy.label.lower()
+    directory.mkdir(parents=True, exist_ok=True)
+
+    pk = policy.model._meta.pk.attname
+    path = directory / f"{rows[0][pk]:012d}-{rows[-1][pk]:012d}.jsonl.gz"
+    temp_path = path.with_suffix('.tmp')
+    with gzip.open(temp_path, 'wt', encoding='utf-8') as archive:
+        for row in rows:
+            archive.write(json.dumps(row, cls=DjangoJSONEncoder) + '\n')
+    # Rename setelah file lengkap, jadi file arsip tidak pernah setengah jadi
+    os.replace(temp_path, path)
+    return path
+
+
+def read_archive(path):
+    """Baca kembali file arsip (list of dict)"""
+    with gzip.open(path, 'rt', encoding='utf-8') as archive:
+        return [json.loads(line) for line in archive]
+
+
+def iter_chunks(policy, queryset, chunk_size=None):
+    """Row queryset (list of dict) per chunk, urut primary key"""
+    chunk_size = chunk_size or get_retention_settings()['CHUNK_SIZE']
+    pk = policy.model._meta.pk.attname
+    last_pk = None
+    while True:
+        chunk = queryset.order_by(pk)
+        if last_pk is not None:
+            chunk = chunk.filter(**{f'{pk}__gt': last_pk})
+        rows = list(chunk.values()[:chunk_size])
+        if not rows:
+            return
+        yield rows
+        last_pk = rows[-1][pk]
+
+
+def expire_rows(policy, queryset, chunk_size=None, archive_dir=None, dry_run=False):
+    """
+    Arsipkan (opsional) lalu hapus row di queryset per chunk primary key.
+    Setiap chunk ditulis ke file arsip sebelum dihapus, jadi kalau proses
+    berhenti di tengah jalan tidak ada row yang hilang tanpa arsip.
+    """
+    stats = {'rows': 0, 'files': []}
+    if dry_run:
+        stats['rows'] = queryset.count()
+        return stats
+
+    pk = policy.model._meta.pk.attname
+    for rows in iter_chunks(policy, queryset, chunk_size):
+        if policy.archive:
+            stats['files'].append(archive_rows(policy, rows, archive_dir))
+        with transaction.atomic():
+            policy.model.objects.filter(**{f'{pk}__in': [row[pk] for row in rows]}).delete()
+        stats['rows'] += len(rows)
+    return stats
+
+
+# --- Partisi MySQL ------------------------------------------------------
+
+def month_start(day):
+    return date(day.year, day.month, 1)
+
+
+def next_month(day):
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f"p{month:%Y%m}"
+
+
+def partition_month(name):
+    """Bulan dari nama partisi pYYYYMM (None untuk pmax atau nama lain)"""
+    try:
+        return datetime.strptime(name[1:], '%Y%m').date()
+    except ValueError:
+        return None
+
+
+def partition_definition(month):
+    return f"PARTITION {partition_name(month)} VALUES LESS THAN (TO_DAYS('{next_month(month):%Y-%m-%d}'))"
+
+
+def supports_partitions():
+    return connection.vendor == 'mysql'
+
+
+def get_partitions(table):
+    """Nama partisi tabel (urut), kosong jika tabel belum dipartisi"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL "
+            "ORDER BY PARTITION_ORDINAL_POSITION",
+            [table],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def setup_partitions_sql(table, first_month, last_month):
+    """
+    SQL untuk mengubah tabel menjadi RANGE partition bulanan pada timestamp.
+    MySQL mewajibkan kolom partisi ada di setiap unique key, jadi primary key
+    diganti menjadi (id, timestamp); bagi Django `id` tetap primary key.
+    """
+    months = []
+    month = first_month
+    while month <= last_month:
+        months.append(partition_definition(month))
+        month = next_month(month)
+    months.append(f"PARTITION {MAX_PARTITION} VALUES LESS THAN MAXVALUE")
+    return [
+        f"ALTER TABLE `{table}` DROP PRIMARY KEY, ADD PRIMARY KEY (`id`, `timestamp`)",
+        f"ALTER TABLE `{table}` PARTITION BY RANGE (TO_DAYS(`timestamp`)) ({', '.join(months)})",
+    ]
+
+
+def add_partitions_sql(table, existing, last_month):
+    """SQL untuk menyiapkan partisi sampai last_month (memecah pmax yang kosong)"""
+    months = [partition_month(name) for name in existing if partition_month(name)]
+    month = next_month(max(months)) if months else month_start(timezone.localdate())
+    definitions = []
+    while month <= last_month:
+        definitions.append(partition_definition(month))
+        month = next_month(month)
+    if not definitions:
+        return []
+    definitions.append(f"PARTITION {MAX_PARTITION} VALUES LESS THAN MAXVALUE")
+    return [f"ALTER TABLE `{table}` REORGANIZE PARTITION {MAX_PARTITION} INTO ({', '.join(definitions)})"]
+
+
+def expired_partitions(existing, cutoff):
+    """Partisi yang seluruh isinya lebih tua dari cutoff"""
+    cutoff_day = cutoff.date() if isinstance(cutoff, datetime) else cutoff
+    return [
+        name for name in existing
+        if partition_month(name) and next_month(partition_month(name)) <= cutoff_day
+    ]
+
+
+def last_partition_month(months_ahead=None):
+    months_ahead = get_retention_settings()['PARTITION_MONTHS_AHEAD'] if months_ahead is None else months_ahead
+    month = month_start(timezone.localdate())
+    for _ in range(months_ahead):
+        month = next_month(month)
+    return month
+
+
+def setup_partitions(policy, months_ahead=None):
+    """Partisi ulang tabel (sekali saja, operasi berat pada tabel besar)"""
+    table = policy.model._meta.db_table
+    if get_partitions(table):
+        return []
+    first = policy.model.objects.order_by(policy.date_field).values_list(policy.date_field, flat=True).first()
+    first_month = month_start(timezone.localtime(first).date() if first else timezone.localdate())
+    last_month = last_partition_month(months_ahead)
+
+    statements = setup_partitions_sql(table, first_month, last_month)
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+    return statements
+
+
+def rotate_partitions(policy, months_ahead=None, now=None, archive_dir=None, dry_run=False):
+    """
+    Siapkan partisi bulan-bulan berikutnya, lalu arsipkan dan DROP partisi
+    yang sudah melewati masa retensi (tanpa DELETE per row).
+    """
+    table = policy.model._meta.db_table
+    existing = get_partitions(table)
+    stats = {'rows': 0, 'files': [], 'dropped': [], 'statements': []}
+    stats['statements'] += add_partitions_sql(table, existing, last_partition_month(months_ahead))
+
+    limit_id = retention_limit_id(policy)
+    for name in expired_partitions(existing, policy.cutoff(now)):
+        month = partition_month(name)
+        rows = policy.model.objects.filter(**{
+            f'{policy.date_field}__gte': timezone.make_aware(datetime.combine(month, time.min)),
+            f'{policy.date_field}__lt': timezone.make_aware(datetime.combine(next_month(month), time.min)),
+        })
+        if limit_id is not None and rows.filter(id__gt=limit_id).exists():
+            logger.warning("Partition %s of %s has rows that are not rolled up yet, skipping", name, table)
+            continue
+        if dry_run:
+            stats['rows'] += rows.count()
+        else:
+            # Hanya menulis arsip; row ikut hilang bersama partisi
+            for chunk in iter_chunks(policy, rows):
+                if policy.archive:
+                    stats['files'].append(archive_rows(policy, chunk, archive_dir))
+                stats['rows'] += len(chunk)
+        stats['dropped'].append(name)
+        stats['statements'].append(f"ALTER TABLE `{table}` DROP PARTITION {name}")
+
+    if not dry_run:
+        with connection.cursor() as cursor:
+            for statement in stats['statements']:
+                cursor.execute(statement)
+    return stats
+
+
+# --- Entry point --------------------------------------------------------
+
+def apply_retention(policy, now=None, archive_dir=None, dry_run=False):
+    """
+    Terapkan retensi untuk satu model: DROP partisi jika tabel dipartisi di
+    MySQL, selain itu arsip + DELETE per chunk primary key.
+    """
+    if policy.partitioned and supports_partitions() and get_partitions(policy.model._meta.db_table):
+        stats = rotate_partitions(policy, now=now, archive_dir=archive_dir, dry_run=dry_run)
+        stats['mode'] = 'partitions'
+        return stats
+
+    queryset = policy.model.objects.filter(**{f'{policy.date_field}__lt': policy.cutoff(now)})
+    limit_id = retention_limit_id(policy)
+    if limit_id is not None:
+        queryset = queryset.filter(id__lte=limit_id)
+    stats = expire_rows(policy, queryset, archive_dir=archive_dir, dry_run=dry_run)
+    stats['mode'] = 'chunked_delete'
+    return stats
@@ -0,0 +1,204 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, F, Max, Q, Sum, Value, When
+from django.db.models.functions import Coalesce, Greatest, TruncDay, TruncHour
+from django.utils import timezone
+
+from .models import (
+    EndpointLatencySketch,
+    LATENCY_BUCKETS,
+    ROLLUP_DIMENSIONS,
+    RequestDailyRollup,
+    RequestHourlyRollup,
+    RequestLog,
+    RollupWatermark,
+    UniqueVisitorSketch,
+)
+from .hll import update_unique_sketches
+from .resources import PER_REQUEST_MEASUREMENTS
+from .sketches import update_latency_sketches
+
+DEFAULT_ROLLUP_SETTINGS = {
+    'BATCH_SIZE': 50000,     # Jumlah id RequestLog per transaksi
+    'SETTLE_SECONDS': 60,    # Abaikan log yang lebih baru dari ini (masih bisa tertunda di sink)
+}
+
+WATERMARK_NAME = 'request_rollups'
+
+# Kolom RequestLog -> dimensi rollup (NULL disimpan sebagai '' supaya unique constraint berlaku)
+DIMENSION_EXPRESSIONS = {
+    'endpoint': F('endpoint'),
+    'method': F('method'),
+    'status_class': Case(
+        When(status_code__gte=500, then=Value('5xx')),
+        When(status_code__gte=400, then=Value('4xx')),
+        When(status_code__gte=300, then=Value('3xx')),
+        When(status_code__gte=200, then=Value('2xx')),
+        default=Value('1xx'),
+    ),
+    'device_type': Coalesce('device_type', Value('')),
+    'browser': Coalesce('browser', Value('')),
+    'feature': Coalesce('feature_accessed', Value('')),
+    'conversion_goal': Coalesce('conversion_goal', Value('')),
+}
+
+AGGREGATES = {
+    'request_count': Count('id'),
+    'error_count': Count('id', filter=Q(is_error=True)),
+    'suspicious_count': Count('id', filter=Q(is_suspicious=True)),
+    'throttled_count': Count('id', filter=Q(is_throttled=True)),
+    'auth_failed_count': Count('id', filter=Q(auth_status='failed')),
+    'query_heavy_count': Count('id', filter=Q(db_flags__threshold_exceeded=True)),
+    'response_time_sum': Sum('response_time'),
+    'response_time_max': Max('response_time'),
+    'db_query_time_sum': Sum('db_query_time'),
+    'db_query_time_samples': Count('db_query_time'),
+    'db_query_count_sum': Sum('db_query_count'),
+    'db_query_count_samples': Count('db_query_count'),
+    # Log lama berisi RSS worker (bukan per request) tidak ikut dirata-rata
+    'memory_usage_sum': Sum('memory_usage', filter=Q(memory_measurement__in=PER_REQUEST_MEASUREMENTS)),
+    'memory_usage_samples': Count('memory_usage', filter=Q(memory_measurement__in=PER_REQUEST_MEASUREMENTS)),
+    'engagement_time_sum': Sum('engagement_time'),
+    'engagement_time_samples': Count('engagement_time'),
+    **{
+        f'latency_le_{bound}': Count('id', filter=Q(response_time__lte=bound))
+        for bound in LATENCY_BUCKETS
+    },
+    'latency_le_inf': Count('id'),
+}
+
+ROLLUP_TRUNCATIONS = (
+    (RequestHourlyRollup, TruncHour),
+    (RequestDailyRollup, TruncDay),
+)
+
+
+def get_rollup_settings():
+    return {**DEFAULT_ROLLUP_SETTINGS, **getattr(settings, 'ANALYTICS_ROLLUPS', {})}
+
+
+def aggregate_logs(first_id, last_id, truncate):
+    """Agregasi RequestLog dengan first_id < id <= last_id per bucket dan dimensi"""
+    return (
+        RequestLog.objects.filter(id__gt=first_id, id__lte=last_id)
+        .annotate(
+            rollup_bucket=truncate('timestamp'),
+            **{f'rollup_{name}': expression for name, expression in DIMENSION_EXPRESSIONS.items()},
+        )
+        .values('rollup_bucket', *(f'rollup_{name}' for name in DIMENSION_EXPRESSIONS))
+        .annotate(**AGGREGATES)
+        .order_by()
+    )
+
+
+def upsert_rollup(model, row):
+    """Tambahkan satu baris hasil agregasi ke rollup (increment dengan F())"""
+    dimensions = {name: row[f'rollup_{name}'] for name in ROLLUP_DIMENSIONS}
+    values = {name: row[name] or 0 for name in AGGREGATES}
+
+    changes = {name: F(name) + value for name, value in values.items() if name != 'response_time_max'}
+    changes['response_time_max'] = Greatest('response_time_max', Value(float(values['response_time_max'])))
+
+    if not model.objects.filter(**dimensions).update(**changes):
+        model.objects.create(**dimensions, **values)
+
+
+def materialize_rollups(batch_size=None, settle_seconds=None, now=None):
+    """
+    Proses RequestLog yang id-nya di atas watermark ke rollup per jam dan per hari
+    (termasuk sketch latency per endpoint dan HyperLogLog pengunjung unik).
+    Setiap batch berjalan dalam satu transaksi bersama update watermark, dan row
+    watermark dikunci (select_for_update) sehingga dua proses tidak bisa dobel hitung.
+    """
+    config = get_rollup_settings()
+    batch_size = batch_size or config['BATCH_SIZE']
+    settle_seconds = config['SETTLE_SECONDS'] if settle_seconds is None else settle_seconds
+    now = now or timezone.now()
+
+    # Batas atas: id terbesar yang sudah "tenang" (scan mundur lewat primary key)
+    cutoff = now - timedelta(seconds=settle_seconds)
+    upper_id = (
+        RequestLog.objects.filter(timestamp__lt=cutoff)
+        .order_by('-id')
+        .values_list('id', flat=True)
+        .first()
+    ) or 0
+
+    RollupWatermark.objects.get_or_create(name=WATERMARK_NAME)
+    stats = {'batches': 0, 'groups': 0, 'sketches': 0, 'first_id': None, 'last_id': None}
+
+    while True:
+        with transaction.atomic():
+            watermark = RollupWatermark.objects.select_for_update().get(name=WATERMARK_NAME)
+            if stats['first_id'] is None:
+                stats['first_id'] = watermark.last_id
+            if watermark.last_id >= upper_id:
+                stats['last_id'] = watermark.last_id
+                return stats
+
+            last_id = min(watermark.last_id + batch_size, upper_id)
+            for model, truncate in ROLLUP_TRUNCATIONS:
+                for row in aggregate_logs(watermark.last_id, last_id, truncate):
+                    upsert_rollup(model, row)
+                    stats['groups'] += 1
+            stats['sketches'] += update_latency_sketches(watermark.last_id, last_id)
+            stats['sketches'] += update_unique_sketches(watermark.last_id, last_id)
+
+            watermark.last_id = last_id
+            watermark.save(update_fields=['last_id', 'updated_at'])
+            stats['batches'] += 1
+
+
+def reset_rollups():
+    """Hapus semua rollup dan watermark (dipakai untuk rebuild penuh)"""
+    with transaction.atomic():
+        RequestHourlyRollup.objects.all().delete()
+        RequestDailyRollup.objects.all().delete()
+        EndpointLatencySketch.objects.all().delete()
+        UniqueVisitorSketch.objects.all().delete()
+        RollupWatermark.objects.filter(name=WATERMARK_NAME).delete()
+
+
+def window_start(days):
+    """Awal hari (waktu lokal) untuk rentang `days` hari terakhir, termasuk hari ini"""
+    today = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+    return today - timedelta(days=days - 1)
+
+
+def summarize_rollups(queryset):
+    """Total counter dan rata-rata dari sekumpulan rollup (satu query agregasi)"""
+    totals = queryset.aggregate(
+        peak_response_time=Max('response_time_max'),
+        conversion_count=Sum('request_count', filter=~Q(conversion_goal='')),
+        **{name: Sum(name) for name in AGGREGATES if name != 'response_time_max'},
+    )
+    totals = {name: value or 0 for name, value in totals.items()}
+
+    def ratio(total, samples):
+        return totals[total] / totals[samples] if totals[samples] else 0
+
+    requests = totals['request_count']
+    totals.update({
+        'avg_response_time': totals['response_time_sum'] / requests if requests else 0,
+        'error_rate': totals['error_count'] / requests * 100 if requests else 0,
+        'conversion_rate': totals['conversion_count'] / requests * 100 if requests else 0,
+        'avg_db_time': ratio('db_query_time_sum', 'db_query_time_samples'),
+        'avg_db_queries': ratio('db_query_count_sum', 'db_query_count_samples'),
+        'avg_memory': ratio('memory_usage_sum', 'memory_usage_samples'),
+        'avg_engagement_time': ratio('engagement_time_sum', 'engagement_time_samples'),
+    })
+    return totals
+
+
+def rollup_distribution(queryset, field, limit=None):
+    """{nilai dimensi: jumlah request}, diurutkan dari yang terbanyak"""
+    rows = (
+        queryset.values(field)
+        .annotate(count=Sum('request_count'))
+        .order_by('-count')
+    )
+    if limit:
+        rows = rows[:limit]
+    return {row[field]: row['count'] for row in rows}
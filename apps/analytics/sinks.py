@@ -0,0 +1,243 @@
+import atexit
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import close_old_connections, connection
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from .models import RequestLog
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SINK_SETTINGS = {
+    'BACKEND': 'apps.analytics.sinks.QueuedLogSink',
+    'MAX_QUEUE_SIZE': 10000,      # Jumlah maksimal record yang menunggu di memori
+    'BATCH_SIZE': 200,            # Flush ketika antrian mencapai ukuran ini
+    'FLUSH_INTERVAL': 2.0,        # ... atau setelah sekian detik
+    'OVERFLOW_POLICY': 'drop_oldest',  # drop_oldest / sample / block
+    'SAMPLE_RATE': 0.1,           # Porsi record yang diterima saat policy 'sample' aktif
+    'HIGH_WATERMARK': 0.8,        # Mulai sampling ketika antrian terisi 80%
+    'BLOCK_TIMEOUT': 0.05,        # Waktu tunggu maksimal (detik) untuk policy 'block'
+}
+
+OVERFLOW_POLICIES = ('drop_oldest', 'sample', 'block')
+
+
+class LogSink:
+    """Base class untuk tujuan penulisan RequestLog"""
+
+    def __init__(self, **options):
+        self.options = options
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            'emitted': 0,
+            'flushed': 0,
+            'dropped': 0,
+            'failed': 0,
+        }
+
+    def _count(self, name, value=1):
+        with self._stats_lock:
+            self.stats[name] += value
+
+    def get_stats(self):
+        """Snapshot counter sink (emitted/flushed/dropped/failed)"""
+        with self._stats_lock:
+            return dict(self.stats)
+
+    def emit(self, record):
+        raise NotImplementedError
+
+    def flush(self):
+        """Tulis semua record yang masih tertunda"""
+
+    def close(self):
+        self.flush()
+
+
+class SyncLogSink(LogSink):
+    """Sink sinkron, menulis setiap record langsung (perilaku lama middleware)"""
+
+    def emit(self, record):
+        self._count('emitted')
+        try:
+            record.save()
+            self._count('flushed')
+        except Exception:
+            self._count('failed')
+            logger.exception("Failed to write RequestLog")
+
+
+class QueuedLogSink(LogSink):
+    """
+    Sink asinkron: record dimasukkan ke antrian in-process yang dibatasi,
+    lalu thread flusher menulisnya dengan bulk_create per batch
+    (dipicu oleh ukuran batch atau interval waktu).
+    """
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        config = {**DEFAULT_SINK_SETTINGS, **options}
+        self.max_queue_size = int(config['MAX_QUEUE_SIZE'])
+        self.batch_size = int(config['BATCH_SIZE'])
+        self.flush_interval = float(config['FLUSH_INTERVAL'])
+        self.overflow_policy = config['OVERFLOW_POLICY']
+        self.sample_rate = float(config['SAMPLE_RATE'])
+        self.high_watermark = int(self.max_queue_size * float(config['HIGH_WATERMARK']))
+        self.block_timeout = float(config['BLOCK_TIMEOUT'])
+
+        if self.overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Invalid overflow policy: {self.overflow_policy}")
+
+        self._queue = deque()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._write_lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._stopping = False
+
+    def __len__(self):
+        with self._lock:
+            return len(self._queue)
+
+    def _ensure_flusher(self):
+        """Start thread flusher (ulang setelah fork worker gunicorn)"""
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._stopping = False
+            self._thread = threading.Thread(
+                target=self._run,
+                name='analytics-log-flusher',
+                daemon=True,
+            )
+            self._thread.start()
+
+    def emit(self, record):
+        self._ensure_flusher()
+        self._count('emitted')
+
+        with self._lock:
+            size = len(self._queue)
+
+            if size >= self.max_queue_size:
+                if self.overflow_policy == 'drop_oldest':
+                    self._queue.popleft()
+                    self._count('dropped')
+                elif self.overflow_policy == 'block':
+                    # Backpressure: tunggu flusher sebentar sebelum membuang record
+                    self._not_empty.notify()
+                    deadline = time.monotonic() + self.block_timeout
+                    while len(self._queue) >= self.max_queue_size:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0 or not self._not_full.wait(remaining):
+                            break
+                    if len(self._queue) >= self.max_queue_size:
+                        self._count('dropped')
+                        return
+                else:
+                    self._count('dropped')
+                    return
+            elif (
+                self.overflow_policy == 'sample'
+                and size >= self.high_watermark
+                and random.random() >= self.sample_rate
+            ):
+                self._count('dropped')
+                return
+
+            self._queue.append(record)
+            if len(self._queue) >= self.batch_size:
+                self._not_empty.notify()
+
+    def _take_batch(self):
+        batch = []
+        while self._queue and len(batch) < self.batch_size:
+            batch.append(self._queue.popleft())
+        if batch:
+            self._not_full.notify_all()
+        return batch
+
+    def _run(self):
+        try:
+            while True:
+                with self._lock:
+                    if not self._stopping and len(self._queue) < self.batch_size:
+                        self._not_empty.wait(self.flush_interval)
+                    batch = self._take_batch()
+                    stopping = self._stopping
+
+                if batch:
+                    self._write_batch(batch)
+                elif stopping:
+                    break
+        finally:
+            connection.close()
+
+    def _write_batch(self, batch):
+        with self._write_lock:
+            try:
+                RequestLog.objects.bulk_create(batch, batch_size=self.batch_size)
+                self._count('flushed', len(batch))
+            except Exception:
+                self._count('failed', len(batch))
+                logger.exception("Failed to flush %d RequestLog records", len(batch))
+                # Koneksi bisa rusak setelah error, buang supaya batch berikutnya reconnect
+                close_old_connections()
+
+    def flush(self):
+        """Tulis semua record tertunda secara sinkron dari thread pemanggil"""
+        while True:
+            with self._lock:
+                batch = self._take_batch()
+            if not batch:
+                return
+            self._write_batch(batch)
+
+    def close(self, timeout=5.0):
+        """Hentikan flusher dan kosongkan antrian (dipanggil saat worker shutdown)"""
+        with self._lock:
+            self._stopping = True
+            self._not_empty.notify_all()
+            thread = self._thread
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout)
+        self.flush()
+
+
+_sink = None
+_sink_lock = threading.Lock()
+
+
+def get_log_sink():
+    """Ambil sink RequestLog yang dikonfigurasi lewat settings.ANALYTICS_LOG_SINK"""
+    global _sink
+    if _sink is None:
+        with _sink_lock:
+            if _sink is None:
+                options = {**DEFAULT_SINK_SETTINGS, **getattr(settings, 'ANALYTICS_LOG_SINK', {})}
+                backend = import_string(options.pop('BACKEND'))
+                _sink = backend(**options)
+                atexit.register(_sink.close)
+    return _sink
+
+
+@receiver(setting_changed)
+def reset_log_sink(*, setting, **kwargs):
+    """Buat ulang sink ketika ANALYTICS_LOG_SINK diubah (misal lewat override_settings)"""
+    global _sink
+    if setting == 'ANALYTICS_LOG_SINK' and _sink is not None:
+        _sink.close()
+        _sink = None
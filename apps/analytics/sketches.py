@@ -0,0 +1,160 @@
+import math
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models.functions import TruncHour
+
+from .models import EndpointLatencySketch, RequestLog
+
+DEFAULT_SKETCH_SETTINGS = {
+    'RELATIVE_ACCURACY': 0.01,  # Error relatif maksimal untuk nilai quantile (1%)
+}
+
+# Endpoint khusus yang menampung semua request dalam satu jam
+ALL_ENDPOINTS = '*'
+
+DEFAULT_QUANTILES = (0.5, 0.95, 0.99)
+
+
+def get_relative_accuracy():
+    options = {**DEFAULT_SKETCH_SETTINGS, **getattr(settings, 'ANALYTICS_LATENCY_SKETCH', {})}
+    return float(options['RELATIVE_ACCURACY'])
+
+
+class LatencySketch:
+    """
+    Histogram log-bucket (gaya DDSketch) untuk response time. Bucket ke-i
+    menampung nilai di (gamma^(i-1), gamma^i], sehingga quantile yang dihasilkan
+    selalu dalam error relatif `relative_accuracy`. Dua sketch dengan akurasi yang
+    sama bisa digabung dengan menjumlahkan bucket (antar jam maupun antar worker).
+    """
+
+    MIN_VALUE = 1e-3  # ms; nilai di bawah ini dihitung di zero_count
+
+    def __init__(self, relative_accuracy=None):
+        self.relative_accuracy = relative_accuracy or get_relative_accuracy()
+        self.gamma = (1 + self.relative_accuracy) / (1 - self.relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins = defaultdict(int)
+        self.zero_count = 0
+        self.count = 0
+        self.min = None
+        self.max = None
+
+    def add(self, value, count=1):
+        if value is None:
+            return
+        if value <= self.MIN_VALUE:
+            self.zero_count += count
+        else:
+            self.bins[math.ceil(math.log(value) / self._log_gamma)] += count
+        self.count += count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other):
+        if not self.count and not math.isclose(self.gamma, other.gamma):
+            # Sketch kosong mengikuti akurasi sketch yang digabungkan
+            self.__init__(relative_accuracy=other.relative_accuracy)
+        if not math.isclose(self.gamma, other.gamma):
+            raise ValueError("Cannot merge latency sketches with different relative accuracy")
+        for index, count in other.bins.items():
+            self.bins[index] += count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        for name, pick in (('min', min), ('max', max)):
+            mine, theirs = getattr(self, name), getattr(other, name)
+            setattr(self, name, theirs if mine is None else mine if theirs is None else pick(mine, theirs))
+        return self
+
+    def quantile(self, q):
+        """Perkiraan nilai pada quantile q (0..1), None jika sketch kosong"""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if rank < seen:
+                # Titik tengah bucket (dalam skala relatif), dijepit ke min/max yang teramati
+                value = 2 * self.gamma ** index / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            'gamma': self.gamma,
+            'zero_count': self.zero_count,
+            'min': self.min,
+            'max': self.max,
+            'bins': {str(index): count for index, count in self.bins.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        gamma = data['gamma']
+        sketch = cls(relative_accuracy=(gamma - 1) / (gamma + 1))
+        sketch.zero_count = data['zero_count']
+        sketch.min = data['min']
+        sketch.max = data['max']
+        for index, count in data['bins'].items():
+            sketch.bins[int(index)] = count
+        sketch.count = sketch.zero_count + sum(sketch.bins.values())
+        return sketch
+
+
+def update_latency_sketches(first_id, last_id):
+    """
+    Tambahkan response time RequestLog (first_id < id <= last_id) ke sketch per
+    endpoint per jam. Dipanggil dari materialize_rollups di dalam transaksi
+    watermark, jadi setiap log hanya masuk sekali.
+    """
+    sketches = defaultdict(LatencySketch)
+    rows = (
+        RequestLog.objects.filter(id__gt=first_id, id__lte=last_id)
+        .annotate(hour=TruncHour('timestamp'))
+        .values_list('hour', 'endpoint', 'response_time')
+        .order_by()
+    )
+    for hour, endpoint, response_time in rows.iterator():
+        sketches[hour, endpoint].add(response_time)
+        sketches[hour, ALL_ENDPOINTS].add(response_time)
+
+    for (hour, endpoint), sketch in sketches.items():
+        stored = (
+            EndpointLatencySketch.objects.select_for_update()
+            .filter(bucket=hour, endpoint=endpoint)
+            .first()
+        )
+        if stored is None:
+            EndpointLatencySketch.objects.create(
+                bucket=hour, endpoint=endpoint, count=sketch.count, sketch=sketch.to_dict(),
+            )
+            continue
+        merged = LatencySketch.from_dict(stored.sketch).merge(sketch)
+        stored.count = merged.count
+        stored.sketch = merged.to_dict()
+        stored.save(update_fields=['count', 'sketch'])
+    return len(sketches)
+
+
+def latency_percentiles(sketch, quantiles=DEFAULT_QUANTILES):
+    """{'p50': ..., 'p95': ..., 'p99': ...} dari sebuah sketch"""
+    return {f'p{q * 100:g}': sketch.quantile(q) for q in quantiles}
+
+
+def endpoint_percentiles(start, endpoints=None, quantiles=DEFAULT_QUANTILES):
+    """
+    Percentile per endpoint sejak `start` (None = semua data). Tanpa
+    `endpoints` hasilnya hanya {'*': ...}, yaitu percentile untuk semua request.
+    """
+    endpoints = list(endpoints) if endpoints is not None else [ALL_ENDPOINTS]
+    sketches = {endpoint: LatencySketch() for endpoint in endpoints}
+    rows = EndpointLatencySketch.objects.filter(endpoint__in=endpoints)
+    if start is not None:
+        rows = rows.filter(bucket__gte=start)
+    for endpoint, data in rows.values_list('endpoint', 'sketch'):
+        sketches[endpoint].merge(LatencySketch.from_dict(data))
+    return {endpoint: latency_percentiles(sketch, quantiles) for endpoint, sketch in sketches.items()}
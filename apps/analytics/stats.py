@@ -0,0 +1,24 @@
+"""Statistik analytics yang di-cache dan bisa di-precompute (command precompute_stats)"""
+from functools import partial
+
+from apps.core.stats_cache import register_stats
+
+from .dashboard import DASHBOARD_WINDOWS, compute_dashboard_metrics, dashboard_metrics_key
+from .models import RequestDailyRollup
+from .rollups import rollup_distribution, window_start
+
+DISTRIBUTIONS_KEY = 'analytics_distributions:30'
+
+
+def compute_distributions():
+    recent_rollups = RequestDailyRollup.objects.filter(bucket__gte=window_start(30))
+    return {
+        'feature_stats': rollup_distribution(recent_rollups.exclude(feature=''), 'feature'),
+        'conversion_stats': rollup_distribution(recent_rollups.exclude(conversion_goal=''), 'conversion_goal'),
+        'browser_stats': rollup_distribution(recent_rollups, 'browser', limit=5),
+    }
+
+
+for days in DASHBOARD_WINDOWS:
+    register_stats(dashboard_metrics_key(days), partial(compute_dashboard_metrics, days))
+register_stats(DISTRIBUTIONS_KEY, compute_distributions)
@@ -1,3 +1,785 @@
-from django.test import TestCase
+import json
+import shutil
+import tempfile
+import time
+from datetime import date, timedelta
 
-# Create your tests here.
+import psutil
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from .agents import UserAgentCache
+from .dashboard import compute_dashboard_metrics, get_dashboard_metrics
+from .models import CustomEvent, RequestDailyRollup, RequestHourlyRollup, RequestLog
+from .hll import HyperLogLog, count_unique
+from .sketches import LatencySketch, endpoint_percentiles
+from .index_audit import IndexInfo, audit, capture_workload, query_columns, redundant_indexes
+from .retention import (
+    add_partitions_sql,
+    apply_retention,
+    expired_partitions,
+    get_retention_policies,
+    read_archive,
+    setup_partitions_sql,
+)
+from .rollups import materialize_rollups, summarize_rollups
+from .ratelimit import SlidingWindowRateLimiter, apply_rate_limit_headers, get_client_ip
+from .scanner import RequestScanner
+from .queries import QueryInspector, get_query_threshold, normalize_sql
+from .resources import (
+    GAUGE_WORKERS_KEY, MEASURED_RUSAGE, MEASURED_WORKER_RSS, RequestResourceMeter, ResourceSampler,
+    get_worker_gauges,
+)
+from .sinks import QueuedLogSink
+from .views import analytics_dashboard_view
+from .workload import WORKLOAD
+
+
+def make_log(endpoint='/api/destinations/'):
+    return RequestLog(
+        endpoint=endpoint,
+        method='GET',
+        status_code=200,
+        response_time=12.5,
+        ip_address='127.0.0.1',
+    )
+
+
+class RecordingQueuedLogSink(QueuedLogSink):
+    """QueuedLogSink tanpa thread flusher, batch dicatat di memori"""
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        self.batches = []
+
+    def _ensure_flusher(self):
+        pass
+
+    def _write_batch(self, batch):
+        self.batches.append(batch)
+        self._count('flushed', len(batch))
+
+
+class QueuedLogSinkTest(SimpleTestCase):
+    def test_flush_writes_in_batches(self):
+        sink = RecordingQueuedLogSink(BATCH_SIZE=2, MAX_QUEUE_SIZE=10)
+        for _ in range(5):
+            sink.emit(make_log())
+
+        sink.flush()
+
+        self.assertEqual([len(batch) for batch in sink.batches], [2, 2, 1])
+        self.assertEqual(sink.get_stats()['flushed'], 5)
+        self.assertEqual(len(sink), 0)
+
+    def test_drop_oldest_policy(self):
+        sink = RecordingQueuedLogSink(MAX_QUEUE_SIZE=3, BATCH_SIZE=10, OVERFLOW_POLICY='drop_oldest')
+        for i in range(5):
+            sink.emit(make_log(f'/api/{i}/'))
+
+        sink.flush()
+
+        endpoints = [log.endpoint for log in sink.batches[0]]
+        self.assertEqual(endpoints, ['/api/2/', '/api/3/', '/api/4/'])
+        self.assertEqual(sink.get_stats()['dropped'], 2)
+
+    def test_sample_policy_above_high_watermark(self):
+        sink = RecordingQueuedLogSink(
+            MAX_QUEUE_SIZE=4, BATCH_SIZE=10, HIGH_WATERMARK=0.5,
+            OVERFLOW_POLICY='sample', SAMPLE_RATE=0,
+        )
+        for _ in range(6):
+            sink.emit(make_log())
+
+        self.assertEqual(len(sink), 2)
+        self.assertEqual(sink.get_stats()['dropped'], 4)
+
+    def test_block_policy_drops_after_timeout(self):
+        sink = RecordingQueuedLogSink(
+            MAX_QUEUE_SIZE=1, BATCH_SIZE=10,
+            OVERFLOW_POLICY='block', BLOCK_TIMEOUT=0.01,
+        )
+        sink.emit(make_log())
+        sink.emit(make_log())
+
+        self.assertEqual(len(sink), 1)
+        self.assertEqual(sink.get_stats()['dropped'], 1)
+
+    def test_invalid_policy(self):
+        with self.assertRaises(ValueError):
+            QueuedLogSink(OVERFLOW_POLICY='ignore')
+
+
+class QueuedLogSinkDatabaseTest(TestCase):
+    def test_close_flushes_pending_records(self):
+        sink = QueuedLogSink(BATCH_SIZE=50, FLUSH_INTERVAL=60)
+        sink._ensure_flusher = lambda: None
+        for _ in range(3):
+            sink.emit(make_log())
+
+        sink.close()
+
+        self.assertEqual(RequestLog.objects.count(), 3)
+        self.assertEqual(sink.get_stats()['flushed'], 3)
+
+
+class StaticSampler(ResourceSampler):
+    """Sampler tanpa thread dengan gauge tetap"""
+
+    def __init__(self, gauges):
+        super().__init__()
+        self._gauges = gauges
+
+    def start(self):
+        pass
+
+
+class ResourceSamplerRegistryTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def sampler(self, worker_id):
+        sampler = ResourceSampler()
+        sampler.worker_id = worker_id
+        sampler._process = psutil.Process()
+        return sampler
+
+    def test_workers_reregister_and_dead_workers_are_pruned(self):
+        cache.set(GAUGE_WORKERS_KEY, ['host:dead'], None)
+        first, second = self.sampler('host:1'), self.sampler('host:2')
+
+        first.sample()
+        # Worker yang boot bersamaan menimpa daftar tanpa host:1
+        cache.set(GAUGE_WORKERS_KEY, ['host:2'], None)
+        second.sample()
+        first.sample()
+
+        self.assertEqual(cache.get(GAUGE_WORKERS_KEY), ['host:1', 'host:2'])
+        self.assertEqual(set(get_worker_gauges()), {'host:1', 'host:2'})
+
+
+class RequestResourceMeterTest(SimpleTestCase):
+    def test_unsampled_request_has_no_memory(self):
+        # RSS worker hanya gauge, bukan angka memori per request
+        meter = RequestResourceMeter(StaticSampler({'rss_mb': 120.5}), sample_rate=0)
+
+        token = meter.start()
+
+        self.assertIsNone(token)
+        self.assertEqual(meter.finish(token), (None, None))
+
+    def test_sampled_request_uses_rusage(self):
+        meter = RequestResourceMeter(StaticSampler({}), sample_rate=1)
+
+        memory, measurement = meter.finish(meter.start())
+
+        self.assertEqual(measurement, MEASURED_RUSAGE)
+        self.assertGreaterEqual(memory, 0)
+
+
+class QueryInspectorTest(TestCase):
+    def test_normalize_sql_strips_literals(self):
+        self.assertEqual(
+            normalize_sql("SELECT * FROM t WHERE id IN (1, 2, 3) AND name = 'x'"),
+            normalize_sql("SELECT * FROM t WHERE id IN (%s, %s) AND name = %s"),
+        )
+
+    def test_capture_counts_queries_and_repeated_shapes(self):
+        inspector = QueryInspector()
+        with inspector.capture():
+            for i in range(6):
+                list(RequestLog.objects.filter(status_code=200 + i))
+
+        self.assertEqual(inspector.count, 6)
+        self.assertGreaterEqual(inspector.total_time, 0)
+        self.assertEqual(len(inspector.repeated_queries(5)), 1)
+
+    @override_settings(ANALYTICS_QUERY_THRESHOLDS={
+        'DEFAULT': 10,
+        'ENDPOINTS': {'/api/': 4, '/api/latest-content/': 2},
+        'REPEAT_THRESHOLD': 50,
+    })
+    def test_threshold_per_endpoint(self):
+        self.assertEqual(get_query_threshold('/api/latest-content/'), 2)
+        self.assertEqual(get_query_threshold('/api/flora/'), 4)
+        self.assertEqual(get_query_threshold('/admin/'), 10)
+
+        inspector = QueryInspector()
+        inspector.count = 3
+        self.assertIsNone(inspector.get_flags('/api/flora/'))
+        self.assertTrue(inspector.get_flags('/api/latest-content/')['threshold_exceeded'])
+
+
+class SlidingWindowRateLimiterTest(SimpleTestCase):
+    limits = {
+        'DEFAULT': {'limit': 3, 'window': 60},
+        'ENDPOINTS': {'/api/chatbot/': {'limit': 1, 'window': 60}},
+        'API_KEYS': {'partner-key': {'limit': 10, 'window': 60}},
+    }
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.limiter = SlidingWindowRateLimiter(self.limits)
+
+    def test_limit_within_window(self):
+        request = self.factory.get('/api/flora/')
+        results = [self.limiter.hit(request, now=1200) for _ in range(4)]
+
+        self.assertEqual([r.allowed for r in results], [True, True, True, False])
+        self.assertEqual(results[2].remaining, 0)
+        self.assertEqual(results[3].retry_after, 60)
+
+    def test_forwarded_for_cannot_pick_the_bucket(self):
+        first = self.factory.get('/api/flora/', HTTP_X_FORWARDED_FOR='1.1.1.1', REMOTE_ADDR='10.0.0.9')
+        rotated = self.factory.get('/api/flora/', HTTP_X_FORWARDED_FOR='2.2.2.2', REMOTE_ADDR='10.0.0.9')
+
+        self.assertEqual(get_client_ip(first), '10.0.0.9')
+        self.assertEqual(self.limiter.get_quota(first)[0], self.limiter.get_quota(rotated)[0])
+
+    def test_client_ip_behind_trusted_proxies(self):
+        request = self.factory.get(
+            '/api/flora/', HTTP_X_FORWARDED_FOR='6.6.6.6, 203.0.113.7, 10.0.0.2', REMOTE_ADDR='10.0.0.1'
+        )
+
+        with self.settings(ANALYTICS_RATE_LIMITS={'NUM_PROXIES': 1}):
+            self.assertEqual(get_client_ip(request), '10.0.0.2')
+        with self.settings(ANALYTICS_RATE_LIMITS={'NUM_PROXIES': 2}):
+            self.assertEqual(get_client_ip(request), '203.0.113.7')
+
+    def test_headers_only_on_private_responses(self):
+        result = self.limiter.hit(self.factory.get('/api/flora/'), now=1200)
+        public = HttpResponse()
+        public['Cache-Control'] = 'public, max-age=60, s-maxage=300'
+        private = HttpResponse()
+        private['Cache-Control'] = 'private, max-age=60'
+
+        self.assertFalse(apply_rate_limit_headers(public, result).has_header('X-RateLimit-Limit'))
+        self.assertEqual(apply_rate_limit_headers(private, result)['X-RateLimit-Limit'], '3')
+        self.assertEqual(apply_rate_limit_headers(HttpResponse(), result)['X-RateLimit-Remaining'], '2')
+
+    def test_previous_window_is_weighted(self):
+        request = self.factory.get('/api/flora/')
+        for _ in range(3):
+            self.limiter.hit(request, now=1200)
+
+        # Setengah window berikutnya: 3 * 0.5 + 1 = 2.5 <= 3
+        self.assertTrue(self.limiter.hit(request, now=1290).allowed)
+        # 3 * 0.5 + 2 = 3.5 > 3
+        result = self.limiter.hit(request, now=1290)
+        self.assertFalse(result.allowed)
+        self.assertEqual(result.retry_after, 10)
+
+    def test_endpoint_and_api_key_quotas(self):
+        chat = self.factory.post('/api/chatbot/chat/')
+        self.assertTrue(self.limiter.hit(chat, now=1200).allowed)
+        self.assertFalse(self.limiter.hit(chat, now=1200).allowed)
+
+        # Endpoint lain memakai counter default yang terpisah
+        self.assertTrue(self.limiter.hit(self.factory.get('/api/flora/'), now=1200).allowed)
+
+        partner = self.factory.post('/api/chatbot/chat/', HTTP_X_API_KEY='partner-key')
+        self.assertEqual(self.limiter.hit(partner, now=1200).limit, 10)
+
+
+@override_settings(
+    ANALYTICS_LOG_SINK={'BACKEND': 'apps.analytics.sinks.SyncLogSink'},
+    ANALYTICS_RATE_LIMITS={
+        'DEFAULT': {'limit': 1, 'window': 3600},
+        'ENDPOINTS': {},
+        'API_KEYS': {},
+    },
+)
+class RateLimitMiddlewareTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_throttled_response_has_rate_limit_headers(self):
+        first = self.client.get('/api/flora/', HTTP_USER_AGENT='Mozilla/5.0')
+        second = self.client.get('/api/flora/', HTTP_USER_AGENT='Mozilla/5.0')
+
+        self.assertEqual(first.status_code, 200)
+        # Response publik (di-cache CDN) tidak membawa kuota milik satu client
+        self.assertIn('public', first['Cache-Control'])
+        self.assertFalse(first.has_header('X-RateLimit-Limit'))
+        self.assertEqual(second.status_code, 429)
+        self.assertEqual(second['X-RateLimit-Limit'], '1')
+        self.assertEqual(second['X-RateLimit-Remaining'], '0')
+        self.assertIn('Retry-After', second)
+        self.assertEqual(RequestLog.objects.filter(is_throttled=True).count(), 1)
+
+
+
+@override_settings(ANALYTICS_LOG_SINK={'BACKEND': 'apps.analytics.sinks.SyncLogSink'})
+class AnalyticsSessionTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_anonymous_api_requests_are_stateless(self):
+        first = self.client.get('/api/flora/', HTTP_USER_AGENT='Mozilla/5.0')
+        second = self.client.get('/api/fauna/', HTTP_USER_AGENT='Mozilla/5.0')
+        self.client.get('/api/flora/', HTTP_USER_AGENT='curl/8.0')
+
+        self.assertNotIn('Cookie', first.get('Vary', ''))
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, first.cookies)
+        self.assertFalse(Session.objects.exists())
+        session_ids = list(RequestLog.objects.order_by('id').values_list('session_id', flat=True))
+        self.assertEqual(session_ids[0], session_ids[1])
+        self.assertNotEqual(session_ids[0], session_ids[2])
+
+    def test_logged_in_user_is_recorded(self):
+        user = User.objects.create_user('visitor', password='secret')
+        self.client.force_login(user)
+
+        self.client.get('/api/flora/', HTTP_USER_AGENT='Mozilla/5.0')
+
+        log = RequestLog.objects.get()
+        self.assertEqual((log.user_id, log.user_type), (user.id, 'registered'))
+
+class RequestScannerTest(SimpleTestCase):
+    user_agent = 'Mozilla/5.0'
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.scanner = RequestScanner(max_field_bytes=64, max_body_bytes=1024)
+
+    def test_reports_matching_rule_and_field(self):
+        request = self.factory.get(
+            '/api/flora/', {'page': '1', 'next': '../../etc/passwd'},
+            HTTP_USER_AGENT=self.user_agent,
+        )
+
+        result = self.scanner.scan(request)
+
+        self.assertTrue(result.is_suspicious)
+        self.assertEqual(result.reason, 'Suspicious query parameter')
+        self.assertEqual((result.rule, result.field), ('path_traversal', 'next'))
+
+    def test_field_is_capped(self):
+        request = self.factory.get(
+            '/api/flora/', {'q': 'a' * 100 + '<script>'},
+            HTTP_USER_AGENT=self.user_agent,
+        )
+
+        self.assertFalse(self.scanner.scan(request).is_suspicious)
+
+    def test_multipart_file_parts_are_skipped(self):
+        upload = SimpleUploadedFile('notes.txt', b'1; DROP TABLE users --')
+        request = self.factory.post(
+            '/api/upload/', {'title': 'Curug', 'file': upload},
+            HTTP_USER_AGENT=self.user_agent,
+        )
+
+        self.assertFalse(self.scanner.scan(request).is_suspicious)
+
+    def test_large_body_is_not_parsed(self):
+        request = self.factory.post(
+            '/api/upload/', {'comment': '<script>' + 'x' * 2048},
+            HTTP_USER_AGENT=self.user_agent,
+        )
+
+        self.assertFalse(self.scanner.scan(request).is_suspicious)
+        self.assertFalse(hasattr(request, '_post'))
+
+    def test_small_form_body_is_scanned(self):
+        request = self.factory.post(
+            '/api/upload/', {'comment': '<script>alert(1)</script>'},
+            HTTP_USER_AGENT=self.user_agent,
+        )
+
+        result = self.scanner.scan(request)
+        self.assertEqual((result.reason, result.rule), ('Suspicious POST data', 'xss'))
+
+    def test_put_body_is_not_parsed(self):
+        request = self.factory.put(
+            '/api/upload/', 'comment=%3Cscript%3E', content_type='application/x-www-form-urlencoded',
+            HTTP_USER_AGENT=self.user_agent,
+        )
+
+        self.assertFalse(self.scanner.scan(request).is_suspicious)
+        self.assertFalse(hasattr(request, '_post'))
+
+    def test_suspicious_user_agent(self):
+        request = self.factory.get('/api/flora/', HTTP_USER_AGENT='curl')
+
+        self.assertEqual(self.scanner.scan(request).rule, 'user_agent')
+
+
+class UserAgentCacheTest(SimpleTestCase):
+    user_agent = (
+        'Mozilla/5.0 (Linux; Android 14; SM-S918B) AppleWebKit/537.36 '
+        '(KHTML, like Gecko) Chrome/124.0.0.0 Mobile Safari/537.36'
+    )
+
+    def test_parses_families(self):
+        info = UserAgentCache().parse(self.user_agent)
+
+        self.assertEqual(info.browser, 'Chrome Mobile')
+        self.assertEqual(info.os, 'Android')
+
+    def test_repeated_user_agent_hits_cache(self):
+        agents = UserAgentCache()
+        for _ in range(3):
+            agents.parse(self.user_agent)
+
+        stats = agents.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['size']), (2, 1, 1))
+
+    def test_cache_is_bounded(self):
+        agents = UserAgentCache(maxsize=2)
+        for version in range(5):
+            agents.parse(f'Mozilla/5.0 Firefox/{version}.0')
+
+        self.assertEqual(agents.stats()['size'], 2)
+
+    def test_missing_user_agent(self):
+        info = UserAgentCache().parse(None)
+
+        self.assertEqual(info.browser, 'Other')
+
+
+class RollupMaterializationTest(TestCase):
+    def setUp(self):
+        self.now = timezone.now().replace(minute=30, second=0, microsecond=0)
+
+    def log(self, **fields):
+        values = {
+            'endpoint': '/api/flora/', 'method': 'GET', 'status_code': 200,
+            'response_time': 100.0, 'ip_address': '10.0.0.1',
+            'timestamp': self.now - timedelta(hours=1), 'device_type': 'Other',
+        }
+        values.update(fields)
+        return RequestLog.objects.create(**values)
+
+    def test_aggregates_by_dimension(self):
+        self.log(response_time=40.0)
+        self.log(response_time=300.0, db_query_count=4)
+        self.log(status_code=500, is_error=True, response_time=3000.0)
+
+        materialize_rollups(now=self.now)
+
+        ok = RequestHourlyRollup.objects.get(status_class='2xx')
+        self.assertEqual((ok.request_count, ok.response_time_sum, ok.response_time_max), (2, 340.0, 300.0))
+        self.assertEqual((ok.latency_le_50, ok.latency_le_500, ok.latency_le_inf), (1, 2, 2))
+        self.assertEqual((ok.db_query_count_sum, ok.db_query_count_samples), (4, 1))
+        failed = RequestDailyRollup.objects.get(status_class='5xx')
+        self.assertEqual((failed.request_count, failed.error_count, failed.feature), (1, 1, ''))
+
+    def test_memory_average_uses_per_request_measurements_only(self):
+        self.log(memory_usage=2.0, memory_measurement=MEASURED_RUSAGE)
+        self.log(memory_usage=4.0, memory_measurement=MEASURED_RUSAGE)
+        # Log lama: RSS worker, bukan memori per request
+        self.log(memory_usage=512.0, memory_measurement=MEASURED_WORKER_RSS)
+        self.log()
+
+        materialize_rollups(now=self.now)
+
+        rollup = RequestHourlyRollup.objects.get()
+        self.assertEqual((rollup.memory_usage_sum, rollup.memory_usage_samples), (6.0, 2))
+
+    def test_only_new_rows_are_processed(self):
+        self.log()
+        materialize_rollups(now=self.now)
+        self.log(response_time=500.0)
+
+        stats = materialize_rollups(now=self.now)
+        materialize_rollups(now=self.now)
+
+        rollup = RequestHourlyRollup.objects.get()
+        self.assertEqual(stats['batches'], 1)
+        self.assertEqual((rollup.request_count, rollup.response_time_sum, rollup.response_time_max), (2, 600.0, 500.0))
+
+    def test_recent_rows_wait_for_settle_window(self):
+        self.log(timestamp=self.now)
+
+        materialize_rollups(now=self.now, settle_seconds=60)
+
+        self.assertFalse(RequestHourlyRollup.objects.exists())
+
+    def test_latency_sketches_merge_across_batches(self):
+        for response_time in range(1, 101):
+            endpoint = '/api/flora/' if response_time % 2 else '/api/fauna/'
+            self.log(endpoint=endpoint, response_time=float(response_time))
+
+        materialize_rollups(now=self.now, batch_size=7)
+        latency = endpoint_percentiles(self.now - timedelta(days=1), ['*', '/api/flora/'])
+
+        self.assertAlmostEqual(latency['*']['p50'], 50.5, delta=1)
+        self.assertAlmostEqual(latency['*']['p99'], 99.0, delta=2)
+        self.assertLessEqual(latency['/api/flora/']['p99'], 99.0)
+
+    def test_unique_visitors_merge_across_days(self):
+        for day in range(3):
+            for visitor in range(10):
+                self.log(
+                    ip_address=f'10.0.0.{visitor + day * 5}',
+                    timestamp=self.now - timedelta(days=day, hours=1),
+                    feature_accessed='flora' if visitor < 4 else None,
+                )
+
+        materialize_rollups(now=self.now)
+
+        self.assertEqual(count_unique('ip'), 20)
+        self.assertEqual(count_unique('ip', start=(self.now - timedelta(hours=1)).date()), 10)
+        self.assertEqual(count_unique('ip', feature='flora'), 12)
+        self.assertEqual(count_unique('user'), 0)
+
+    def test_summary_across_batches(self):
+        for response_time in (100.0, 200.0, 300.0):
+            self.log(response_time=response_time, is_error=response_time > 250)
+
+        materialize_rollups(now=self.now, batch_size=1)
+        summary = summarize_rollups(RequestDailyRollup.objects.all())
+
+        self.assertEqual(summary['request_count'], 3)
+        self.assertAlmostEqual(summary['avg_response_time'], 200.0)
+        self.assertAlmostEqual(summary['error_rate'], 100 / 3)
+
+
+class LatencySketchTest(SimpleTestCase):
+    def test_quantiles_within_relative_accuracy(self):
+        sketch = LatencySketch(relative_accuracy=0.01)
+        for value in range(1, 1001):
+            sketch.add(float(value))
+
+        for q, exact in ((0.5, 500.5), (0.95, 950.05), (0.99, 990.01)):
+            self.assertAlmostEqual(sketch.quantile(q), exact, delta=exact * 0.02)
+
+    def test_merge_matches_single_sketch(self):
+        combined, first, second = LatencySketch(), LatencySketch(), LatencySketch()
+        for value in range(1, 501):
+            combined.add(float(value))
+            (first if value % 2 else second).add(float(value))
+
+        merged = LatencySketch.from_dict(first.to_dict()).merge(second)
+
+        self.assertEqual(merged.count, 500)
+        self.assertEqual(merged.quantile(0.95), combined.quantile(0.95))
+
+    def test_merge_rejects_different_accuracy(self):
+        sketch = LatencySketch(relative_accuracy=0.01)
+        sketch.add(10.0)
+
+        with self.assertRaises(ValueError):
+            sketch.merge(LatencySketch(relative_accuracy=0.05))
+
+    def test_empty_sketch(self):
+        self.assertIsNone(LatencySketch().quantile(0.5))
+
+
+class HyperLogLogTest(SimpleTestCase):
+    def test_estimate_within_error_bound(self):
+        sketch = HyperLogLog(precision=12)
+        for value in range(20000):
+            sketch.add(f'10.0.{value // 256}.{value % 256}')
+
+        self.assertAlmostEqual(sketch.count(), 20000, delta=20000 * 0.05)
+
+    def test_small_cardinality_is_exact_enough(self):
+        sketch = HyperLogLog(precision=12)
+        for _ in range(3):
+            for value in range(50):
+                sketch.add(value)
+
+        self.assertEqual(sketch.count(), 50)
+
+    def test_merge_is_union(self):
+        first, second = HyperLogLog(precision=10), HyperLogLog(precision=10)
+        for value in range(1000):
+            first.add(value)
+            second.add(value + 500)
+
+        merged = HyperLogLog.from_bytes(first.to_bytes()).merge(second)
+
+        self.assertAlmostEqual(merged.count(), 1500, delta=1500 * 0.1)
+        with self.assertRaises(ValueError):
+            first.merge(HyperLogLog(precision=12))
+
+
+@override_settings(ANALYTICS_RETENTION={
+    'CHUNK_SIZE': 2,
+    'MODELS': {
+        'analytics.RequestLog': {'DAYS': 30, 'PARTITIONED': True},
+        'analytics.CustomEvent': {'DAYS': 7, 'ARCHIVE': False},
+    },
+})
+class RetentionTest(TestCase):
+    def setUp(self):
+        self.archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.archive_dir, ignore_errors=True)
+        self.now = timezone.now()
+
+    def log(self, days_ago):
+        return RequestLog.objects.create(
+            endpoint='/api/flora/', method='GET', status_code=200, response_time=10.0,
+            ip_address='10.0.0.1', timestamp=self.now - timedelta(days=days_ago),
+        )
+
+    def test_archives_then_deletes_in_chunks(self):
+        old = [self.log(40) for _ in range(5)]
+        recent = self.log(1)
+        materialize_rollups(now=self.now)
+
+        policy, = get_retention_policies(['analytics.RequestLog'])
+        stats = apply_retention(policy, now=self.now, archive_dir=self.archive_dir)
+
+        self.assertEqual((stats['mode'], stats['rows'], len(stats['files'])), ('chunked_delete', 5, 3))
+        self.assertEqual(list(RequestLog.objects.values_list('id', flat=True)), [recent.id])
+        archived = [row['id'] for path in stats['files'] for row in read_archive(path)]
+        self.assertEqual(archived, [log.id for log in old])
+
+    def test_rows_not_rolled_up_are_kept(self):
+        self.log(40)
+        policy, = get_retention_policies(['analytics.RequestLog'])
+
+        stats = apply_retention(policy, now=self.now, archive_dir=self.archive_dir)
+
+        self.assertEqual(stats['rows'], 0)
+        self.assertEqual(RequestLog.objects.count(), 1)
+
+    def test_dry_run_and_per_model_policy(self):
+        event = CustomEvent.objects.create(event_name='view', event_category='page_view')
+        CustomEvent.objects.filter(pk=event.pk).update(timestamp=self.now - timedelta(days=10))
+        policy, = get_retention_policies(['analytics.CustomEvent'])
+
+        self.assertEqual(apply_retention(policy, now=self.now, dry_run=True)['rows'], 1)
+        stats = apply_retention(policy, now=self.now)
+
+        self.assertEqual((stats['rows'], stats['files']), (1, []))
+        self.assertFalse(CustomEvent.objects.exists())
+
+
+class PartitionSqlTest(SimpleTestCase):
+    def test_setup_creates_monthly_partitions(self):
+        statements = setup_partitions_sql('analytics_requestlog', date(2025, 11, 1), date(2026, 1, 1))
+
+        self.assertIn('ADD PRIMARY KEY (`id`, `timestamp`)', statements[0])
+        self.assertIn("PARTITION p202512 VALUES LESS THAN (TO_DAYS('2026-01-01'))", statements[1])
+        self.assertIn("PARTITION p202601 VALUES LESS THAN (TO_DAYS('2026-02-01'))", statements[1])
+        self.assertTrue(statements[1].endswith('PARTITION pmax VALUES LESS THAN MAXVALUE)'))
+
+    def test_rotation_splits_max_partition(self):
+        existing = ['p202511', 'p202512', 'pmax']
+
+        statement, = add_partitions_sql('analytics_requestlog', existing, date(2026, 2, 1))
+
+        self.assertIn('REORGANIZE PARTITION pmax INTO (PARTITION p202601', statement)
+        self.assertIn('PARTITION p202602', statement)
+        self.assertEqual(add_partitions_sql('analytics_requestlog', existing, date(2025, 12, 1)), [])
+
+    def test_expired_partitions(self):
+        existing = ['p202510', 'p202511', 'p202512', 'pmax']
+
+        self.assertEqual(expired_partitions(existing, date(2025, 12, 1)), ['p202510', 'p202511'])
+
+
+class IndexAuditTest(TestCase):
+    def test_redundant_prefix_indexes(self):
+        single = IndexInfo('logs', 'ts', ('timestamp',), False)
+        composite = IndexInfo('logs', 'ts_error', ('timestamp', 'is_error'), False)
+        other_table = IndexInfo('events', 'ts_name', ('timestamp', 'name'), False)
+
+        self.assertEqual(redundant_indexes([single, composite, other_table]), [(single, composite)])
+
+    def test_query_columns_from_where_clause(self):
+        sql = (
+            'SELECT "analytics_requestlog"."id" FROM "analytics_requestlog" '
+            'WHERE ("analytics_requestlog"."timestamp" >= 1 AND "analytics_requestlog"."is_error") '
+            'ORDER BY "analytics_requestlog"."id" DESC'
+        )
+
+        self.assertEqual(query_columns(sql, 'analytics_requestlog'), ['timestamp', 'is_error'])
+
+    def test_workload_uses_composite_index(self):
+        RequestLog.objects.create(
+            endpoint='/api/flora/', method='GET', status_code=500, response_time=10.0,
+            ip_address='10.0.0.1', is_error=True,
+        )
+        workload = {'errors today': lambda: list(
+            RequestLog.objects.filter(timestamp__gte=timezone.now() - timedelta(days=1), is_error=True)
+        )}
+
+        report = audit(workload)
+
+        requestlog_indexes = [index for index in report['indexes'] if index.table == 'analytics_requestlog']
+        self.assertEqual([index.columns for index in requestlog_indexes], [('timestamp', 'is_error')])
+        self.assertEqual(report['redundant'], [])
+        label, sql, steps = report['queries'][0]
+        self.assertIn(requestlog_indexes[0].name, [step.index for step in steps])
+
+    @override_settings(STATS_CACHE={'BACKGROUND_REFRESH': False})
+    def test_workload_keeps_cached_stats(self):
+        cache.set('analytics_dashboard_metrics:7', ('cached', time.time() + 60))
+
+        captured = capture_workload(WORKLOAD)
+
+        # Query statistik tetap jalan walau nilainya ada di cache
+        self.assertLessEqual({'admin dashboard', 'dashboard view', 'context processor'}, {label for label, _ in captured})
+        self.assertEqual(cache.get('analytics_dashboard_metrics:7')[0], 'cached')
+        self.assertIsNone(cache.get('analytics_dashboard_metrics:all'))
+
+
+@override_settings(STATS_CACHE={'BACKGROUND_REFRESH': False})
+class RecentValuesFilterTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        now = timezone.now()
+        for os_name, days_ago in (('Android', 1), ('iOS', 2), ('Windows', 30), (None, 1)):
+            RequestLog.objects.create(
+                endpoint='/api/flora/', method='GET', status_code=200, response_time=10.0,
+                ip_address='10.0.0.1', os=os_name, timestamp=now - timedelta(days=days_ago),
+            )
+
+    def test_choices_from_recent_rows_and_filtering(self):
+        from .admin import RequestLogAdmin, recent_values_filter
+        model_admin = RequestLogAdmin(RequestLog, admin.site)
+        request = RequestFactory().get('/admin/analytics/requestlog/')
+        os_filter = recent_values_filter('os', 'os')
+
+        choices = os_filter(request, {}, RequestLog, model_admin).lookup_choices
+        selected = os_filter(request, {'os': ['iOS']}, RequestLog, model_admin)
+
+        self.assertEqual(choices, [('Android', 'Android'), ('iOS', 'iOS')])
+        self.assertEqual(selected.queryset(request, RequestLog.objects.all()).count(), 1)
+
+
+@override_settings(STATS_CACHE={'BACKGROUND_REFRESH': False})
+class DashboardMetricsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        now = timezone.now()
+        for response_time, status_code in ((100.0, 200), (300.0, 200), (800.0, 500)):
+            RequestLog.objects.create(
+                endpoint='/api/flora/', method='GET', status_code=status_code,
+                response_time=response_time, ip_address='10.0.0.1', timestamp=now - timedelta(minutes=5),
+                is_error=status_code >= 500, conversion_goal='booking' if response_time == 300.0 else None,
+            )
+        materialize_rollups(now=now)
+
+    def test_metrics_from_rollups(self):
+        with self.assertNumQueries(5):
+            metrics = compute_dashboard_metrics(7)
+
+        self.assertEqual((metrics.total_requests, metrics.error_count, metrics.conversions), (3, 1, 1))
+        self.assertAlmostEqual(metrics.avg_response_time, 400.0)
+        self.assertAlmostEqual(metrics.error_rate, 100 / 3)
+        self.assertEqual(metrics.success_rate, 66.7)
+        self.assertEqual(metrics.peak_response_time, 800.0)
+        self.assertEqual(metrics.unique_visitors, 1)
+        self.assertEqual([day.requests for day in metrics.daily], [3])
+
+    def test_cached_metrics_shared_by_view(self):
+        get_dashboard_metrics(7)
+        request = RequestFactory().get('/analytics/dashboard/')
+
+        with self.assertNumQueries(0):
+            response = analytics_dashboard_view.__wrapped__(request)
+
+        self.assertEqual(json.loads(response.content)['total_requests'], 3)
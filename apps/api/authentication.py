@@ -0,0 +1,15 @@
+from django.conf import settings
+from rest_framework.authentication import SessionAuthentication
+
+
+class SessionCookieAuthentication(SessionAuthentication):
+    """
+    SessionAuthentication yang hanya membaca session jika request membawa
+    cookie session. Client API anonim tidak memuat session sama sekali,
+    sehingga response publik tidak mendapat `Vary: Cookie`.
+    """
+
+    def authenticate(self, request):
+        if settings.SESSION_COOKIE_NAME not in request._request.COOKIES:
+            return None
+        return super().authenticate(request)
@@ -0,0 +1,118 @@
+"""
+Conditional GET (ETag / 304) untuk endpoint konten publik.
+
+ETag dihitung dari MAX(updated_at) dan COUNT(*) queryset beserta tabel
+relasi yang di-nest serializer, dalam satu query UNION ALL, tanpa
+serialisasi. ETag ikut di-cache dengan key generasi model (sama seperti
+response cache), jadi request 304 berikutnya tidak menyentuh database.
+
+Last-Modified sengaja tidak dikirim: MAX(updated_at) tidak berubah saat baris
+yang bukan terbaru (atau baris relasi) dihapus, sehingga If-Modified-Since
+akan menjawab 304 untuk list yang sudah berubah. Perubahan itu hanya
+tertangkap COUNT di ETag.
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import Count, IntegerField, Max, Value
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import quote_etag
+
+from .response_cache import get_response_cache_settings, response_cache_key
+
+def relation_queryset(model, path, parents):
+    """
+    Queryset tabel relasi `path` (misal 'flora__images') milik `parents`,
+    lewat FK balik: ImageFlora.objects.filter(flora__destinations__in=...).
+    """
+    lookups = []
+    for name in path.split('__'):
+        relation = model._meta.get_field(name)
+        lookups.insert(0, relation.field.name)
+        model = relation.related_model
+    return model.objects.filter(**{'__'.join(lookups) + '__in': parents.values('pk')})
+
+
+def table_state(querysets):
+    """[(max updated_at, count)] untuk setiap queryset, dalam satu query UNION ALL"""
+    parts = [
+        queryset.order_by().prefetch_related(None)
+        .values(position=Value(position, output_field=IntegerField()))
+        .annotate(last_modified=Max('updated_at'), count=Count('pk'))
+        .values_list('position', 'last_modified', 'count')
+        for position, queryset in enumerate(querysets)
+    ]
+    rows = parts[0].union(*parts[1:], all=True) if len(parts) > 1 else parts[0]
+    state = dict((position, (last_modified, count)) for position, last_modified, count in rows)
+    return [state.get(position, (None, 0)) for position in range(len(querysets))]
+
+
+def compute_etag(request, querysets):
+    """ETag dari keadaan tabel + URL dan format response"""
+    state = table_state(querysets)
+    fingerprint = '|'.join(
+        [request.get_full_path(), request.accepted_media_type]
+        + [f"{last_modified.isoformat() if last_modified else ''}:{count}" for last_modified, count in state]
+    )
+    return quote_etag(hashlib.sha1(fingerprint.encode()).hexdigest())
+
+
+class ConditionalGetMixin:
+    """
+    Jawab GET dengan 304 jika If-None-Match masih cocok, dan pasang ETag
+    serta Cache-Control pada response 200.
+
+    Validator dihitung dari queryset view (list: hasil filter, detail: objek
+    yang diminta) plus `etag_relations`, path relasi yang di-nest serializer.
+    Letakkan sebelum ResponseCacheMixin agar 304 tidak membaca cache response.
+    """
+    etag_relations = ()
+
+    def get_lookup_filter(self):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        return {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+
+    def get_etag_relations(self):
+        return self.etag_relations
+
+    def get_validator_querysets(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.action == 'retrieve':
+            queryset = queryset.filter(**self.get_lookup_filter())
+        return [queryset] + [relation_queryset(queryset.model, path, queryset) for path in self.get_etag_relations()]
+
+    def get_etag(self, request, *args, **kwargs):
+        settings = get_response_cache_settings()
+        cache_models = getattr(self, 'cache_models', ())
+        if not (settings['ENABLED'] and cache_models):
+            return compute_etag(request, self.get_validator_querysets(request, *args, **kwargs))
+
+        # Key generasi yang sama dengan response cache: tidak perlu invalidasi terpisah
+        key = f"{response_cache_key(request, cache_models)}:etag:{request.accepted_media_type}"
+        etag = cache.get(key)
+        if etag is None:
+            etag = compute_etag(request, self.get_validator_querysets(request, *args, **kwargs))
+            cache.set(key, etag, settings['TIMEOUT'])
+        return etag
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return handler(request, *args, **kwargs)
+
+        etag = self.get_etag(request, *args, **kwargs)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+
+        response['ETag'] = etag
+        patch_cache_control(response, **get_response_cache_settings()['CACHE_CONTROL'])
+        patch_vary_headers(response, ['Accept'])
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request, *args, **kwargs)
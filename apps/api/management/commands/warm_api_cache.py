@@ -0,0 +1,63 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+from django.utils import translation
+
+from apps.api.response_cache import response_cache_stats
+from apps.api.urls import router
+
+
+def cached_endpoints():
+    """(nama, viewset) untuk setiap endpoint router yang memakai response cache"""
+    return [
+        (basename, viewset) for _, viewset, basename in router.registry
+        if getattr(viewset, 'cache_models', None)
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Warm the API response cache for the list endpoints (and optionally every detail page)'
+
+    def add_arguments(self, parser):
+        hosts = [host for host in settings.ALLOWED_HOSTS if host and host != '*' and not host.startswith('.')]
+        parser.add_argument('--host', default=hosts[0] if hosts else 'localhost', help='Host used in cached links')
+        parser.add_argument('--scheme', default='http' if settings.DEBUG else 'https', choices=['http', 'https'])
+        parser.add_argument('--details', action='store_true', help='Also warm every detail endpoint by slug')
+        parser.add_argument('--stats', action='store_true', help='Print hit/miss ratio per endpoint and exit')
+
+    def handle(self, *args, **options):
+        endpoints = cached_endpoints()
+        if options['stats']:
+            names = [name for name, _ in endpoints] + ['latest-content']
+            for name, stats in response_cache_stats(names).items():
+                self.stdout.write(
+                    f"{name:24s} {stats['hits']:8d} hit(s) {stats['misses']:8d} miss(es) "
+                    f"{stats['hit_ratio'] * 100:6.1f}%"
+                )
+            return
+
+        paths = [reverse('latest-content')]
+        for name, viewset in endpoints:
+            paths.append(reverse(f'{name}-list'))
+            model = viewset.queryset.model
+            if options['details'] and any(field.name == 'slug' for field in model._meta.fields):
+                paths += [
+                    reverse(f'{name}-detail', kwargs={'slug': slug})
+                    for slug in model.objects.values_list('slug', flat=True)
+                ]
+
+        factory = RequestFactory()
+        warmed = 0
+        for language, _ in settings.LANGUAGES:
+            with translation.override(language):
+                for path in paths:
+                    request = factory.get(path, HTTP_HOST=options['host'], secure=options['scheme'] == 'https')
+                    match = resolve(path)
+                    response = match.func(request, *match.args, **match.kwargs)
+                    if response.status_code == 200:
+                        warmed += 1
+                    else:
+                        self.stdout.write(self.style.WARNING(f"{language} {path}: HTTP {response.status_code}"))
+
+        self.stdout.write(self.style.SUCCESS(f"Warmed {warmed} response(s) for {len(settings.LANGUAGES)} language(s)"))
@@ -0,0 +1,117 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+INVALID_CURSOR = 'Invalid cursor'
+
+
+def encode_cursor(created_at, *keys):
+    """Cursor opaque (base64 JSON) untuk posisi (created_at, *keys) di feed terurut terbaru dulu"""
+    payload = json.dumps([created_at.isoformat(), *keys], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, size=2):
+    """
+    Kebalikan encode_cursor: (created_at, *keys); cursor rusak -> 404 seperti
+    CursorPagination DRF. Key terakhir harus id (int), key di antaranya
+    (misal type di LatestContentView) harus string.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != size:
+            raise NotFound(INVALID_CURSOR)
+        created_at = parse_datetime(values[0])
+    except (TypeError, ValueError, IndexError, KeyError):
+        raise NotFound(INVALID_CURSOR)
+    *keys, pk = values[1:]
+    if (
+        created_at is None
+        or not isinstance(pk, int) or isinstance(pk, bool)
+        or not all(isinstance(key, str) for key in keys)
+    ):
+        raise NotFound(INVALID_CURSOR)
+    return (created_at, *values[1:])
+
+
+class ContentCursorPagination(BasePagination):
+    """
+    Keyset pagination untuk endpoint konten publik, urut (created_at, id)
+    terbaru dulu. Cursor menunjuk baris terakhir halaman sebelumnya, jadi
+    query tiap halaman memakai WHERE, bukan OFFSET, dan tetap stabil walau ada
+    konten baru yang masuk.
+    """
+    page_size = api_settings.PAGE_SIZE or 20
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    ordering = ('-created_at', '-id')
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            created_at, pk = decode_cursor(cursor)
+            queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+
+        # Ambil satu baris ekstra untuk tahu apakah masih ada halaman berikutnya
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, encode_cursor(last.created_at, last.pk))
+
+    def get_first_link(self):
+        if not self.request.query_params.get(self.cursor_query_param):
+            return None
+        return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('first', self.get_first_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'first': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class ImagePagination(PageNumberPagination):
+    """Endpoint gambar: halaman biasa dengan batas page_size"""
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 100
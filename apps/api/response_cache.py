@@ -0,0 +1,130 @@
+"""
+Cache response JSON untuk endpoint konten publik.
+
+Response disimpan sebagai bytes yang sudah di-render, dengan key dari URL
+(scheme, host, path, query param terurut), bahasa aktif dan generasi setiap
+model yang dipakai endpoint (lihat apps.core.content_version). Save/delete
+model konten menaikkan generasinya sehingga key lama tidak pernah dibaca lagi.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.http import urlencode
+from django.utils.translation import get_language
+
+from apps.core.content_version import get_generations
+
+DEFAULT_RESPONSE_CACHE_SETTINGS = {
+    'ENABLED': True,
+    'TIMEOUT': 60 * 60,  # Batas atas, invalidasi normal lewat generasi
+    # Header Cache-Control untuk browser/CDN (lihat apps.api.conditional)
+    'CACHE_CONTROL': {'public': True, 'max_age': 60, 's_maxage': 300},
+}
+
+STATS_KEY = 'api_response_cache:stats:{name}:{result}'
+
+# Model yang di-nest oleh serializer setiap tipe konten
+DESTINATION_MODELS = (
+    'destinations.Destinations', 'destinations.ImageDestinations',
+    'flora.Flora', 'flora.ImageFlora', 'fauna.Fauna', 'fauna.ImageFauna',
+)
+FLORA_MODELS = ('flora.Flora', 'flora.ImageFlora')
+FAUNA_MODELS = ('fauna.Fauna', 'fauna.ImageFauna')
+HEALTH_MODELS = ('health.Health', 'health.ImageHealth', 'health.FasilitasHealth')
+KULINER_MODELS = ('kuliner.Kuliner', 'kuliner.ImageKuliner', 'kuliner.ListMenuKuliner')
+
+
+def get_response_cache_settings():
+    return {**DEFAULT_RESPONSE_CACHE_SETTINGS, **getattr(settings, 'API_RESPONSE_CACHE', {})}
+
+
+def response_cache_key(request, models):
+    params = urlencode(sorted(request.query_params.lists()), doseq=True)
+    url = f"{request.scheme}://{request.get_host()}{request.path}?{params}"
+    generations = ':'.join(str(generation) for generation in get_generations(models))
+    digest = hashlib.md5(f"{url}|{get_language()}|{generations}".encode()).hexdigest()
+    return f'api_response:{digest}'
+
+
+def record(name, result):
+    key = STATS_KEY.format(name=name, result=result)
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+
+def response_cache_stats(names):
+    """Hit/miss per endpoint: {name: {'hits', 'misses', 'hit_ratio'}}"""
+    keys = {
+        (name, result): STATS_KEY.format(name=name, result=result)
+        for name in names for result in ('hits', 'misses')
+    }
+    values = cache.get_many(list(keys.values()))
+    stats = {}
+    for name in names:
+        hits = values.get(keys[(name, 'hits')], 0)
+        misses = values.get(keys[(name, 'misses')], 0)
+        stats[name] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': hits / (hits + misses) if hits + misses else 0,
+        }
+    return stats
+
+
+class ResponseCacheMixin:
+    """
+    Cache GET response JSON (status 200) view DRF. `cache_models` berisi
+    label model yang mempengaruhi isi response; `cache_name` dipakai untuk
+    statistik hit ratio.
+    """
+    cache_models = ()
+    cache_name = None
+
+    def get_cache_name(self):
+        return self.cache_name or getattr(self, 'basename', None) or self.__class__.__name__
+
+    def use_response_cache(self, request):
+        return (
+            get_response_cache_settings()['ENABLED']
+            and request.method == 'GET'
+            and getattr(request, 'accepted_renderer', None) is not None
+            and request.accepted_renderer.format == 'json'
+        )
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if not self.use_response_cache(request):
+            return handler(request, *args, **kwargs)
+
+        name = self.get_cache_name()
+        key = response_cache_key(request, self.cache_models)
+        content = cache.get(key)
+        if content is None:
+            record(name, 'misses')
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            content = request.accepted_renderer.render(
+                response.data, request.accepted_media_type, self.get_renderer_context()
+            )
+            cache.set(key, content, get_response_cache_settings()['TIMEOUT'])
+            cache_status = 'MISS'
+        else:
+            record(name, 'hits')
+            cache_status = 'HIT'
+
+        response = HttpResponse(content, content_type=request.accepted_renderer.media_type)
+        response['X-Cache'] = cache_status
+        patch_vary_headers(response, ['Accept'])
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
@@ -3,55 +3,144 @@ from apps.destinations.models import Destinations, ImageDestinations
 from apps.flora.models import Flora, ImageFlora
 from apps.health.models import Health, ImageHealth, FasilitasHealth
 from apps.kuliner.models import Kuliner, ImageKuliner, ListMenuKuliner
-from apps.fauna.models import Fauna, ImageFauna       
+from apps.fauna.models import Fauna, ImageFauna
+
+
+def split_param(value):
+    """'a, b,,c' -> ['a', 'b', 'c']; kosong/None -> None"""
+    if not value:
+        return None
+    return [item.strip() for item in value.split(',') if item.strip()] or None
+
+
+def expand_tree(paths):
+    """['flora', 'flora.images', 'images'] -> {'flora': ['images'], 'images': []}"""
+    tree = {}
+    for path in paths or ():
+        name, _, rest = path.partition('.')
+        children = tree.setdefault(name, [])
+        if rest:
+            children.append(rest)
+    return tree
+
+
+class DynamicFieldsMixin:
+    """
+    Sparse fieldset: `fields` memilih field (dari Meta.fields dan relasi di
+    `expandable_fields`), `expand` menambah relasi nested, bisa bertingkat
+    dengan titik (flora.images). Tanpa `fields` dipakai `default_fields` dan
+    `default_expand`. Relasi yang tidak dipilih tidak di-serialize, dan
+    get_prefetch_paths() hanya mengembalikan relasi yang dipakai.
+    """
+    expandable_fields = {}  # nama relasi -> serializer (many=True)
+    default_fields = None  # None = semua Meta.fields
+    default_expand = ()
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.only = set(fields) if fields else None
+        self.expand = expand_tree(expand)
+
+    def get_expand(self):
+        if self.only is None:
+            expand = expand_tree(self.default_expand)
+        else:
+            expand = {name: [] for name in self.expandable_fields if name in self.only}
+        for name, children in self.expand.items():
+            expand.setdefault(name, []).extend(children)
+        return {name: children for name, children in expand.items() if name in self.expandable_fields}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        only = self.only if self.only is not None else self.default_fields
+        if only is not None:
+            fields = {name: field for name, field in fields.items() if name in only}
+        for name, children in self.get_expand().items():
+            serializer_class = self.expandable_fields[name]
+            options = {'expand': children} if issubclass(serializer_class, DynamicFieldsMixin) else {}
+            fields[name] = serializer_class(many=True, read_only=True, **options)
+        return fields
+
+    def get_columns(self):
+        """Kolom model yang dipakai field non-relasi (untuk QuerySet.only)"""
+        concrete = {field.name for field in self.Meta.model._meta.concrete_fields}
+        return [
+            field.source for field in self.fields.values()
+            if not isinstance(field, serializers.ListSerializer) and field.source in concrete
+        ]
+
+    def get_prefetch_paths(self, prefix=''):
+        """Path prefetch_related untuk relasi yang akan di-serialize"""
+        paths = []
+        for field in self.fields.values():
+            if isinstance(field, serializers.ListSerializer):
+                path = prefix + field.source
+                paths.append(path)
+                if isinstance(field.child, DynamicFieldsMixin):
+                    paths += field.child.get_prefetch_paths(f'{path}__')
+        return paths
+
 
 # flora
 class ImageFloraSerializer(serializers.ModelSerializer):
     class Meta:
         model = ImageFlora
         fields = ['flora', 'image', 'created_at', 'updated_at']
-    
-class FloraSerializer(serializers.ModelSerializer):
-    images = ImageFloraSerializer(many=True, read_only=True)
+
+class FloraSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    expandable_fields = {'images': ImageFloraSerializer}
+    default_expand = ('images',)
     class Meta:
         model = Flora
-        fields = ['title', 'slug', 'description', 'created_at', 'updated_at', 'images']
+        fields = ['title', 'slug', 'description', 'created_at', 'updated_at']
+
+class FloraSummarySerializer(FloraSerializer):
+    default_fields = ('title', 'slug', 'created_at', 'updated_at')
+    default_expand = ()
 
 # health
 class ImageHealthSerializer(serializers.ModelSerializer):
     class Meta:
         model = ImageHealth
         fields = ['health', 'image', 'created_at', 'updated_at']
-        
+
 class FasilitasHealthSerializer(serializers.ModelSerializer):
     class Meta:
         model = FasilitasHealth
         fields = ['health', 'fasilitas', 'created_at', 'updated_at']
-        
-class HealthSerializer(serializers.ModelSerializer):
-    images = ImageHealthSerializer(many=True, read_only=True)
-    fasilitas = FasilitasHealthSerializer(many=True, read_only=True)
+
+class HealthSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    expandable_fields = {'images': ImageHealthSerializer, 'fasilitas': FasilitasHealthSerializer}
+    default_expand = ('images', 'fasilitas')
     class Meta:
         model = Health
-        fields = ['title', 'slug', 'location', 'g_maps', 'guides', 'open_hours', 'close_hours', 'description', 'created_at', 'updated_at', 'images', 'fasilitas']
-        
+        fields = ['title', 'slug', 'location', 'g_maps', 'guides', 'open_hours', 'close_hours', 'description', 'created_at', 'updated_at']
+
+class HealthSummarySerializer(HealthSerializer):
+    default_fields = ('title', 'slug', 'location', 'open_hours', 'close_hours', 'created_at', 'updated_at')
+    default_expand = ()
+
 # kuliner
 class ImageKulinerSerializer(serializers.ModelSerializer):
     class Meta:
         model = ImageKuliner
         fields = ['kuliner', 'image', 'created_at', 'updated_at']
-        
+
 class ListMenuKulinerSerializer(serializers.ModelSerializer):
     class Meta:
         model = ListMenuKuliner
         fields = ['kuliner', 'list_menu', 'harga', 'created_at', 'updated_at']
-        
-class KulinerSerializer(serializers.ModelSerializer):
-    images = ImageKulinerSerializer(many=True, read_only=True)
-    list_menu = ListMenuKulinerSerializer(many=True, read_only=True)
+
+class KulinerSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    expandable_fields = {'images': ImageKulinerSerializer, 'list_menu': ListMenuKulinerSerializer}
+    default_expand = ('images', 'list_menu')
     class Meta:
         model = Kuliner
-        fields = ['title', 'slug', 'location', 'g_maps', 'guides', 'open_hours', 'close_hours', 'description', 'created_at', 'updated_at', 'images', 'list_menu']
+        fields = ['title', 'slug', 'location', 'g_maps', 'guides', 'open_hours', 'close_hours', 'description', 'created_at', 'updated_at']
+
+class KulinerSummarySerializer(KulinerSerializer):
+    default_fields = ('title', 'slug', 'location', 'open_hours', 'close_hours', 'created_at', 'updated_at')
+    default_expand = ()
 
 # fauna
 class ImageFaunaSerializer(serializers.ModelSerializer):
@@ -59,11 +148,16 @@ class ImageFaunaSerializer(serializers.ModelSerializer):
         model = ImageFauna
         fields = ['fauna', 'image', 'created_at', 'updated_at']
 
-class FaunaSerializer(serializers.ModelSerializer):
-    images = ImageFaunaSerializer(many=True, read_only=True)
+class FaunaSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    expandable_fields = {'images': ImageFaunaSerializer}
+    default_expand = ('images',)
     class Meta:
         model = Fauna
-        fields = ['title', 'slug', 'description', 'created_at', 'updated_at', 'images']
+        fields = ['title', 'slug', 'description', 'created_at', 'updated_at']
+
+class FaunaSummarySerializer(FaunaSerializer):
+    default_fields = ('title', 'slug', 'created_at', 'updated_at')
+    default_expand = ()
 
 # destinations
 class ImageDestinationsSerializer(serializers.ModelSerializer):
@@ -71,10 +165,17 @@ class ImageDestinationsSerializer(serializers.ModelSerializer):
         model = ImageDestinations
         fields = ['destinations', 'image', 'created_at', 'updated_at']
 
-class DestinationsSerializer(serializers.ModelSerializer):
-    fauna = FaunaSerializer(many=True, read_only=True)
-    images = ImageDestinationsSerializer(many=True, read_only=True)
-    flora = FloraSerializer(many=True, read_only=True)
+class DestinationsSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    expandable_fields = {'images': ImageDestinationsSerializer, 'fauna': FaunaSerializer, 'flora': FloraSerializer}
+    default_expand = ('images', 'fauna', 'flora')
     class Meta:
         model = Destinations
-        fields = ['title', 'slug', 'description', 'location', 'g_maps', 'guides', 'open_hours', 'close_hours', 'created_at', 'updated_at', 'images', 'fauna', 'flora'] 
\ No newline at end of file
+        fields = ['title', 'slug', 'description', 'location', 'g_maps', 'guides', 'open_hours', 'close_hours', 'created_at', 'updated_at']
+
+class DestinationsSummarySerializer(DestinationsSerializer):
+    # Relasi nested juga versi ringkas, detailnya lewat ?expand=flora.images
+    expandable_fields = {
+        'images': ImageDestinationsSerializer, 'fauna': FaunaSummarySerializer, 'flora': FloraSummarySerializer,
+    }
+    default_fields = ('title', 'slug', 'location', 'open_hours', 'close_hours', 'created_at', 'updated_at')
+    default_expand = ()
@@ -1,3 +1,373 @@
-from django.test import TestCase
+import base64
+import json
+from io import StringIO
+from itertools import count
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+
+from apps.destinations.models import Destinations, ImageDestinations
+from apps.fauna.models import Fauna, ImageFauna
+from apps.flora.models import Flora, ImageFlora
+from apps.health.models import FasilitasHealth, Health, ImageHealth
+from apps.kuliner.models import ImageKuliner, Kuliner, ListMenuKuliner
+
+from .pagination import decode_cursor, encode_cursor
+from .response_cache import response_cache_stats
+from .views import (
+    DestinationsViewset,
+    FaunaViewset,
+    FloraViewset,
+    HealthViewset,
+    KulinerViewset,
+    LatestContentView,
+)
+
+SEO = {'meta_title': 'Meta', 'meta_description': 'Meta description'}
+
+
+class ContentFactory:
+    """Data konten + relasi nested (gambar dibuat dengan bulk_create, tanpa kompresi)"""
+
+    def __init__(self):
+        self.ids = count(1)
+
+    def slug(self, prefix):
+        return f'{prefix}-{next(self.ids)}'
+
+    def destination(self):
+        destination = Destinations.objects.create(title='Destinasi', slug=self.slug('destinasi'), **SEO)
+        ImageDestinations.objects.bulk_create([
+            ImageDestinations(destinations=destination, image='destinations/a.jpg') for _ in range(2)
+        ])
+        self.flora(destination)
+        self.fauna(destination)
+        return destination
+
+    def flora(self, destination=None):
+        flora = Flora.objects.create(
+            destinations=destination or self.destination(), title='Flora', slug=self.slug('flora'), **SEO
+        )
+        ImageFlora.objects.bulk_create([ImageFlora(flora=flora, image='flora/a.jpg') for _ in range(2)])
+        return flora
+
+    def fauna(self, destination=None):
+        fauna = Fauna.objects.create(
+            destinations=destination or self.destination(), title='Fauna', slug=self.slug('fauna'), **SEO
+        )
+        ImageFauna.objects.bulk_create([ImageFauna(fauna=fauna, image='fauna/a.jpg') for _ in range(2)])
+        return fauna
+
+    def health(self):
+        health = Health.objects.create(title='Health', slug=self.slug('health'), **SEO)
+        ImageHealth.objects.bulk_create([ImageHealth(health=health, image='health/a.jpg') for _ in range(2)])
+        FasilitasHealth.objects.bulk_create([FasilitasHealth(health=health, fasilitas='Klinik') for _ in range(2)])
+        return health
+
+    def kuliner(self):
+        kuliner = Kuliner.objects.create(title='Kuliner', slug=self.slug('kuliner'), **SEO)
+        ImageKuliner.objects.bulk_create([ImageKuliner(kuliner=kuliner, image='kuliner/a.jpg') for _ in range(2)])
+        ListMenuKuliner.objects.bulk_create([
+            ListMenuKuliner(kuliner=kuliner, list_menu='Menu', harga=10000) for _ in range(2)
+        ])
+        return kuliner
+
+
+@override_settings(API_RESPONSE_CACHE={'ENABLED': False})
+class QueryCountTestCase(TestCase):
+    """
+    assertConstantQueries: jumlah query sebuah view harus sama dengan `expected`
+    baik dengan sedikit maupun banyak data, sehingga N+1 langsung gagal di test.
+    """
+    factory = APIRequestFactory()
+
+    def setUp(self):
+        cache.clear()
+        self.content = ContentFactory()
+
+    def assertConstantQueries(self, view, expected, add_rows, path='/', rounds=3, **kwargs):
+        for _ in range(rounds):
+            add_rows()
+            with self.assertNumQueries(expected):
+                response = view(self.factory.get(path), **kwargs)
+                response.render()
+            self.assertEqual(response.status_code, 200)
+
+
+class ContentQueryCountTest(QueryCountTestCase):
+    def test_list_endpoints(self):
+        cases = [
+            # Validator ETag + satu SELECT (serializer ringkas, tanpa relasi)
+            (DestinationsViewset, 2, self.content.destination),
+            (FloraViewset, 2, self.content.flora),
+            (FaunaViewset, 2, self.content.fauna),
+            (HealthViewset, 2, self.content.health),
+            (KulinerViewset, 2, self.content.kuliner),
+        ]
+        for viewset, expected, add_rows in cases:
+            with self.subTest(viewset=viewset.__name__):
+                self.assertConstantQueries(viewset.as_view({'get': 'list'}), expected, add_rows)
+
+    def test_detail_endpoints(self):
+        destination = self.content.destination()
+        flora = self.content.flora(destination)
+        cases = [
+            # Tambah relasi pada objek yang sama, jumlah query tetap
+            (DestinationsViewset, 7, destination.slug, lambda: self.content.flora(destination)),
+            (FloraViewset, 3, flora.slug,
+             lambda: ImageFlora.objects.bulk_create([ImageFlora(flora=flora, image='flora/b.jpg')])),
+        ]
+        for viewset, expected, slug, add_rows in cases:
+            with self.subTest(viewset=viewset.__name__):
+                view = viewset.as_view({'get': 'retrieve'})
+                self.assertConstantQueries(view, expected, add_rows, slug=slug)
+
+    def test_latest_content(self):
+        def add_rows():
+            with self.captureOnCommitCallbacks(execute=True):
+                self.content.destination()
+                self.content.health()
+                self.content.kuliner()
+
+        # Validator ETag + key top-N dari 5 tabel + pemenang per tipe beserta prefetch relasinya
+        self.assertConstantQueries(LatestContentView.as_view(), 22, add_rows)
+
+
+class CursorPaginationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.content = ContentFactory()
+        self.factory = APIRequestFactory()
+
+    def get(self, view, url):
+        return json.loads(view(self.factory.get(url)).content)
+
+    def test_pages_follow_created_at_then_id(self):
+        destination = Destinations.objects.create(title='Destinasi', slug='destinasi', **SEO)
+        flora = [self.content.flora(destination) for _ in range(5)]
+        # created_at sama: urutan ditentukan id
+        Flora.objects.update(created_at=flora[0].created_at)
+        view = FloraViewset.as_view({'get': 'list'})
+
+        slugs, url = [], '/api/flora/?page_size=2'
+        while url:
+            page = self.get(view, url)
+            slugs += [item['slug'] for item in page['results']]
+            url = page['next']
+
+        self.assertEqual(slugs, [item.slug for item in reversed(flora)])
+
+    def test_invalid_cursor(self):
+        view = FloraViewset.as_view({'get': 'list'})
+        response = view(self.factory.get('/api/flora/', {'cursor': 'not-a-cursor'}))
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_crafted_cursor(self):
+        def craft(payload):
+            return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+        flora = FloraViewset.as_view({'get': 'list'})
+        latest = LatestContentView.as_view()
+        for payload in ({}, ["2024-01-01T00:00:00+00:00", "abc"], ["2024-01-01T00:00:00+00:00", True]):
+            response = flora(self.factory.get('/api/flora/', {'cursor': craft(payload)}))
+            self.assertEqual(response.status_code, 404, payload)
+        for payload in (["2024-01-01T00:00:00+00:00", 3, 7], ["2024-01-01T00:00:00+00:00", "flora", "7"]):
+            response = latest(self.factory.get('/api/latest-content/', {'cursor': craft(payload)}))
+            self.assertEqual(response.status_code, 404, payload)
+
+    def test_cursor_round_trip(self):
+        now = timezone.now()
+
+        self.assertEqual(decode_cursor(encode_cursor(now, 'flora', 7), size=3), (now, 'flora', 7))
+
+    def test_latest_content_limit_and_types(self):
+        self.content.destination()
+        self.content.destination()
+        self.content.health()
+        view = LatestContentView.as_view()
+
+        page = self.get(view, '/api/latest-content/?limit=2&types=flora,health')
+        bad = view(self.factory.get('/api/latest-content/', {'types': 'hotel'}))
+
+        self.assertEqual([item['type'] for item in page['results']], ['health', 'flora'])
+        self.assertIsNotNone(page['next'])
+        self.assertEqual(bad.status_code, 400)
+
+    def test_latest_content_cached_until_content_changes(self):
+        self.content.destination()
+        view = LatestContentView.as_view()
+        self.get(view, '/api/latest-content/')
+
+        with self.assertNumQueries(0):
+            self.get(view, '/api/latest-content/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.content.kuliner()
+        page = self.get(view, '/api/latest-content/')
+        self.assertEqual(page['results'][0]['type'], 'kuliner')
+
+    def test_latest_content_feed(self):
+        for _ in range(4):
+            self.content.destination()
+        view = LatestContentView.as_view()
+
+        first = self.get(view, '/api/latest-content/')
+        second = self.get(view, first['next'])
+
+        keys = [(item['type'], item['data']['slug']) for item in first['results'] + second['results']]
+        self.assertEqual((first['count'], second['count'], second['next']), (10, 2, None))
+        self.assertEqual(len(set(keys)), 12)
+
+
+class ResponseCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.content = ContentFactory()
+        self.factory = APIRequestFactory()
+
+    def get(self, viewset, url):
+        basename = url.split('/')[2]
+        return viewset.as_view({'get': 'list'}, basename=basename)(self.factory.get(url))
+
+    def test_cached_until_related_model_changes(self):
+        destination = self.content.destination()
+
+        first = self.get(FloraViewset, '/api/flora/')
+        with self.assertNumQueries(0):
+            second = self.get(FloraViewset, '/api/flora/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.content.kuliner()
+        unrelated = self.get(FloraViewset, '/api/flora/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.content.flora(destination)
+        changed = self.get(FloraViewset, '/api/flora/')
+
+        self.assertEqual((first['X-Cache'], second['X-Cache'], unrelated['X-Cache']), ('MISS', 'HIT', 'HIT'))
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(changed['X-Cache'], 'MISS')
+        self.assertEqual(len(json.loads(changed.content)['results']), 2)
+        self.assertEqual(response_cache_stats(['flora'])['flora'], {'hits': 2, 'misses': 2, 'hit_ratio': 0.5})
+
+    def test_query_params_are_part_of_the_key(self):
+        for _ in range(3):
+            self.content.health()
+
+        small = self.get(HealthViewset, '/api/health/?page_size=1')
+        full = self.get(HealthViewset, '/api/health/')
+
+        self.assertEqual(full['X-Cache'], 'MISS')
+        self.assertEqual((len(json.loads(small.content)['results']), len(json.loads(full.content)['results'])), (1, 3))
+
+    def test_warm_api_cache(self):
+        self.content.destination()
+
+        call_command('warm_api_cache', '--host', 'testserver', '--scheme', 'http', stdout=StringIO())
+
+        self.assertEqual(self.get(DestinationsViewset, '/api/destinations/')['X-Cache'], 'HIT')
+
+
+class ConditionalGetTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.content = ContentFactory()
+        self.factory = APIRequestFactory()
+
+    def get(self, view, url, **headers):
+        return view(self.factory.get(url, **headers))
+
+    def test_not_modified_without_queries(self):
+        destination = self.content.destination()
+        view = DestinationsViewset.as_view({'get': 'retrieve'})
+
+        first = view(self.factory.get('/api/destinations/'), slug=destination.slug)
+        with self.assertNumQueries(0):
+            second = view(
+                self.factory.get('/api/destinations/', HTTP_IF_NONE_MATCH=first['ETag']), slug=destination.slug
+            )
+
+        self.assertEqual(first.status_code, 200)
+        self.assertFalse(first.has_header('Last-Modified'))
+        self.assertIn('s-maxage=300', first['Cache-Control'])
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual((second['ETag'], second.content), (first['ETag'], b''))
+
+    def test_delete_changes_etag_and_ignores_if_modified_since(self):
+        older, newer = self.content.health(), self.content.health()
+        view = HealthViewset.as_view({'get': 'list'})
+        first = self.get(view, '/api/health/')
+
+        # Baris yang bukan terbaru dihapus: MAX(updated_at) tetap, COUNT berubah
+        with self.captureOnCommitCallbacks(execute=True):
+            older.delete()
+        by_etag = self.get(view, '/api/health/', HTTP_IF_NONE_MATCH=first['ETag'])
+        by_date = self.get(view, '/api/health/', HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT')
+
+        self.assertEqual((by_etag.status_code, by_date.status_code), (200, 200))
+        self.assertNotEqual(by_etag['ETag'], first['ETag'])
+
+    @override_settings(API_RESPONSE_CACHE={'ENABLED': False})
+    def test_etag_follows_serialized_tables(self):
+        destination = self.content.destination()
+        view = DestinationsViewset.as_view({'get': 'list'})
+        url = '/api/destinations/?expand=flora.images'
+
+        etag, summary = self.get(view, url)['ETag'], self.get(view, '/api/destinations/')['ETag']
+        self.assertEqual(self.get(view, url)['ETag'], etag)
+
+        # bulk_create tanpa signal: ETag tetap berubah karena dihitung dari tabel
+        flora = Flora.objects.filter(destinations=destination).first()
+        ImageFlora.objects.bulk_create([ImageFlora(flora=flora, image='flora/b.jpg')])
+        changed = self.get(view, url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], etag)
+        # List ringkas tidak memuat gambar flora: ETag-nya tidak ikut berubah
+        self.assertEqual(self.get(view, '/api/destinations/')['ETag'], summary)
+        self.assertNotEqual(self.get(view, url + '&page_size=1')['ETag'], changed['ETag'])
+
+    def test_latest_content(self):
+        self.content.health()
+        view = LatestContentView.as_view()
+
+        first = self.get(view, '/api/latest-content/')
+        second = self.get(view, '/api/latest-content/', HTTP_IF_NONE_MATCH=first['ETag'])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.content.kuliner()
+        changed = self.get(view, '/api/latest-content/', HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertEqual((first.status_code, second.status_code, changed.status_code), (200, 304, 200))
+
+
+@override_settings(API_RESPONSE_CACHE={'ENABLED': False})
+class SparseFieldsetTest(QueryCountTestCase):
+    def get(self, view, url, **kwargs):
+        return view(self.factory.get(url), **kwargs).data
+
+    def test_list_is_summary(self):
+        self.content.destination()
+
+        item = self.get(DestinationsViewset.as_view({'get': 'list'}), '/api/destinations/')['results'][0]
+
+        self.assertNotIn('description', item)
+        self.assertFalse({'images', 'flora', 'fauna'} & set(item))
+
+    def test_fields_and_expand(self):
+        destination = self.content.destination()
+        list_view = DestinationsViewset.as_view({'get': 'list'})
+        detail_view = DestinationsViewset.as_view({'get': 'retrieve'})
+
+        item = self.get(list_view, '/api/destinations/?fields=title,description&expand=flora.images')['results'][0]
+        detail = self.get(detail_view, '/api/destinations/?fields=title,images', slug=destination.slug)
+
+        self.assertEqual(list(item), ['title', 'description', 'flora'])
+        self.assertEqual(set(item['flora'][0]), {'title', 'slug', 'created_at', 'updated_at', 'images'})
+        self.assertEqual(list(detail), ['title', 'images'])
+
+    def test_only_requested_relations_are_prefetched(self):
+        view = DestinationsViewset.as_view({'get': 'list'})
+        # Validator ETag + destinasi + flora + gambar flora
+        self.assertConstantQueries(view, 4, self.content.destination, path='/api/destinations/?expand=flora.images')
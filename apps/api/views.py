@@ -1,15 +1,100 @@
 from rest_framework.response import Response
 from rest_framework import viewsets, permissions
 from django.shortcuts import get_object_or_404
-from django.db.models import Q
+from django.db.models import Prefetch, Q
 from .serializers import *
+from .serializers import split_param
 from rest_framework.views import APIView
-from itertools import chain
-from random import sample
-from operator import attrgetter
+from rest_framework.exceptions import ValidationError
+from apps.core.content_version import CONTENT_MODELS
+import heapq
+from functools import partial
+from itertools import islice
+from rest_framework.utils.urls import replace_query_param
+from .conditional import ConditionalGetMixin, relation_queryset
+from .pagination import ImagePagination, decode_cursor, encode_cursor
+from .response_cache import (
+    DESTINATION_MODELS,
+    FAUNA_MODELS,
+    FLORA_MODELS,
+    HEALTH_MODELS,
+    KULINER_MODELS,
+    ResponseCacheMixin,
+)
 
-class BasePublicViewSet(viewsets.ReadOnlyModelViewSet):
+# Relasi yang di-nest oleh serializer penuh (feed latest-content), di-prefetch
+# agar jumlah query tetap (tidak bertambah per baris). Viewset konten memakai
+# SparseFieldsetMixin.get_prefetch_paths()
+FLORA_PREFETCH = ('images',)
+FAUNA_PREFETCH = ('images',)
+HEALTH_PREFETCH = ('images', 'fasilitas')
+KULINER_PREFETCH = ('images', 'list_menu')
+DESTINATIONS_PREFETCH = (
+    'images',
+    Prefetch('flora', queryset=Flora.objects.prefetch_related(*FLORA_PREFETCH)),
+    Prefetch('fauna', queryset=Fauna.objects.prefetch_related(*FAUNA_PREFETCH)),
+)
+
+PREFETCH = {
+    Destinations: DESTINATIONS_PREFETCH,
+    Flora: FLORA_PREFETCH,
+    Fauna: FAUNA_PREFETCH,
+    Health: HEALTH_PREFETCH,
+    Kuliner: KULINER_PREFETCH,
+}
+
+# Tabel relasi yang ikut menentukan ETag feed latest-content (updated_at + jumlah baris)
+ETAG_RELATIONS = {
+    Destinations: ('images', 'flora', 'flora__images', 'fauna', 'fauna__images'),
+    Flora: ('images',),
+    Fauna: ('images',),
+    Health: ('images', 'fasilitas'),
+    Kuliner: ('images', 'list_menu'),
+}
+
+class SparseFieldsetMixin:
+    """
+    ?fields=title,slug dan ?expand=images,flora.images untuk serializer
+    DynamicFieldsMixin. Action list memakai `summary_serializer_class`.
+    Prefetch dan tabel ETag hanya untuk relasi yang benar-benar di-serialize.
+    """
+    summary_serializer_class = None
+
+    def get_serializer_class(self):
+        if self.action == 'list' and self.summary_serializer_class is not None:
+            return self.summary_serializer_class
+        return super().get_serializer_class()
+
+    def get_serializer(self, *args, **kwargs):
+        if self.request is not None:
+            kwargs.setdefault('fields', split_param(self.request.query_params.get('fields')))
+            kwargs.setdefault('expand', split_param(self.request.query_params.get('expand')))
+        return super().get_serializer(*args, **kwargs)
+
+    def get_prefetch_paths(self):
+        return self.get_serializer().get_prefetch_paths()
+
+    def get_etag_relations(self):
+        return self.get_prefetch_paths()
+
+    def get_queryset(self):
+        serializer = self.get_serializer()
+        # id dan created_at selalu dimuat untuk cursor pagination
+        return (
+            super().get_queryset()
+            .only('id', 'created_at', *serializer.get_columns())
+            .prefetch_related(*serializer.get_prefetch_paths())
+        )
+
+class BasePublicViewSet(SparseFieldsetMixin, ConditionalGetMixin, ResponseCacheMixin, viewsets.ReadOnlyModelViewSet):
     permission_classes = [permissions.AllowAny]
+
+    def get_lookup_filter(self):
+        # Sama dengan get_object: angka -> ID, selain itu slug
+        lookup = self.kwargs.get(self.lookup_field)
+        if isinstance(lookup, str) and not lookup.isdigit():
+            return {'slug': lookup}
+        return {'id': lookup}
     
     def get_object(self):
         """
@@ -33,106 +118,192 @@ class BasePublicViewSet(viewsets.ReadOnlyModelViewSet):
     
 # destinations    
 class DestinationsViewset(BasePublicViewSet):
+    cache_models = DESTINATION_MODELS
     queryset = Destinations.objects.all()
     serializer_class = DestinationsSerializer
+    summary_serializer_class = DestinationsSummarySerializer
     lookup_field = 'slug'
     
 
-class ImageDestinationsViewset(viewsets.ReadOnlyModelViewSet):
-    queryset = ImageDestinations.objects.all()
+class ImageDestinationsViewset(ResponseCacheMixin, viewsets.ReadOnlyModelViewSet):
+    cache_models = ('destinations.ImageDestinations',)
+    queryset = ImageDestinations.objects.order_by('-created_at', '-id')
+    pagination_class = ImagePagination
     serializer_class = ImageDestinationsSerializer
     lookup_field = 'slug'
     
 # flora
 class FloraViewset(BasePublicViewSet):
+    cache_models = FLORA_MODELS
     queryset = Flora.objects.all()
     serializer_class = FloraSerializer
+    summary_serializer_class = FloraSummarySerializer
     lookup_field = 'slug'
     
-class ImageFloraViewset(viewsets.ReadOnlyModelViewSet):
-    queryset = ImageFlora.objects.all()
+class ImageFloraViewset(ResponseCacheMixin, viewsets.ReadOnlyModelViewSet):
+    cache_models = ('flora.ImageFlora',)
+    queryset = ImageFlora.objects.order_by('-created_at', '-id')
+    pagination_class = ImagePagination
     serializer_class = ImageFloraSerializer
     lookup_field = 'slug'
 
 # health
-class HealthViewset(viewsets.ReadOnlyModelViewSet):
+class HealthViewset(SparseFieldsetMixin, ConditionalGetMixin, ResponseCacheMixin, viewsets.ReadOnlyModelViewSet):
+    cache_models = HEALTH_MODELS
     queryset = Health.objects.all()
     serializer_class = HealthSerializer
+    summary_serializer_class = HealthSummarySerializer
     lookup_field = 'slug'
 
-class ImageHealthViewset(viewsets.ReadOnlyModelViewSet):
-    queryset = ImageHealth.objects.all()
+class ImageHealthViewset(ResponseCacheMixin, viewsets.ReadOnlyModelViewSet):
+    cache_models = ('health.ImageHealth',)
+    queryset = ImageHealth.objects.order_by('-created_at', '-id')
+    pagination_class = ImagePagination
     serializer_class = ImageHealthSerializer
     lookup_field = 'slug'
 
 # kuliner
-class KulinerViewset(viewsets.ReadOnlyModelViewSet):
-    queryset = Kuliner.objects.all()    
+class KulinerViewset(SparseFieldsetMixin, ConditionalGetMixin, ResponseCacheMixin, viewsets.ReadOnlyModelViewSet):
+    cache_models = KULINER_MODELS
+    queryset = Kuliner.objects.all()
     serializer_class = KulinerSerializer
+    summary_serializer_class = KulinerSummarySerializer
     lookup_field = 'slug'
 
-class ImageKulinerViewset(viewsets.ReadOnlyModelViewSet):
-    queryset = ImageKuliner.objects.all()
+class ImageKulinerViewset(ResponseCacheMixin, viewsets.ReadOnlyModelViewSet):
+    cache_models = ('kuliner.ImageKuliner',)
+    queryset = ImageKuliner.objects.order_by('-created_at', '-id')
+    pagination_class = ImagePagination
     serializer_class = ImageKulinerSerializer
     lookup_field = 'slug'
 
 # fauna
-class FaunaViewset(viewsets.ReadOnlyModelViewSet):
+class FaunaViewset(SparseFieldsetMixin, ConditionalGetMixin, ResponseCacheMixin, viewsets.ReadOnlyModelViewSet):
+    cache_models = FAUNA_MODELS
     queryset = Fauna.objects.all()
     serializer_class = FaunaSerializer
+    summary_serializer_class = FaunaSummarySerializer
     lookup_field = 'slug'
 
-class ImageFaunaViewset(viewsets.ReadOnlyModelViewSet):
-    queryset = ImageFauna.objects.all()
+class ImageFaunaViewset(ResponseCacheMixin, viewsets.ReadOnlyModelViewSet):
+    cache_models = ('fauna.ImageFauna',)
+    queryset = ImageFauna.objects.order_by('-created_at', '-id')
+    pagination_class = ImagePagination
     serializer_class = ImageFaunaSerializer
     lookup_field = 'slug'
 
-class LatestContentView(APIView):
+# Tipe konten di feed latest-content: (type, model, serializer)
+CONTENT_TYPES = (
+    ('destination', Destinations, DestinationsSerializer),
+    ('flora', Flora, FloraSerializer),
+    ('fauna', Fauna, FaunaSerializer),
+    ('kuliner', Kuliner, KulinerSerializer),
+    ('health', Health, HealthSerializer),
+)
+
+class LatestContentView(ConditionalGetMixin, ResponseCacheMixin, APIView):
+    """
+    Feed konten terbaru dari semua tipe, urut (created_at, type, id) terbaru
+    dulu. Setiap tabel hanya mengambil `limit + 1` key teratas, key-key itu
+    di-merge (heapq), lalu hanya pemenangnya yang diambil lengkap dengan
+    prefetch. Response di-cache sampai ada model konten yang berubah, dan
+    ETag dihitung dari seluruh tabel tipe yang diminta.
+
+    Parameter: ?limit= (maks 50), ?types=flora,fauna dan ?cursor= (format sama
+    dengan ContentCursorPagination, ditambah type sebagai tie-breaker antar tabel).
+    """
     permission_classes = [permissions.AllowAny]
-    
+    cache_models = CONTENT_MODELS
+    cache_name = 'latest-content'
+    default_limit = 10
+    max_limit = 50
+
+    def get_limit(self, request):
+        try:
+            limit = int(request.query_params.get('limit', self.default_limit))
+        except ValueError:
+            raise ValidationError({'limit': 'Must be an integer.'})
+        return min(max(limit, 1), self.max_limit)
+
+    def get_types(self, request):
+        available = [content_type for content_type, _, _ in CONTENT_TYPES]
+        types = request.query_params.get('types')
+        if not types:
+            return available
+        requested = {content_type.strip() for content_type in types.split(',') if content_type.strip()}
+        unknown = requested - set(available)
+        if unknown:
+            raise ValidationError({'types': f"Unknown type(s): {', '.join(sorted(unknown))}"})
+        return [content_type for content_type in available if content_type in requested]
+
+    def feed_queryset(self, content_type, model, cursor):
+        queryset = model.objects.all()
+        if cursor is None:
+            return queryset
+        created_at, cursor_type, cursor_id = cursor
+        after = Q(created_at__lt=created_at)
+        if content_type < cursor_type:
+            after |= Q(created_at=created_at)
+        elif content_type == cursor_type:
+            after |= Q(created_at=created_at, id__lt=cursor_id)
+        return queryset.filter(after)
+
+    def get_feed(self, limit, types, cursor):
+        models = {content_type: (model, serializer) for content_type, model, serializer in CONTENT_TYPES}
+
+        # Top (limit + 1) key per tabel, sudah terurut dari database
+        streams = [
+            [
+                (created_at, content_type, pk)
+                for pk, created_at in self.feed_queryset(content_type, models[content_type][0], cursor)
+                .order_by('-created_at', '-id')
+                .values_list('id', 'created_at')[:limit + 1]
+            ]
+            for content_type in types
+        ]
+        winners = list(islice(heapq.merge(*streams, reverse=True), limit + 1))
+        has_next, winners = len(winners) > limit, winners[:limit]
+
+        # Ambil objek pemenang per tipe dengan prefetch relasinya
+        objects = {}
+        for content_type in types:
+            model = models[content_type][0]
+            ids = [pk for _, winner_type, pk in winners if winner_type == content_type]
+            if ids:
+                objects[content_type] = model.objects.prefetch_related(*PREFETCH[model]).in_bulk(ids)
+
+        results = [
+            {'type': content_type, 'data': models[content_type][1](objects[content_type][pk]).data}
+            for _, content_type, pk in winners
+        ]
+        next_cursor = encode_cursor(*winners[-1]) if has_next else None
+        return {'results': results, 'next_cursor': next_cursor}
+
+    def get_validator_querysets(self, request, *args, **kwargs):
+        models = {content_type: model for content_type, model, _ in CONTENT_TYPES}
+        querysets = []
+        for content_type in self.get_types(request):
+            queryset = models[content_type].objects.all()
+            querysets += [queryset] + [
+                relation_queryset(queryset.model, path, queryset) for path in ETAG_RELATIONS[queryset.model]
+            ]
+        return querysets
+
     def get(self, request):
-        # Mengambil semua data dan menggabungkannya
-        all_content = list(chain(
-            Destinations.objects.all(),
-            Flora.objects.all(),
-            Fauna.objects.all(),
-            Kuliner.objects.all(),
-            Health.objects.all()
-        ))
-        
-        # Urutkan berdasarkan created_at dan ambil 5 data terbaru
-        latest_content = sorted(all_content, key=attrgetter('created_at'), reverse=True)[:10]
-        
-        # Serialize data berdasarkan tipe model
-        results = []
-        for item in latest_content:
-            if isinstance(item, Destinations):
-                results.append({
-                    'type': 'destination',
-                    'data': DestinationsSerializer(item).data
-                })
-            elif isinstance(item, Flora):
-                results.append({
-                    'type': 'flora',
-                    'data': FloraSerializer(item).data
-                })
-            elif isinstance(item, Fauna):
-                results.append({
-                    'type': 'fauna',
-                    'data': FaunaSerializer(item).data
-                })
-            elif isinstance(item, Kuliner):
-                results.append({
-                    'type': 'kuliner',
-                    'data': KulinerSerializer(item).data
-                })
-            elif isinstance(item, Health):
-                results.append({
-                    'type': 'health',
-                    'data': HealthSerializer(item).data
-                })
+        return self.conditional_response(partial(self.cached_response, self.get_latest), request)
+
+    def get_latest(self, request):
+        limit = self.get_limit(request)
+        types = self.get_types(request)
+        cursor = request.query_params.get('cursor')
+        feed = self.get_feed(limit, types, decode_cursor(cursor, size=3) if cursor else None)
+
+        next_link = None
+        if feed['next_cursor']:
+            next_link = replace_query_param(request.build_absolute_uri(), 'cursor', feed['next_cursor'])
 
         return Response({
-            'count': len(results),
-            'results': results
+            'count': len(feed['results']),
+            'next': next_link,
+            'results': feed['results']
         })
@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.core'
+
+    def ready(self):
+        # Daftarkan statistik dari modul `stats` setiap app (lihat stats_cache.register_stats)
+        autodiscover_modules('stats')
+
+        from .content_version import connect_content_signals
+        connect_content_signals()
@@ -0,0 +1,79 @@
+"""
+Versi konten publik (destinasi, flora, fauna, kuliner, health + relasinya).
+
+Setiap save/delete model konten (setelah transaksinya commit) menaikkan
+versi global dan generasi model itu sendiri, sehingga cache yang key-nya memuat versi/generasi (response API,
+knowledge chatbot) otomatis tidak terpakai lagi tanpa perlu scan atau hapus
+key satu per satu. Generasi per model membuat invalidasi presisi: perubahan
+Kuliner tidak membuang cache endpoint flora.
+
+Counter disimpan di cache default, jadi invalidasi antar worker hanya
+berlaku jika cache itu bersama (Redis lewat REDIS_URL, lihat CACHES di
+settings.py). Dengan LocMemCache setiap proses punya counter sendiri.
+"""
+import time
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+CONTENT_VERSION_KEY = 'content_version'
+
+CONTENT_MODELS = (
+    'destinations.Destinations', 'destinations.ImageDestinations',
+    'flora.Flora', 'flora.ImageFlora',
+    'fauna.Fauna', 'fauna.ImageFauna',
+    'health.Health', 'health.ImageHealth', 'health.FasilitasHealth',
+    'kuliner.Kuliner', 'kuliner.ImageKuliner', 'kuliner.ListMenuKuliner',
+)
+
+
+def generation_key(label):
+    return f'content_generation:{label}'
+
+
+def _get_counters(keys):
+    counters = cache.get_many(keys)
+    for key in keys:
+        if key not in counters:
+            # Mulai dari timestamp agar nilai lama tidak terpakai ulang jika key ter-evict
+            cache.add(key, time.time_ns(), None)
+            counters[key] = cache.get(key)
+    return [counters[key] for key in keys]
+
+
+def _bump(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        _get_counters([key])
+
+
+def get_content_version():
+    """Versi global, berubah setiap ada model konten yang berubah"""
+    return _get_counters([CONTENT_VERSION_KEY])[0]
+
+
+def get_generations(labels):
+    """Generasi per model (label 'app.Model'), dalam urutan `labels`"""
+    return tuple(_get_counters([generation_key(label) for label in labels]))
+
+
+def _bump_generation(label):
+    _bump(generation_key(label))
+    _bump(CONTENT_VERSION_KEY)
+
+
+def bump_content_version(sender, using=None, **kwargs):
+    # Dinaikkan setelah commit: jika dinaikkan di dalam transaksi (misal save di admin),
+    # GET yang membaca baris lama sebelum commit menyimpannya di bawah generasi baru
+    label = sender._meta.label
+    transaction.on_commit(lambda: _bump_generation(label), using=using)
+
+
+def connect_content_signals():
+    for label in CONTENT_MODELS:
+        model = apps.get_model(label)
+        post_save.connect(bump_content_version, sender=model, dispatch_uid=f'content_version:save:{label}')
+        post_delete.connect(bump_content_version, sender=model, dispatch_uid=f'content_version:delete:{label}')
@@ -0,0 +1,51 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.core.stats_cache import (
+    acquire_refresh_lock,
+    get_refresh_metrics,
+    refresh_stats,
+    registered_stats,
+    release_refresh_lock,
+)
+
+
+class Command(BaseCommand):
+    help = 'Refresh the cached dashboard stats registered in each app\'s stats module (run from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('keys', nargs='*', help='Only refresh these keys')
+        parser.add_argument('--interval', type=int, help='Keep running and refresh every INTERVAL seconds')
+        parser.add_argument('--status', action='store_true', help='Print refresh duration metrics and exit')
+
+    def handle(self, *args, **options):
+        keys = options['keys'] or list(registered_stats())
+
+        if options['status']:
+            for key, metrics in get_refresh_metrics(keys).items():
+                self.stdout.write(
+                    f"{key}: {metrics['refreshes']} refresh(es), last {metrics['last_ms']:.1f} ms "
+                    f"at {metrics['last_refreshed']:%Y-%m-%d %H:%M:%S}, avg {metrics['avg_ms']:.1f} ms"
+                )
+            return
+
+        while True:
+            self.refresh(keys)
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
+
+    def refresh(self, keys):
+        for key in keys:
+            # Lewati key yang sedang di-refresh worker lain
+            token = acquire_refresh_lock(key)
+            if not token:
+                self.stdout.write(self.style.WARNING(f"{key}: refresh already running"))
+                continue
+            try:
+                start = time.perf_counter()
+                refresh_stats(key)
+                self.stdout.write(f"{key}: {(time.perf_counter() - start) * 1000:.1f} ms")
+            finally:
+                release_refresh_lock(key, token)
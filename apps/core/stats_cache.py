@@ -0,0 +1,191 @@
+import logging
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STATS_CACHE_SETTINGS = {
+    'TTL': 60,                  # Detik data dianggap segar
+    'STALE_TTL': 600,           # Detik data lama masih boleh disajikan sambil di-refresh
+    'BACKGROUND_REFRESH': True,  # False: refresh langsung di request (misal untuk test)
+    'LOCK_TIMEOUT': 30,         # Batas waktu lock refresh (jika worker mati saat refresh)
+    'LOCK_WAIT': 5,             # Detik request menunggu worker lain saat cache kosong
+    'VIEWS': ['admin:index'],   # View yang menampilkan statistik dari context processor
+}
+
+# key -> (compute, ttl, stale_ttl), diisi oleh modul `stats` setiap app
+_registry = {}
+
+_bypass = ContextVar('stats_cache_bypass', default=False)
+
+
+def get_stats_cache_settings():
+    return {**DEFAULT_STATS_CACHE_SETTINGS, **getattr(settings, 'STATS_CACHE', {})}
+
+
+def register_stats(key, compute, ttl=None, stale_ttl=None):
+    """Daftarkan statistik agar bisa di-precompute (command precompute_stats)"""
+    _registry[key] = (compute, ttl, stale_ttl)
+
+
+def registered_stats():
+    return dict(_registry)
+
+
+def shows_stats(request):
+    """Apakah request ini me-render view yang menampilkan statistik global"""
+    match = getattr(request, 'resolver_match', None)
+    return match is not None and match.view_name in get_stats_cache_settings()['VIEWS']
+
+
+@contextmanager
+def bypass_stats_cache():
+    """
+    Di dalam blok ini get_stats() selalu menjalankan compute() tanpa membaca
+    atau menulis cache (misal audit_indexes, agar query-nya jalan tanpa
+    menghapus statistik yang sedang disajikan).
+    """
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def _lock_key(key):
+    return f'{key}:lock'
+
+
+def _metrics_key(key):
+    return f'{key}:metrics'
+
+
+def acquire_refresh_lock(key):
+    """
+    Single-flight antar worker: hanya yang berhasil cache.add yang menghitung
+    ulang. Mengembalikan token pemilik lock (None jika gagal) untuk
+    release_refresh_lock().
+    """
+    token = uuid.uuid4().hex
+    if cache.add(_lock_key(key), token, get_stats_cache_settings()['LOCK_TIMEOUT']):
+        return token
+    return None
+
+
+def release_refresh_lock(key, token):
+    """
+    Lepas lock hanya jika masih milik `token`. Refresh yang lebih lama dari
+    LOCK_TIMEOUT tidak boleh menghapus lock yang sudah diambil worker lain.
+    """
+    if cache.get(_lock_key(key)) == token:
+        cache.delete(_lock_key(key))
+
+
+def record_refresh(key, duration_ms):
+    metrics = cache.get(_metrics_key(key)) or {'refreshes': 0, 'total_ms': 0}
+    metrics.update({
+        'refreshes': metrics['refreshes'] + 1,
+        'total_ms': metrics['total_ms'] + duration_ms,
+        'last_ms': duration_ms,
+        'last_refreshed': timezone.now(),
+    })
+    metrics['avg_ms'] = metrics['total_ms'] / metrics['refreshes']
+    cache.set(_metrics_key(key), metrics, None)
+    logger.info("Refreshed stats %s in %.1f ms", key, duration_ms)
+
+
+def get_refresh_metrics(keys=None):
+    """Durasi refresh per key: refreshes, last_ms, avg_ms, last_refreshed"""
+    keys = list(_registry) if keys is None else list(keys)
+    metrics = cache.get_many([_metrics_key(key) for key in keys])
+    return {key: metrics[_metrics_key(key)] for key in keys if _metrics_key(key) in metrics}
+
+
+def _resolve(key, compute, ttl, stale_ttl):
+    if compute is None:
+        compute, registered_ttl, registered_stale_ttl = _registry[key]
+        ttl = registered_ttl if ttl is None else ttl
+        stale_ttl = registered_stale_ttl if stale_ttl is None else stale_ttl
+    options = get_stats_cache_settings()
+    ttl = options['TTL'] if ttl is None else ttl
+    stale_ttl = options['STALE_TTL'] if stale_ttl is None else stale_ttl
+    return compute, ttl, stale_ttl
+
+
+def refresh_stats(key, compute=None, ttl=None, stale_ttl=None):
+    """Hitung ulang statistik dan simpan bersama batas waktu segarnya"""
+    compute, ttl, stale_ttl = _resolve(key, compute, ttl, stale_ttl)
+
+    start = time.perf_counter()
+    value = compute()
+    record_refresh(key, (time.perf_counter() - start) * 1000)
+    cache.set(key, (value, time.time() + ttl), ttl + stale_ttl)
+    return value
+
+
+def _refresh_locked(key, token, compute, ttl, stale_ttl):
+    try:
+        return refresh_stats(key, compute, ttl, stale_ttl)
+    finally:
+        release_refresh_lock(key, token)
+
+
+def _refresh_in_background(key, token, compute, ttl, stale_ttl):
+    def run():
+        try:
+            _refresh_locked(key, token, compute, ttl, stale_ttl)
+        except Exception:
+            logger.exception("Failed to refresh stats %s", key)
+        finally:
+            connections.close_all()
+
+    threading.Thread(target=run, name=f'stats-refresh:{key}', daemon=True).start()
+
+
+def _wait_for_value(key):
+    deadline = time.monotonic() + get_stats_cache_settings()['LOCK_WAIT']
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+    return None
+
+
+def get_stats(key, compute=None, ttl=None, stale_ttl=None):
+    """
+    Ambil statistik dari cache dengan pola stale-while-revalidate: data segar
+    langsung dikembalikan, data yang sudah lewat TTL tetap disajikan sementara
+    satu worker (lock di cache) menghitung ulang, dan hanya cache miss yang
+    menunggu compute(). Tanpa `compute` dipakai fungsi dari register_stats().
+    """
+    compute, ttl, stale_ttl = _resolve(key, compute, ttl, stale_ttl)
+    if _bypass.get():
+        return compute()
+
+    entry = cache.get(key)
+    if entry is None:
+        token = acquire_refresh_lock(key)
+        if token:
+            return _refresh_locked(key, token, compute, ttl, stale_ttl)
+        # Worker lain sedang menghitung, tunggu hasilnya daripada ikut query
+        entry = _wait_for_value(key)
+        if entry is None:
+            return compute()
+
+    value, fresh_until = entry
+    token = acquire_refresh_lock(key) if time.time() >= fresh_until else None
+    if token:
+        if get_stats_cache_settings()['BACKGROUND_REFRESH']:
+            _refresh_in_background(key, token, compute, ttl, stale_ttl)
+        else:
+            return _refresh_locked(key, token, compute, ttl, stale_ttl)
+    return value
@@ -1,3 +1,135 @@
-from django.test import TestCase
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import resolve
+
+from apps.health.models import Health
+
+from .content_version import get_content_version
+from .stats_cache import (
+    acquire_refresh_lock, bypass_stats_cache, get_refresh_metrics, get_stats, release_refresh_lock, shows_stats,
+)
+
+
+class Counter:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.calls
+
+
+@override_settings(STATS_CACHE={'TTL': 60, 'STALE_TTL': 600, 'BACKGROUND_REFRESH': False})
+class StatsCacheTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def expire(self, key):
+        value, fresh_until = cache.get(key)
+        cache.set(key, (value, time.time() - 1))
+
+    def test_fresh_value_is_cached(self):
+        compute = Counter()
+
+        self.assertEqual(get_stats('stats', compute), 1)
+        self.assertEqual(get_stats('stats', compute), 1)
+        self.assertEqual(compute.calls, 1)
+
+    def test_expired_value_is_recomputed(self):
+        compute = Counter()
+        get_stats('stats', compute)
+
+        self.expire('stats')
+
+        self.assertEqual(get_stats('stats', compute), 2)
+
+    @override_settings(STATS_CACHE={'BACKGROUND_REFRESH': True})
+    def test_stale_value_served_while_refreshing(self):
+        compute = Counter()
+        get_stats('stats', compute)
+
+        self.expire('stats')
+
+        with mock.patch('apps.core.stats_cache._refresh_in_background') as refresh:
+            self.assertEqual(get_stats('stats', compute), 1)
+        refresh.assert_called_once()
+
+    def test_stale_value_served_while_other_worker_refreshes(self):
+        compute = Counter()
+        get_stats('stats', compute)
+        self.expire('stats')
+        acquire_refresh_lock('stats')
+
+        self.assertEqual(get_stats('stats', compute), 1)
+        self.assertEqual(compute.calls, 1)
+
+    @override_settings(STATS_CACHE={'LOCK_WAIT': 0.1})
+    def test_cold_cache_does_not_store_without_lock(self):
+        compute = Counter()
+        acquire_refresh_lock('stats')
+
+        self.assertEqual(get_stats('stats', compute), 1)
+        self.assertIsNone(cache.get('stats'))
+
+    def test_expired_lock_owner_cannot_release_new_lock(self):
+        first = acquire_refresh_lock('stats')
+        self.assertIsNone(acquire_refresh_lock('stats'))
+        # Refresh pertama melewati LOCK_TIMEOUT, worker lain mengambil lock
+        cache.delete('stats:lock')
+        second = acquire_refresh_lock('stats')
+
+        release_refresh_lock('stats', first)
+        self.assertIsNone(acquire_refresh_lock('stats'))
+        release_refresh_lock('stats', second)
+        self.assertTrue(acquire_refresh_lock('stats'))
+
+    def test_bypass_computes_without_touching_cache(self):
+        compute = Counter()
+        get_stats('stats', compute)
+
+        with bypass_stats_cache():
+            self.assertEqual(get_stats('stats', compute), 2)
+            self.assertEqual(get_stats('other', compute), 3)
+
+        self.assertEqual(get_stats('stats', compute), 1)
+        self.assertIsNone(cache.get('other'))
+
+    def test_refresh_duration_metrics(self):
+        get_stats('stats', Counter())
+
+        metrics = get_refresh_metrics(['stats', 'missing'])
+
+        self.assertEqual(list(metrics), ['stats'])
+        self.assertEqual(metrics['stats']['refreshes'], 1)
+        self.assertGreaterEqual(metrics['stats']['last_ms'], 0)
+
+    def test_shows_stats_only_on_admin_index(self):
+        index = RequestFactory().get('/en/admin/')
+        index.resolver_match = resolve('/en/admin/')
+        changelist = RequestFactory().get('/en/admin/flora/flora/')
+        changelist.resolver_match = resolve('/en/admin/flora/flora/')
+
+        self.assertTrue(shows_stats(index))
+        self.assertFalse(shows_stats(changelist))
+        self.assertFalse(shows_stats(RequestFactory().get('/en/')))
+
+
+class ContentVersionTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_content_changes_bump_version(self):
+        version = get_content_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            health = Health.objects.create(title='Health', slug='health', meta_title='Meta', meta_description='Meta')
+            # Belum commit: versi belum berubah
+            self.assertEqual(get_content_version(), version)
+        after_save = get_content_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            health.delete()
+
+        self.assertGreater(after_save, version)
+        self.assertGreater(get_content_version(), after_save)
@@ -130,6 +130,26 @@ DATABASES = {
     }
 }
 
+# Cache bersama: generasi konten (apps/core/content_version.py), response API, snapshot
+# knowledge chatbot, statistik dashboard dan rate limit bergantung pada counter di cache
+# yang sama untuk semua worker. Tanpa REDIS_URL dipakai LocMemCache yang per proses:
+# hanya benar untuk SATU worker gunicorn (default Dockerfile). Dengan beberapa worker,
+# edit di admin hanya menaikkan generasi di proses yang menyimpan, worker lain tetap
+# menyajikan cache lama sampai TIMEOUT; set REDIS_URL (misal redis://redis:6379/0)
+if config('REDIS_URL', default=''):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': config('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -191,11 +211,142 @@ CORS_ALLOWED_ORIGINS = [
     
 ]
 
+REST_FRAMEWORK = {
+    # Session hanya dibaca jika ada cookie session (response API publik tanpa Vary: Cookie)
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'apps.api.authentication.SessionCookieAuthentication',
+        'rest_framework.authentication.BasicAuthentication',
+    ],
+    # List konten: cursor (created_at, id); endpoint gambar memakai ImagePagination
+    'DEFAULT_PAGINATION_CLASS': 'apps.api.pagination.ContentCursorPagination',
+    'PAGE_SIZE': 20,
+}
+
+# Cache response JSON endpoint konten, di-invalidasi lewat generasi per model
+# (signal post_save/post_delete). Warm-up setelah deploy: `manage.py warm_api_cache`
+API_RESPONSE_CACHE = {
+    'ENABLED': True,
+    'TIMEOUT': 60 * 60,
+    # ETag/Last-Modified + 304 untuk endpoint konten, header untuk browser/CDN
+    'CACHE_CONTROL': {'public': True, 'max_age': 60, 's_maxage': 300},
+}
+
 # Image kompres setting
 MAX_IMAGE_SIZE = 10 * 1024 * 1024  # 10MB
 MAX_IMAGE_DIMENSION = 2000  # pixels
 IMAGE_QUALITY = 95  # 0-100
 
+# Analytics: RequestLog ditulis lewat antrian + bulk_create di background
+ANALYTICS_LOG_SINK = {
+    'BACKEND': 'apps.analytics.sinks.QueuedLogSink',
+    'MAX_QUEUE_SIZE': 10000,
+    'BATCH_SIZE': 200,
+    'FLUSH_INTERVAL': 2.0,  # seconds
+    'OVERFLOW_POLICY': 'drop_oldest',  # drop_oldest / sample / block
+}
+
+# Analytics: gauge resource per worker + pengukuran memori untuk sebagian request
+ANALYTICS_RESOURCES = {
+    'SAMPLE_INTERVAL': 15.0,  # seconds
+    'REQUEST_SAMPLE_RATE': 0.01,
+    'REQUEST_MODE': 'rusage',  # rusage / tracemalloc
+}
+
+# Analytics: kuota rate limit (sliding window) default, per prefix endpoint dan per API key
+ANALYTICS_RATE_LIMITS = {
+    'DEFAULT': {'limit': 100, 'window': 3600},  # window in seconds
+    'ENDPOINTS': {
+        '/api/chatbot/': {'limit': 30, 'window': 60},
+    },
+    'API_KEYS': {},
+    # Jumlah reverse proxy tepercaya (misal 1 untuk nginx di depan gunicorn); 0 = pakai REMOTE_ADDR.
+    # X-Forwarded-For dari client tidak pernah dipercaya di luar entry proxy ini
+    'NUM_PROXIES': config('ANALYTICS_NUM_PROXIES', default=0, cast=int),
+}
+
+# Analytics: batas scanning request mencurigakan
+ANALYTICS_SCANNER = {
+    'MAX_FIELD_BYTES': 2048,
+    'MAX_BODY_BYTES': 1024 * 1024,  # 1MB
+}
+
+# Analytics: batas jumlah query per request (default + override per prefix endpoint)
+ANALYTICS_QUERY_THRESHOLDS = {
+    'DEFAULT': 30,
+    'ENDPOINTS': {
+        '/api/latest-content/': 20,
+    },
+    'REPEAT_THRESHOLD': 5,
+}
+
+# Analytics: rollup per jam/hari, jalankan `manage.py materialize_rollups` tiap menit via cron
+ANALYTICS_ROLLUPS = {
+    'BATCH_SIZE': 50000,
+    'SETTLE_SECONDS': 60,
+}
+
+# Analytics: sketch latency (p50/p95/p99) per endpoint per jam, diisi oleh materialize_rollups
+ANALYTICS_LATENCY_SKETCH = {
+    'RELATIVE_ACCURACY': 0.01,
+}
+
+# Analytics: HyperLogLog pengunjung unik (ip/session/user) per hari per feature
+ANALYTICS_HLL = {
+    'PRECISION': 12,  # 4KB per sketch, error ~1.6%
+}
+
+# Analytics: retensi per tabel, jalankan `manage.py apply_retention` tiap hari via cron.
+# Row yang kedaluwarsa diarsipkan (gzip JSONL) lalu dihapus per chunk, atau partisi
+# bulanannya di-DROP untuk tabel PARTITIONED (MySQL, setup sekali: --setup-partitions).
+# ARCHIVE_DIR harus berada di volume persisten (bukan filesystem container, yang hilang
+# saat redeploy): set ANALYTICS_ARCHIVE_DIR ke path mount volume di production
+ANALYTICS_RETENTION = {
+    'ARCHIVE_DIR': config('ANALYTICS_ARCHIVE_DIR', default=str(BASE_DIR / 'archive')),
+    'CHUNK_SIZE': 5000,
+    'PARTITION_MONTHS_AHEAD': 2,
+    'MODELS': {
+        'analytics.RequestLog': {'DAYS': 90, 'PARTITIONED': True},
+        'analytics.CustomEvent': {'DAYS': 180},
+        'analytics.ComplianceLog': {'DAYS': 730},
+        'ai.AIAnalytics': {'DAYS': 180},
+    },
+}
+
+# Cache statistik dashboard (stale-while-revalidate + lock single-flight, lihat apps/core/stats_cache.py).
+# Opsional: `manage.py precompute_stats --interval 60` agar request tidak pernah menghitung sendiri
+STATS_CACHE = {
+    'TTL': 60,
+    'STALE_TTL': 600,
+    'BACKGROUND_REFRESH': True,
+    'LOCK_TIMEOUT': 30,
+    'LOCK_WAIT': 5,
+    # Context processor analytics hanya berjalan di view ini
+    'VIEWS': ['admin:index'],
+}
+
+# Chatbot: snapshot knowledge (item + KONTEKS DATA) per versi konten, lihat apps/ai/knowledge.py.
+# Prebuild setelah deploy: `manage.py prebuild_knowledge`
+AI_KNOWLEDGE = {
+    'TIMEOUT': 24 * 60 * 60,
+}
+
+# Chatbot: hanya item paling relevan (BM25) yang masuk KONTEKS DATA, lihat apps/ai/retrieval.py.
+# Bandingkan ukuran prompt/latensi: `manage.py benchmark_retrieval`
+AI_RETRIEVAL = {
+    'ENABLED': True,
+    'TOP_K': 8,
+    'TOKEN_BUDGET': 1500,  # perkiraan token (4 karakter per token)
+}
+
+# Chatbot: cache jawaban LLM per proses (TTL + LRU), key pertanyaan + versi konten +
+# kelas percakapan; pertanyaan mirip (cosine TF-IDF) ikut dipakai. Lihat apps/ai/response_cache.py
+AI_RESPONSE_CACHE = {
+    'ENABLED': True,
+    'TTL': 60 * 60,
+    'MAX_ENTRIES': 1000,
+    'SIMILARITY_THRESHOLD': 0.85,  # None = hanya pertanyaan yang sama persis
+}
+
 # For production
 if not DEBUG:  # Hanya aktif di production
     SECURE_SSL_REDIRECT = True